@@ -0,0 +1,104 @@
+"""
+Circuit breaker for upstream LLM backends
+
+After failure_threshold consecutive failures the breaker opens and calls are
+refused immediately instead of waiting on a provider that is down. After
+reset_timeout seconds it lets a single probe call through (half-open): a
+success closes it again, a failure re-opens it for another reset_timeout.
+"""
+import time
+from typing import Callable, Optional
+
+from app.utils.metrics import LLM_CIRCUIT_STATE
+
+
+class CircuitOpenError(RuntimeError):
+    """Raised instead of calling a backend whose circuit is open"""
+
+
+class CircuitBreaker:
+    """
+    Consecutive-failure circuit breaker with a single half-open probe
+    Not thread-safe; used from the event loop only.
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    # Gauge values for smbshield_llm_circuit_state
+    _GAUGE = {CLOSED: 0, HALF_OPEN: 1, OPEN: 2}
+
+    def __init__(
+        self,
+        name: str,
+        failure_threshold: int = 5,
+        reset_timeout: float = 30.0,
+        clock: Callable[[], float] = time.monotonic
+    ):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.clock = clock
+        self.consecutive_failures = 0
+        self.times_opened = 0
+        self._opened_at: Optional[float] = None
+        self._probing = False
+        self._gauge = LLM_CIRCUIT_STATE.labels(name)
+        self._gauge.set(0)
+
+    @property
+    def state(self) -> str:
+        if self._opened_at is None:
+            return self.CLOSED
+        if self.clock() - self._opened_at >= self.reset_timeout:
+            return self.HALF_OPEN
+        return self.OPEN
+
+    def allow(self) -> bool:
+        """
+        Whether a call may go out now
+        In the half-open state only one probe is admitted until it reports back.
+        """
+        state = self.state
+        if state == self.CLOSED:
+            return True
+        if state == self.HALF_OPEN and not self._probing:
+            self._probing = True
+            self._gauge.set(self._GAUGE[self.HALF_OPEN])
+            return True
+        return False
+
+    def success(self) -> None:
+        self.consecutive_failures = 0
+        self._probing = False
+        if self._opened_at is not None:
+            self._opened_at = None
+            self._gauge.set(self._GAUGE[self.CLOSED])
+
+    def failure(self) -> None:
+        self.consecutive_failures += 1
+        probe_failed = self._probing
+        self._probing = False
+        if probe_failed or (
+            self._opened_at is None and self.consecutive_failures >= self.failure_threshold
+        ):
+            self._opened_at = self.clock()
+            self.times_opened += 1
+            self._gauge.set(self._GAUGE[self.OPEN])
+
+    def release(self) -> None:
+        """Give back a probe slot whose call was cancelled without an outcome"""
+        self._probing = False
+
+    def stats(self) -> dict:
+        state = self.state
+        retry_in = None
+        if state == self.OPEN:
+            retry_in = round(self._opened_at + self.reset_timeout - self.clock(), 1)
+        return {
+            "state": state,
+            "consecutive_failures": self.consecutive_failures,
+            "times_opened": self.times_opened,
+            "retry_in_seconds": retry_in,
+        }
@@ -0,0 +1,155 @@
+"""
+Server-side conversation store
+
+Keeps recent turns per conversation_id so clients only send the new message.
+Once the recent turns outgrow the context token budget, the oldest turns are
+folded into a running summary one at a time, so the context sent upstream
+stays bounded however long the session gets. The summary is extractive (the
+gist sentence of each folded turn) and costs no extra model calls.
+
+Sessions are bounded in number (least recently active evicted first) and
+dropped after an idle timeout.
+"""
+import re
+import secrets
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import List, Optional, Tuple
+
+# Roughly 4 characters per token for English text
+_CHARS_PER_TOKEN = 4
+
+# Longest gist kept for a folded turn
+_GIST_MAX_CHARS = 160
+
+_MARKDOWN = re.compile(r"[*_#`>|]+")
+_WHITESPACE = re.compile(r"\s+")
+_SENTENCE_END = re.compile(r"(?<=[.!?])\s")
+
+_SPEAKERS = {"user": "Learner", "assistant": "Professor Shield"}
+
+
+def estimate_tokens(text: str) -> int:
+    """Cheap token estimate used for budgeting"""
+    return len(text) // _CHARS_PER_TOKEN + 1
+
+
+def _gist(text: str) -> str:
+    """First sentence of a turn, stripped of markdown and capped in length"""
+    plain = _WHITESPACE.sub(" ", _MARKDOWN.sub("", text)).strip()
+    first = _SENTENCE_END.split(plain, 1)[0]
+    if len(first) > _GIST_MAX_CHARS:
+        first = first[:_GIST_MAX_CHARS].rsplit(" ", 1)[0] + "..."
+    return first
+
+
+@dataclass
+class Conversation:
+    """Summary of older turns plus the most recent turns verbatim"""
+    id: str
+    summary_lines: List[str] = field(default_factory=list)
+    turns: List[Tuple[str, str]] = field(default_factory=list)  # (role, content)
+    tokens: int = 0  # Estimated tokens in summary + turns
+    last_active: float = field(default_factory=time.monotonic)
+
+    @property
+    def summary(self) -> str:
+        return "\n".join(self.summary_lines)
+
+    def context(self) -> list:
+        """Context as message dicts (summary first), e.g. for cache keys"""
+        messages = []
+        if self.summary_lines:
+            messages.append({"role": "summary", "content": self.summary})
+        messages.extend({"role": role, "content": content} for role, content in self.turns)
+        return messages
+
+
+class ConversationStore:
+    """
+    Bounded in-memory store of conversations keyed by conversation_id
+    """
+
+    def __init__(
+        self,
+        max_conversations: int = 2000,
+        idle_ttl_seconds: float = 1800,
+        context_token_budget: int = 1500,
+        summary_token_budget: int = 300
+    ):
+        self.max_conversations = max_conversations
+        self.idle_ttl_seconds = idle_ttl_seconds
+        self.context_token_budget = context_token_budget
+        self.summary_token_budget = summary_token_budget
+        # Least recently active first
+        self._conversations: "OrderedDict[str, Conversation]" = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._conversations)
+
+    def get(self, conversation_id: Optional[str]) -> Optional[Conversation]:
+        """Return a live stored conversation, or None if unknown or expired"""
+        now = time.monotonic()
+        self._evict_idle(now)
+
+        conversation = self._conversations.get(conversation_id) if conversation_id else None
+        if conversation is not None:
+            conversation.last_active = now
+            self._conversations.move_to_end(conversation.id)
+        return conversation
+
+    def create(self, seed_history: Optional[list] = None) -> Conversation:
+        """
+        Start a new conversation with a server-generated id
+
+        Args:
+            seed_history: Sanitized client-sent messages to start from (optional)
+        """
+        conversation = Conversation(id=f"conv_{secrets.token_urlsafe(16)}")
+        for message in seed_history or []:
+            if message.get("role") in _SPEAKERS:
+                self._add_turn(conversation, message["role"], message["content"])
+
+        self._conversations[conversation.id] = conversation
+        while len(self._conversations) > self.max_conversations:
+            self._conversations.popitem(last=False)
+        return conversation
+
+    def record(self, conversation: Conversation, user_message: str, reply: str) -> None:
+        """Append a completed exchange, folding old turns to stay within budget"""
+        self._add_turn(conversation, "user", user_message)
+        self._add_turn(conversation, "assistant", reply)
+        conversation.last_active = time.monotonic()
+        if conversation.id in self._conversations:
+            self._conversations.move_to_end(conversation.id)
+
+    def _add_turn(self, conversation: Conversation, role: str, content: str) -> None:
+        conversation.turns.append((role, content))
+        conversation.tokens += estimate_tokens(content)
+        while conversation.tokens > self.context_token_budget and conversation.turns:
+            self._fold_oldest(conversation)
+
+    def _fold_oldest(self, conversation: Conversation) -> None:
+        """Move the oldest verbatim turn into the running summary"""
+        role, content = conversation.turns.pop(0)
+        conversation.tokens -= estimate_tokens(content)
+
+        line = f"- {_SPEAKERS[role]}: {_gist(content)}"
+        conversation.summary_lines.append(line)
+        conversation.tokens += estimate_tokens(line)
+
+        # Oldest summary lines go first once the summary outgrows its share
+        summary_tokens = sum(estimate_tokens(l) for l in conversation.summary_lines)
+        while summary_tokens > self.summary_token_budget and conversation.summary_lines:
+            dropped = conversation.summary_lines.pop(0)
+            summary_tokens -= estimate_tokens(dropped)
+            conversation.tokens -= estimate_tokens(dropped)
+
+    def _evict_idle(self, now: float) -> None:
+        cutoff = now - self.idle_ttl_seconds
+        while self._conversations:
+            oldest = next(iter(self._conversations.values()))
+            if oldest.last_active > cutoff:
+                break
+            self._conversations.popitem(last=False)
@@ -0,0 +1,98 @@
+"""
+FAQ fast path for canonical questions
+
+Many chat messages are near-verbatim copies of the suggested prompts ("What
+is XSS?", "Explain XSS in simple terms"). These get reviewed, pre-written
+answers straight from memory instead of an LLM call. Only high-confidence
+matches qualify: after normalization the whole message must be a curated
+question, a topic's canonical subject, or a question template around one
+("what is XSS"). Canonical subjects are a topic's title, code, slug and
+aliases, not the wider keywords used for scoring, so "what is encryption"
+goes to the tutor like anything else.
+"""
+import html
+import re
+from typing import Dict, Optional
+
+from app.agents.response_cache import normalize_message
+from app.agents.topic_catalog import TopicCatalog
+
+# "<opener> [a|an|the] <subject> [<closer>...]", the subject being a canonical topic subject
+_QUESTION = re.compile(
+    r"(?:what is|what are|what's|whats|what does|define|explain|describe|tell me about"
+    r"|how does|how do|how to prevent|how do i prevent|how do i stop|how to stop)"
+    r" (?:an? |the )?(?P<subject>.+?)"
+    r"(?: (?:mean|work|works|attacks?|vulnerabilit(?:y|ies)|in simple terms|in plain english|simply))*"
+)
+
+_PUNCTUATION = re.compile(r"[?!.,]+")
+
+# Curated answers for suggested prompts that aren't about a single topic
+CURATED_ANSWERS: Dict[str, str] = {
+    "how can i secure my website": """🛡️ **Securing Your Website - A Starter Plan**
+
+Great question! You don't need a big budget to make a real difference.
+
+**This week:**
+1. **Turn on HTTPS everywhere** - Free certificates from Let's Encrypt
+2. **Update everything** - CMS, plugins, themes; turn on automatic updates
+3. **Enable two-factor authentication** - On hosting, admin and email accounts
+4. **Remove what you don't use** - Old plugins, test pages, former staff accounts
+
+**This month:**
+5. **Back up automatically** - And test that a restore actually works
+6. **Add security headers** - Check yours at securityheaders.com
+7. **Put a Web Application Firewall in front** - Many hosts include one
+8. **Limit login attempts** - Slows down password guessing
+
+**Why it matters:**
+Most small business sites are hacked through outdated plugins and weak or reused passwords, not clever zero-days.
+
+**Quick wins:**
+✅ Change any default admin passwords today
+✅ Delete unused plugins and themes
+✅ Set a monthly reminder to review updates
+
+Want me to explain any of these steps in detail? 🎓""",
+}
+
+
+class FAQ:
+    """Exact-match lookup of canonical questions"""
+
+    def __init__(self, topics: TopicCatalog, curated: Optional[Dict[str, str]] = None):
+        """
+        Args:
+            topics: Catalog whose topic answers serve template questions
+            curated: Extra {question: answer} pairs, questions in any case
+        """
+        self.topics = topics
+        self._curated = {
+            self._normalize(question): answer
+            for question, answer in (CURATED_ANSWERS if curated is None else curated).items()
+        }
+
+    @staticmethod
+    def _normalize(message: str) -> str:
+        # Sanitized messages arrive HTML-escaped ("what&#x27;s")
+        return normalize_message(_PUNCTUATION.sub(" ", html.unescape(message)))
+
+    def lookup(self, message: str) -> Optional[str]:
+        """
+        Pre-written answer for a canonical question, or None
+
+        Args:
+            message: The user's sanitized message
+        """
+        question = self._normalize(message)
+        answer = self._curated.get(question)
+        if answer is not None:
+            return answer
+
+        # A bare canonical subject ("xss", "hello") or a template around one
+        topic = self.topics.subject_for(question)
+        if topic is None:
+            match = _QUESTION.fullmatch(question)
+            if match is not None:
+                topic = self.topics.subject_for(match.group("subject"))
+        return topic.answer if topic is not None else None
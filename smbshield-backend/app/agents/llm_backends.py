@@ -0,0 +1,273 @@
+"""
+LLM backends behind the tutor
+
+Each backend turns a provider-neutral conversation - a list of
+(role, text) pairs with role "user" or "assistant" - into one provider's
+API call. The tutor never talks to a provider directly; it goes through the
+router in app.agents.llm_router, which picks a backend per request.
+"""
+import asyncio
+import json
+import logging
+import re
+import time
+from abc import ABC, abstractmethod
+from typing import AsyncIterator, Callable, List, Optional, Tuple
+
+import google.genai as genai
+import httpx
+from google.genai import types
+
+from app.agents.prompt_cache import SystemPromptCache
+from app.utils import log_with_context
+from app.utils.metrics import GEMINI_ERRORS, GEMINI_REQUEST_DURATION
+from app.utils.request_timing import record
+
+logger = logging.getLogger(__name__)
+
+# (role, text) with role "user" or "assistant"
+Message = Tuple[str, str]
+
+# Splits canned responses into word-sized chunks (keeping whitespace) for streaming
+_MOCK_CHUNK_PATTERN = re.compile(r"\S+\s*|\s+")
+
+
+class LLMBackend(ABC):
+    """
+    Interface of a text generation provider
+    Backends report their own latency phase (named after the backend) and
+    raise on any failure so the router can fail over.
+    """
+
+    name = "backend"
+    model_name = ""
+
+    @abstractmethod
+    async def generate(self, messages: List[Message], with_system_prompt: bool = True) -> str:
+        """
+        Generate a complete answer
+
+        Args:
+            messages: Conversation so far, ending with the user's message
+            with_system_prompt: Send the tutor system prompt along
+
+        Returns:
+            Generated response text
+        """
+
+    @abstractmethod
+    def stream(self, messages: List[Message], with_system_prompt: bool = True) -> AsyncIterator[str]:
+        """Generate an answer, yielding text chunks as they are produced"""
+
+    async def aclose(self) -> None:
+        """Release network resources"""
+
+
+class GeminiBackend(LLMBackend):
+    """Google Gemini through the google-genai async client"""
+
+    name = "gemini"
+
+    def __init__(
+        self,
+        api_key: str,
+        model_name: str,
+        system_prompt: str,
+        base_url: Optional[str] = None,
+        use_context_cache: bool = False,
+        cache_ttl_seconds: int = 3600
+    ):
+        self.client = genai.Client(
+            api_key=api_key,
+            http_options=types.HttpOptions(base_url=base_url) if base_url else None
+        )
+        self.model_name = model_name
+
+        # System prompt goes out as a system instruction (or cached content), built once
+        self.system_prompt = SystemPromptCache(
+            self.client,
+            model_name,
+            system_prompt,
+            use_context_cache=use_context_cache,
+            ttl_seconds=cache_ttl_seconds
+        )
+
+    @staticmethod
+    def _contents(messages: List[Message]) -> list:
+        return [
+            types.Content(
+                role="model" if role == "assistant" else "user",
+                parts=[types.Part(text=text)]
+            )
+            for role, text in messages
+        ]
+
+    async def generate(self, messages: List[Message], with_system_prompt: bool = True) -> str:
+        config = await self.system_prompt.config() if with_system_prompt else None
+        started = time.perf_counter()
+        try:
+            response = await self.client.aio.models.generate_content(
+                model=self.model_name,
+                contents=self._contents(messages),
+                config=config
+            )
+        except Exception as e:
+            GEMINI_ERRORS.labels("generate", type(e).__name__).inc()
+            raise
+        finally:
+            latency = time.perf_counter() - started
+            GEMINI_REQUEST_DURATION.labels("generate").observe(latency)
+            record(self.name, latency)
+
+        usage = getattr(response, "usage_metadata", None)
+        log_with_context(
+            logger,
+            "debug",
+            "Gemini call completed",
+            model=self.model_name,
+            latency_ms=round(latency * 1000, 1),
+            input_tokens=getattr(usage, "prompt_token_count", None),
+            cached_input_tokens=getattr(usage, "cached_content_token_count", None),
+            output_tokens=getattr(usage, "candidates_token_count", None)
+        )
+        return response.text
+
+    async def stream(
+        self, messages: List[Message], with_system_prompt: bool = True
+    ) -> AsyncIterator[str]:
+        config = await self.system_prompt.config() if with_system_prompt else None
+        started = time.perf_counter()
+        try:
+            stream = await self.client.aio.models.generate_content_stream(
+                model=self.model_name,
+                contents=self._contents(messages),
+                config=config
+            )
+            async for chunk in stream:
+                if chunk.text:
+                    yield chunk.text
+        except Exception as e:
+            GEMINI_ERRORS.labels("stream", type(e).__name__).inc()
+            raise
+        finally:
+            latency = time.perf_counter() - started
+            GEMINI_REQUEST_DURATION.labels("stream").observe(latency)
+            record(self.name, latency)
+
+
+class AnthropicBackend(LLMBackend):
+    """Anthropic Messages API over plain httpx"""
+
+    name = "anthropic"
+    API_VERSION = "2023-06-01"
+
+    def __init__(
+        self,
+        api_key: str,
+        model_name: str,
+        system_prompt: str,
+        base_url: str = "https://api.anthropic.com",
+        max_tokens: int = 1024,
+        timeout: float = 60.0,
+        transport: Optional[httpx.AsyncBaseTransport] = None
+    ):
+        self.model_name = model_name
+        self.system_prompt = system_prompt
+        self.max_tokens = max_tokens
+        self.client = httpx.AsyncClient(
+            base_url=base_url,
+            timeout=timeout,
+            transport=transport,
+            headers={"x-api-key": api_key, "anthropic-version": self.API_VERSION}
+        )
+
+    def _payload(self, messages: List[Message], with_system_prompt: bool, stream: bool) -> dict:
+        """Request body; consecutive turns of one role are merged as the API requires"""
+        merged: List[dict] = []
+        for role, text in messages:
+            if merged and merged[-1]["role"] == role:
+                merged[-1]["content"] += f"\n\n{text}"
+            else:
+                merged.append({"role": role, "content": text})
+
+        payload = {"model": self.model_name, "max_tokens": self.max_tokens, "messages": merged}
+        if with_system_prompt:
+            payload["system"] = self.system_prompt
+        if stream:
+            payload["stream"] = True
+        return payload
+
+    async def generate(self, messages: List[Message], with_system_prompt: bool = True) -> str:
+        started = time.perf_counter()
+        try:
+            response = await self.client.post(
+                "/v1/messages", json=self._payload(messages, with_system_prompt, stream=False)
+            )
+            response.raise_for_status()
+            data = response.json()
+        finally:
+            latency = time.perf_counter() - started
+            record(self.name, latency)
+
+        usage = data.get("usage") or {}
+        log_with_context(
+            logger,
+            "debug",
+            "Anthropic call completed",
+            model=self.model_name,
+            latency_ms=round(latency * 1000, 1),
+            input_tokens=usage.get("input_tokens"),
+            output_tokens=usage.get("output_tokens")
+        )
+        return "".join(
+            block.get("text", "") for block in data.get("content", []) if block.get("type") == "text"
+        )
+
+    async def stream(
+        self, messages: List[Message], with_system_prompt: bool = True
+    ) -> AsyncIterator[str]:
+        started = time.perf_counter()
+        try:
+            async with self.client.stream(
+                "POST", "/v1/messages", json=self._payload(messages, with_system_prompt, stream=True)
+            ) as response:
+                response.raise_for_status()
+                async for line in response.aiter_lines():
+                    if not line.startswith("data:"):
+                        continue
+                    event = json.loads(line[5:])
+                    if event.get("type") == "content_block_delta":
+                        text = event.get("delta", {}).get("text")
+                        if text:
+                            yield text
+                    elif event.get("type") == "error":
+                        raise RuntimeError(event.get("error", {}).get("message", "Anthropic stream error"))
+        finally:
+            record(self.name, time.perf_counter() - started)
+
+    async def aclose(self) -> None:
+        await self.client.aclose()
+
+
+class MockBackend(LLMBackend):
+    """Canned educational answers; needs no network and never fails"""
+
+    name = "mock"
+    model_name = "mock"
+
+    def __init__(self, respond: Callable[[str], str]):
+        self.respond = respond
+
+    @staticmethod
+    def _question(messages: List[Message]) -> str:
+        return next((text for role, text in reversed(messages) if role == "user"), "")
+
+    async def generate(self, messages: List[Message], with_system_prompt: bool = True) -> str:
+        return self.respond(self._question(messages))
+
+    async def stream(
+        self, messages: List[Message], with_system_prompt: bool = True
+    ) -> AsyncIterator[str]:
+        for chunk in _MOCK_CHUNK_PATTERN.findall(self.respond(self._question(messages))):
+            yield chunk
+            await asyncio.sleep(0)
@@ -0,0 +1,496 @@
+"""
+Latency- and error-aware routing across LLM backends
+
+Backends are tried in their configured order, except that a backend whose
+recent error rate is above the failover threshold drops behind the healthy
+ones. Its error rate decays over time, so a recovered backend is probed by
+real traffic again and wins back its place. Every attempt has a timeout
+(time to first chunk for streams); a stalled provider therefore costs at
+most one timeout before the next backend is tried, and the timeout counts
+as an error.
+
+With hedging enabled, a call that has not answered by the backend's observed
+p95 latency gets a duplicate on the next backend; the first answer wins and
+the other call is cancelled. Hedging roughly bounds the tail at p95 plus the
+second backend's latency, at the cost of a few percent extra upstream calls.
+
+Each backend also has a circuit breaker: while it is open the backend is not
+called at all, and when every breaker is open the router raises
+CircuitOpenError at once so the caller can serve a fallback. Errors that are
+the request's own fault (a 400 for one prompt) don't count against a
+backend; outages, timeouts and auth/config errors do. Transient
+failures (timeouts, connection errors, 429 and 5xx) are retried with jittered
+exponential backoff, within a total time budget that also caps the timeout of
+the last attempts. Both are further capped by the request deadline (see
+app.utils.deadline); once it has passed the router raises DeadlineExceeded.
+"""
+import asyncio
+import logging
+import math
+import time
+from collections import deque
+from typing import AsyncIterator, Callable, Deque, Dict, List, Optional, Tuple
+
+import httpx
+from google.genai import errors as genai_errors
+from tenacity import (
+    AsyncRetrying,
+    RetryCallState,
+    retry_if_exception,
+    stop_after_attempt,
+    stop_before_delay,
+    wait_random_exponential,
+)
+
+from app.agents.circuit_breaker import CircuitBreaker, CircuitOpenError
+from app.agents.llm_backends import LLMBackend, Message
+from app.utils import log_with_context
+from app.utils.deadline import DeadlineExceeded, current_deadline, expired
+from app.utils.metrics import LLM_ROUTER_EVENTS
+
+logger = logging.getLogger(__name__)
+
+
+class BackendHealth:
+    """
+    Rolling latency window and time-decayed error rate of one backend
+    The error rate is an exponential moving average over outcomes that also
+    halves every error_half_life seconds without a new failure.
+    """
+
+    def __init__(
+        self,
+        window: int = 200,
+        error_alpha: float = 0.2,
+        error_half_life: float = 30.0,
+        clock: Callable[[], float] = time.monotonic
+    ):
+        self.latencies: Deque[float] = deque(maxlen=window)
+        self.error_alpha = error_alpha
+        self.error_half_life = error_half_life
+        self.clock = clock
+        self.successes = 0
+        self.failures = 0
+        self._error_rate = 0.0
+        self._decayed_at = 0.0
+        self._p95: Optional[float] = None
+
+    @property
+    def error_rate(self) -> float:
+        if not self._error_rate:
+            return 0.0
+        idle = self.clock() - self._decayed_at
+        return self._error_rate * 0.5 ** (idle / self.error_half_life)
+
+    def success(self, latency: Optional[float] = None) -> None:
+        """Record a successful call (latency only for complete, non-streamed answers)"""
+        self.successes += 1
+        self._error_rate = self.error_rate * (1 - self.error_alpha)
+        self._decayed_at = self.clock()
+        if latency is not None:
+            self.latencies.append(latency)
+            self._p95 = None
+
+    def failure(self) -> None:
+        self.failures += 1
+        self._error_rate = self.error_rate * (1 - self.error_alpha) + self.error_alpha
+        self._decayed_at = self.clock()
+
+    def p95(self, min_samples: int = 20) -> Optional[float]:
+        """95th percentile latency of recent successes, None until min_samples"""
+        if len(self.latencies) < min_samples:
+            return None
+        if self._p95 is None:
+            ordered = sorted(self.latencies)
+            self._p95 = ordered[min(len(ordered) - 1, math.ceil(0.95 * len(ordered)) - 1)]
+        return self._p95
+
+    def stats(self) -> dict:
+        p95 = self.p95()
+        return {
+            "successes": self.successes,
+            "failures": self.failures,
+            "error_rate": round(self.error_rate, 3),
+            "p95_ms": round(p95 * 1000, 1) if p95 is not None else None,
+        }
+
+
+# Client errors that mean the backend itself is unusable (bad key, no access, unknown model)
+BACKEND_CONFIG_STATUSES = frozenset({401, 403, 404})
+
+
+def _http_status(error: BaseException) -> Optional[int]:
+    """HTTP status of an upstream error response, if it has one"""
+    if isinstance(error, httpx.HTTPStatusError):
+        return error.response.status_code
+    if isinstance(error, genai_errors.APIError):
+        return error.code
+    return None
+
+
+def is_transient(error: BaseException) -> bool:
+    """Whether an upstream error is worth retrying (timeouts, connection errors, 429, 5xx)"""
+    if isinstance(error, DeadlineExceeded):
+        return False
+    if isinstance(error, (asyncio.TimeoutError, ConnectionError, httpx.TransportError)):
+        return True
+    status = _http_status(error)
+    return status is not None and (status == 429 or status >= 500)
+
+
+def is_request_error(error: BaseException) -> bool:
+    """
+    Whether an upstream error is the request's fault rather than the backend's
+    (a 4xx other than 429 and the auth/config statuses, e.g. a 400 for one
+    prompt). These are not held against the backend's circuit or error rate.
+    """
+    status = _http_status(error)
+    return (
+        status is not None and 400 <= status < 500
+        and status != 429 and status not in BACKEND_CONFIG_STATUSES
+    )
+
+
+class RouteOutcome:
+    """Filled in by LLMRouter.generate()/stream() with the backend that answered"""
+
+    def __init__(self):
+        self.backend: Optional[str] = None
+
+
+class LLMRouter:
+    """
+    Sends each generation to the best available backend
+    Raises CircuitOpenError when every backend's circuit is open, otherwise
+    the last backend's error once retries are exhausted.
+    """
+
+    def __init__(
+        self,
+        backends: List[LLMBackend],
+        attempt_timeout: float = 15.0,
+        failover_error_rate: float = 0.5,
+        hedge: bool = False,
+        hedge_min_delay: float = 0.5,
+        hedge_min_samples: int = 20,
+        failure_threshold: int = 5,
+        reset_timeout: float = 30.0,
+        retry_attempts: int = 3,
+        retry_budget: float = 20.0,
+        retry_base_delay: float = 0.25,
+        retry_max_delay: float = 2.0
+    ):
+        if not backends:
+            raise ValueError("At least one LLM backend is required")
+        self.backends = backends
+        self.attempt_timeout = attempt_timeout
+        self.failover_error_rate = failover_error_rate
+        self.hedge = hedge
+        self.hedge_min_delay = hedge_min_delay
+        self.hedge_min_samples = hedge_min_samples
+        self.retry_attempts = retry_attempts
+        self.retry_budget = retry_budget
+        self.retry_base_delay = retry_base_delay
+        self.retry_max_delay = retry_max_delay
+        self.health: Dict[str, BackendHealth] = {backend.name: BackendHealth() for backend in backends}
+        self.breakers: Dict[str, CircuitBreaker] = {
+            backend.name: CircuitBreaker(backend.name, failure_threshold, reset_timeout)
+            for backend in backends
+        }
+
+    def backend(self, name: str) -> Optional[LLMBackend]:
+        """Configured backend by name"""
+        return next((backend for backend in self.backends if backend.name == name), None)
+
+    def ranked(self) -> List[LLMBackend]:
+        """Backends in the order to try them: healthy first, then configured order"""
+        if len(self.backends) == 1:
+            return self.backends
+        return sorted(
+            self.backends,
+            key=lambda backend: self.health[backend.name].error_rate > self.failover_error_rate
+        )
+
+    @property
+    def available(self) -> bool:
+        """Whether any backend's circuit would currently let a call through"""
+        return any(breaker.state != CircuitBreaker.OPEN for breaker in self.breakers.values())
+
+    def _admit(self, backend: LLMBackend) -> bool:
+        if self.breakers[backend.name].allow():
+            return True
+        LLM_ROUTER_EVENTS.labels(backend.name, "circuit_open").inc()
+        return False
+
+    def _succeeded(self, backend: LLMBackend, latency: Optional[float] = None) -> None:
+        self.health[backend.name].success(latency)
+        self.breakers[backend.name].success()
+
+    def _failed(self, backend: LLMBackend, error: Exception) -> None:
+        if is_request_error(error):
+            # The backend answered; the request was bad. No verdict on its health.
+            self.breakers[backend.name].release()
+            LLM_ROUTER_EVENTS.labels(backend.name, "rejected").inc()
+            return
+        self.health[backend.name].failure()
+        self.breakers[backend.name].failure()
+        event = "timeout" if isinstance(error, asyncio.TimeoutError) else "error"
+        LLM_ROUTER_EVENTS.labels(backend.name, event).inc()
+        log_with_context(
+            logger,
+            "warning",
+            f"LLM backend {backend.name} failed",
+            dedupe_key=f"llm_backend_failed:{backend.name}",
+            backend=backend.name,
+            error=type(error).__name__,
+            detail=str(error)[:200],
+            circuit=self.breakers[backend.name].state
+        )
+
+    def _deadline(self) -> float:
+        """End of the retry budget, or the request deadline if that comes first"""
+        deadline = time.monotonic() + self.retry_budget
+        request_deadline = current_deadline()
+        return deadline if request_deadline is None else min(deadline, request_deadline)
+
+    def _timeout(self, deadline: float) -> float:
+        """Attempt timeout, capped by what is left of the budget"""
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            if expired():
+                raise DeadlineExceeded("Request deadline exceeded")
+            raise asyncio.TimeoutError("LLM retry budget exhausted")
+        return min(self.attempt_timeout, remaining)
+
+    def _retrying(self) -> AsyncRetrying:
+        """Jittered exponential backoff for transient errors, within the total budget"""
+        return AsyncRetrying(
+            stop=stop_after_attempt(self.retry_attempts) | stop_before_delay(self.retry_budget),
+            wait=wait_random_exponential(multiplier=self.retry_base_delay, max=self.retry_max_delay),
+            retry=retry_if_exception(is_transient),
+            before_sleep=self._before_retry,
+            reraise=True
+        )
+
+    @staticmethod
+    def _before_retry(retry_state: RetryCallState) -> None:
+        LLM_ROUTER_EVENTS.labels("router", "retry").inc()
+
+    async def _attempt(
+        self, backend: LLMBackend, messages: List[Message], with_system_prompt: bool, timeout: float
+    ) -> Tuple[LLMBackend, str]:
+        """One timed call; cancellation (a lost hedge) is not held against the backend"""
+        started = time.perf_counter()
+        try:
+            text = await asyncio.wait_for(backend.generate(messages, with_system_prompt), timeout)
+        except asyncio.CancelledError:
+            self.breakers[backend.name].release()
+            raise
+        except Exception as e:
+            if isinstance(e, asyncio.TimeoutError) and expired():
+                # Cut short by the request deadline, not the backend's fault
+                self.breakers[backend.name].release()
+                raise DeadlineExceeded("Request deadline exceeded") from e
+            self._failed(backend, e)
+            raise
+        self._succeeded(backend, time.perf_counter() - started)
+        return backend, text
+
+    async def _hedged(
+        self,
+        primary: LLMBackend,
+        secondary: LLMBackend,
+        delay: float,
+        messages: List[Message],
+        with_system_prompt: bool,
+        timeout: float,
+        deadline: float
+    ) -> Tuple[LLMBackend, str]:
+        """Call primary; if it hasn't answered after delay, race secondary against it"""
+        first = asyncio.ensure_future(self._attempt(primary, messages, with_system_prompt, timeout))
+        tasks = [first]
+        try:
+            done, _ = await asyncio.wait(tasks, timeout=delay)
+            if done and first.exception() is None:
+                return first.result()
+            timeout = self._timeout(deadline)
+            if not self._admit(secondary):
+                return await first
+
+            # Primary failed early: plain failover; still running: hedge
+            hedged = not done
+            LLM_ROUTER_EVENTS.labels(secondary.name, "hedge" if hedged else "failover").inc()
+            second = asyncio.ensure_future(self._attempt(secondary, messages, with_system_prompt, timeout))
+            tasks.append(second)
+
+            error = None if hedged else first.exception()
+            pending = {first, second} if hedged else {second}
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        if hedged and task is second:
+                            LLM_ROUTER_EVENTS.labels(secondary.name, "hedge_won").inc()
+                        return task.result()
+                    error = task.exception()
+            raise error
+        finally:
+            # The loser (or both, if our caller went away) is cancelled
+            for task in tasks:
+                if not task.done():
+                    task.cancel()
+
+    async def _route_once(
+        self, messages: List[Message], with_system_prompt: bool, deadline: float
+    ) -> Tuple[LLMBackend, str]:
+        """One pass over the ranked backends whose circuits admit a call"""
+        order = self.ranked()
+        error: Optional[BaseException] = None
+        tried = 0
+        index = 0
+        while index < len(order):
+            backend = order[index]
+            index += 1
+            timeout = self._timeout(deadline)
+            if not self._admit(backend):
+                continue
+            if tried:
+                LLM_ROUTER_EVENTS.labels(backend.name, "failover").inc()
+            tried += 1
+
+            delay = self.health[backend.name].p95(self.hedge_min_samples) if self.hedge else None
+            try:
+                if delay is not None and index < len(order):
+                    index += 1
+                    return await self._hedged(
+                        backend, order[index - 1], max(delay, self.hedge_min_delay),
+                        messages, with_system_prompt, timeout, deadline
+                    )
+                return await self._attempt(backend, messages, with_system_prompt, timeout)
+            except (asyncio.CancelledError, DeadlineExceeded):
+                raise
+            except Exception as e:
+                error = e
+
+        if error is None:
+            raise CircuitOpenError("All LLM backends are unavailable (circuit open)")
+        raise error
+
+    async def generate(
+        self,
+        messages: List[Message],
+        with_system_prompt: bool = True,
+        outcome: Optional[RouteOutcome] = None
+    ) -> str:
+        """
+        Generate a complete answer, failing over between backends
+
+        Args:
+            messages: Conversation so far, ending with the user's message
+            with_system_prompt: Send the tutor system prompt along
+            outcome: Receives the backend that answered (optional)
+
+        Returns:
+            Generated response text
+
+        Raises:
+            CircuitOpenError: Every backend's circuit is open
+            DeadlineExceeded: The request deadline passed
+        """
+        deadline = self._deadline()
+        async for attempt in self._retrying():
+            with attempt:
+                backend, text = await self._route_once(messages, with_system_prompt, deadline)
+        if outcome is not None:
+            outcome.backend = backend.name
+        return text
+
+    async def _open_stream(
+        self, messages: List[Message], with_system_prompt: bool, deadline: float
+    ) -> Tuple[LLMBackend, Optional[str], Optional[AsyncIterator[str]]]:
+        """One pass over the backends until one produces a first chunk"""
+        error: Optional[BaseException] = None
+        tried = 0
+        for backend in self.ranked():
+            timeout = self._timeout(deadline)
+            if not self._admit(backend):
+                continue
+            if tried:
+                LLM_ROUTER_EVENTS.labels(backend.name, "failover").inc()
+            tried += 1
+
+            chunks = backend.stream(messages, with_system_prompt)
+            try:
+                first = await asyncio.wait_for(chunks.__anext__(), timeout)
+            except StopAsyncIteration:
+                self._succeeded(backend)
+                return backend, None, None
+            except asyncio.CancelledError:
+                self.breakers[backend.name].release()
+                raise
+            except Exception as e:
+                await chunks.aclose()
+                if isinstance(e, asyncio.TimeoutError) and expired():
+                    self.breakers[backend.name].release()
+                    raise DeadlineExceeded("Request deadline exceeded") from e
+                self._failed(backend, e)
+                error = e
+                continue
+            return backend, first, chunks
+
+        if error is None:
+            raise CircuitOpenError("All LLM backends are unavailable (circuit open)")
+        raise error
+
+    async def stream(
+        self,
+        messages: List[Message],
+        with_system_prompt: bool = True,
+        outcome: Optional[RouteOutcome] = None
+    ) -> AsyncIterator[str]:
+        """
+        Stream an answer, failing over and retrying until the first chunk arrives
+        Once text has been sent a failure can no longer be hidden and is raised.
+        outcome (optional) receives the backend that answered.
+        """
+        deadline = self._deadline()
+        async for attempt in self._retrying():
+            with attempt:
+                backend, first, chunks = await self._open_stream(messages, with_system_prompt, deadline)
+        if outcome is not None:
+            outcome.backend = backend.name
+        if chunks is None:
+            return
+
+        settled = False
+        try:
+            yield first
+            async for chunk in chunks:
+                yield chunk
+            self._succeeded(backend)
+            settled = True
+        except Exception as e:
+            self._failed(backend, e)
+            settled = True
+            raise
+        finally:
+            if not settled:
+                # Abandoned by the consumer: no verdict on the backend
+                self.breakers[backend.name].release()
+                await chunks.aclose()
+
+    def stats(self) -> Dict[str, dict]:
+        """Per-backend health and circuit state for the readiness probe"""
+        return {
+            backend.name: {
+                "model": backend.model_name,
+                "healthy": self.health[backend.name].error_rate <= self.failover_error_rate,
+                **self.health[backend.name].stats(),
+                "circuit": self.breakers[backend.name].stats(),
+            }
+            for backend in self.backends
+        }
+
+    async def aclose(self) -> None:
+        for backend in self.backends:
+            await backend.aclose()
@@ -5,11 +5,33 @@ This agent helps SMB owners learn about cybersecurity in simple terms.
 Focus: OWASP Top 10, GenAI security, LLM vulnerabilities
 """
 
-import os
-import google.genai as genai
-from google.genai import types
-
+import asyncio
+import logging
+import time
+from typing import AsyncIterator, List, NamedTuple, Optional
+
+from app.agents.circuit_breaker import CircuitOpenError
+from app.agents.conversation_store import Conversation, ConversationStore
+from app.agents.faq import FAQ
+from app.agents.llm_backends import (
+    AnthropicBackend,
+    GeminiBackend,
+    LLMBackend,
+    Message,
+    MockBackend,
+)
+from app.agents.llm_router import LLMRouter, RouteOutcome
+from app.agents.response_cache import ResponseCache, fingerprint
+from app.agents.single_flight import SingleFlight
+from app.agents.tip_pool import TipPool
+from app.agents.topics import build_catalog
 from app.config import settings
+from app.utils import log_with_context
+from app.utils.deadline import DeadlineExceeded
+from app.utils.metrics import FAQ_HIT, FAQ_MISS, TIP_POOL_HIT, TIP_POOL_MISS
+from app.utils.request_timing import phase, record
+
+logger = logging.getLogger(__name__)
 
 # System prompt for the OWASP Tutor
 TUTOR_SYSTEM_PROMPT = """You are Professor Shield, a friendly and patient cybersecurity teacher for small business owners.
@@ -42,283 +64,443 @@ When explaining vulnerabilities:
 Remember: Your students are busy business owners, not developers. Keep it practical and actionable.
 """
 
+# Version tag for cached answers; editing the prompt invalidates them
+PROMPT_VERSION = fingerprint(TUTOR_SYSTEM_PROMPT)
 
-class OWASPTutor:
-    """OWASP Tutor Agent - Educational AI for cybersecurity"""
+# Model turn answering the conversation summary, so user and model turns alternate
+SUMMARY_ACKNOWLEDGEMENT = "Thanks, I have the earlier conversation in mind."
 
-    def __init__(self):
-        """Initialize the agent with Google Gemini"""
-        # Initialize Google GenAI client directly (bypassing Pydantic AI's outdated wrapper)
-        self.client = genai.Client(api_key=settings.GEMINI_API_KEY)
+# Served when no generated tip is available
+FALLBACK_TIP = "🔒 Enable two-factor authentication (2FA) on all business accounts. This single step blocks 99% of automated attacks!"
 
-        # Use latest Gemini Flash model
-        self.model_name = "gemini-2.5-flash"
+# Which tier produced an answer (reported to clients as "tier")
+TIER_FAQ = "faq"            # pre-written answer to a canonical question
+TIER_CACHE = "cache"        # earlier LLM answer from the response cache
+TIER_LLM = "llm"            # generated upstream for this request (or a coalesced twin)
+TIER_OFFLINE = "offline"    # topic catalog or stale cache, upstream unavailable or mock mode
+TIER_ERROR = "error"        # the apology
 
-    async def chat(self, user_message: str, conversation_history: list = None) -> str:
-        """
-        Process a chat message and return response
 
-        Args:
-            user_message: The user's question or message
-            conversation_history: Previous messages (optional)
+class TutorReply(NamedTuple):
+    """An answer and the tier that produced it"""
+    text: str
+    tier: str
 
-        Returns:
-            Agent's response as string
-        """
-        # Mock mode for testing (when Gemini API isn't working)
-        if settings.USE_MOCK_RESPONSES:
-            return self._get_mock_response(user_message)
-
-        try:
-            # Build conversation with system prompt
-            contents = [
-                types.Content(
-                    role="user",
-                    parts=[types.Part(text=TUTOR_SYSTEM_PROMPT)]
-                ),
-                types.Content(
-                    role="model",
-                    parts=[types.Part(text="Understood! I'm Professor Shield, ready to teach cybersecurity in a friendly, practical way.")]
-                ),
-                types.Content(
-                    role="user",
-                    parts=[types.Part(text=user_message)]
-                )
-            ]
 
-            # Generate response using direct API
-            response = self.client.models.generate_content(
-                model=self.model_name,
-                contents=contents
-            )
+class StreamOutcome:
+    """Filled in by chat_stream() once the stream ends"""
 
-            return response.text
+    def __init__(self):
+        self.tier: Optional[str] = None
 
-        except Exception as e:
-            # Graceful error handling
-            return (
-                "I apologize, but I'm having trouble processing that right now. "
-                f"Could you try rephrasing your question? (Error: {str(e)[:100]})"
-            )
 
-    def _get_mock_response(self, user_message: str) -> str:
-        """
-        Return educational mock responses for testing
+class OWASPTutor:
+    """OWASP Tutor Agent - Educational AI for cybersecurity"""
 
-        This allows testing the full chat flow while fixing Gemini API
+    def __init__(self):
+        """Initialize the agent with the configured LLM backends"""
+        # Offline topic answers: mock mode, and the degraded tier when upstream is down
+        self.topics = build_catalog()
+        self.mock = MockBackend(self.topics.answer)
+        # Canonical questions answered before the tutor is involved (see the chat route)
+        self.faq = FAQ(self.topics)
+
+        # Backends in failover order behind a latency- and error-aware router
+        self.router = LLMRouter(
+            self._build_backends(),
+            attempt_timeout=settings.LLM_ATTEMPT_TIMEOUT_SECONDS,
+            failover_error_rate=settings.LLM_FAILOVER_ERROR_RATE,
+            hedge=settings.LLM_HEDGE_ENABLED,
+            hedge_min_delay=settings.LLM_HEDGE_MIN_DELAY_SECONDS,
+            failure_threshold=settings.LLM_CIRCUIT_FAILURE_THRESHOLD,
+            reset_timeout=settings.LLM_CIRCUIT_RESET_SECONDS,
+            retry_attempts=settings.LLM_RETRY_ATTEMPTS,
+            retry_budget=settings.LLM_RETRY_BUDGET_SECONDS
+        )
+
+        # Primary model, part of the response cache key; only its answers are cached
+        self.model_name = self.router.backends[0].model_name
+
+        # Caps in-flight upstream calls so one worker can't flood the providers
+        self._upstream_slots = asyncio.Semaphore(settings.GEMINI_MAX_CONCURRENT_REQUESTS)
+
+        # Cache answers to repeated questions (None when disabled)
+        self.response_cache = ResponseCache(
+            max_bytes=settings.RESPONSE_CACHE_MAX_BYTES,
+            ttl_seconds=settings.RESPONSE_CACHE_TTL_SECONDS,
+            stale_seconds=settings.RESPONSE_CACHE_STALE_SECONDS
+        ) if settings.RESPONSE_CACHE_ENABLED else None
+
+        # Coalesces identical requests that arrive before the cache is filled
+        self._inflight = SingleFlight()
+
+        # Server-side conversations so clients only send the new message
+        self.conversations = ConversationStore(
+            max_conversations=settings.CONVERSATION_MAX_SESSIONS,
+            idle_ttl_seconds=settings.CONVERSATION_IDLE_TTL_SECONDS,
+            context_token_budget=settings.CONVERSATION_CONTEXT_TOKEN_BUDGET,
+            summary_token_budget=settings.CONVERSATION_SUMMARY_TOKEN_BUDGET
+        )
+
+        # Quick tips are generated in the background and served from memory
+        self.tip_pool = TipPool(
+            self._generate_tip,
+            max_size=settings.QUICK_TIP_POOL_SIZE,
+            refill_interval=settings.QUICK_TIP_REFILL_INTERVAL_SECONDS,
+            refresh_interval=settings.QUICK_TIP_REFRESH_INTERVAL_SECONDS
+        )
+
+    def coalescing_stats(self) -> dict:
+        """Requests currently in flight and how many joined one instead of calling upstream"""
+        return self._inflight.stats()
+
+    def _build_backends(self) -> List[LLMBackend]:
+        """Instantiate the backends named in LLM_BACKENDS, skipping unconfigured ones"""
+        backends: List[LLMBackend] = []
+        for name in settings.llm_backends:
+            if name == "gemini" and settings.GEMINI_API_KEY:
+                backends.append(GeminiBackend(
+                    api_key=settings.GEMINI_API_KEY,
+                    model_name=settings.GEMINI_MODEL,
+                    system_prompt=TUTOR_SYSTEM_PROMPT,
+                    base_url=settings.GEMINI_BASE_URL,
+                    use_context_cache=settings.GEMINI_CONTEXT_CACHE_ENABLED,
+                    cache_ttl_seconds=settings.GEMINI_CONTEXT_CACHE_TTL_SECONDS
+                ))
+            elif name == "anthropic" and settings.ANTHROPIC_API_KEY:
+                backends.append(AnthropicBackend(
+                    api_key=settings.ANTHROPIC_API_KEY,
+                    model_name=settings.ANTHROPIC_MODEL,
+                    system_prompt=TUTOR_SYSTEM_PROMPT,
+                    base_url=settings.ANTHROPIC_BASE_URL,
+                    max_tokens=settings.ANTHROPIC_MAX_TOKENS
+                ))
+            elif name == "mock":
+                backends.append(self.mock)
+            elif name not in ("gemini", "anthropic"):
+                logger.warning(f"Ignoring unknown LLM backend {name!r}")
+
+        # Nothing usable configured: answer from the topic catalog
+        return backends or [self.mock]
+
+    async def _generate(
+        self,
+        messages: List[Message],
+        with_system_prompt: bool = True,
+        outcome: Optional[RouteOutcome] = None
+    ) -> str:
         """
-        msg_lower = user_message.lower()
-
-        # Detect topic and return appropriate response
-        if "xss" in msg_lower or "cross-site scripting" in msg_lower:
-            return """🔒 **Cross-Site Scripting (XSS) Explained**
-
-Hello! Great question about XSS! Let me break this down for you.
-
-**What is it?**
-Think of XSS like a burglar slipping a fake note into your mailbox that tricks your security system. Attackers inject malicious code (usually JavaScript) into websites that other users will see and execute.
-
-**Why it matters for your business:**
-- Attackers can steal user session cookies
-- They can capture login credentials
-- They can deface your website
-- Users' browsers trust the malicious code because it comes from YOUR site
-
-**How to protect yourself:**
-1. **Validate ALL user input** - Never trust what users type in
-2. **Escape output** - Convert special characters to safe versions
-3. **Use Content Security Policy (CSP)** - Tell browsers what scripts are allowed
-4. **Use modern frameworks** - React, Vue, Angular escape by default
-
-**Real example:**
-Imagine a comment section where someone posts:
-```
-<script>steal_cookies()</script>
-```
-
-Without protection, this runs on everyone's browser who views the comment!
-
-**Quick wins:**
-✅ Use prepared statements in your code
-✅ Enable CSP headers on your web server
-✅ Keep your frameworks updated
-
-Any questions about XSS? I'm here to help! 🛡️
-
-*Note: This is a demo response. Full AI coming soon!*"""
-
-        elif "sql injection" in msg_lower or "sqli" in msg_lower:
-            return """🔒 **SQL Injection Explained**
-
-Excellent question! SQL injection is one of the most dangerous vulnerabilities.
-
-**What is it?**
-Imagine a restaurant where you can write your own order. Instead of "1 burger," you write "1 burger AND access to the kitchen AND all the recipes." That's SQL injection - tricking the database into running malicious commands.
-
-**Why it matters:**
-- Attackers can steal your ENTIRE database
-- They can delete or modify data
-- They can bypass authentication (login without passwords!)
-- Your customer data is at risk
-
-**How to protect:**
-1. **Use Prepared Statements** - Separate data from commands
-2. **Input Validation** - Check what users type
-3. **Least Privilege** - Database users should have minimal permissions
-4. **WAF** - Web Application Firewall can block attacks
-
-**Real attack example:**
-```sql
-Username: admin' OR '1'='1
-Password: anything
-```
-
-This tricks the system into thinking '1'='1' (always true) so you're logged in!
-
-**Quick wins:**
-✅ Never build SQL queries with string concatenation
-✅ Use ORM frameworks (they handle this automatically)
-✅ Regularly audit your database queries
-
-Want to dive deeper into any aspect? 🛡️
-
-*Demo mode - Real AI coming soon!*"""
-
-        elif "csrf" in msg_lower or "cross-site request" in msg_lower:
-            return """🔒 **CSRF (Cross-Site Request Forgery) Explained**
-
-Great security question!
-
-**What is it?**
-Think of CSRF like someone forging your signature on a check. A malicious website tricks YOUR browser into performing actions on another site where you're logged in.
-
-**Why it matters:**
-- Attackers can change your account settings
-- They can make purchases with your stored payment info
-- They can delete data or transfer money
-- All while you're innocently browsing another site!
-
-**How it works:**
-1. You log into YourBank.com
-2. You visit EvilSite.com (without logging out)
-3. EvilSite has hidden code: `<img src="YourBank.com/transfer?to=hacker&amount=1000">`
-4. Your browser sends the request WITH your cookies! 💸
-
-**How to protect:**
-1. **CSRF Tokens** - Unique tokens for each request
-2. **SameSite Cookies** - Prevent cookies from being sent cross-site
-3. **Check Referer Header** - Verify request origin
-4. **Re-authentication** - Ask for password on sensitive actions
+        Generate an answer through the router without blocking the event loop
 
-**Quick wins:**
-✅ Use CSRF protection in your framework (Django, Rails have it built-in)
-✅ Set `SameSite=Strict` on cookies
-✅ Require re-auth for money transfers/settings changes
-
-Questions? I'm here! 🛡️
-
-*Demo response - Full AI coming soon!*"""
-
-        elif "hello" in msg_lower or "hi" in msg_lower or "hey" in msg_lower:
-            return """👋 **Hello! I'm Professor Shield!**
-
-Welcome to SMBShield! I'm here to teach you about cybersecurity in a way that actually makes sense.
-
-**What I can help you with:**
-🔐 OWASP Top 10 vulnerabilities
-🤖 AI & LLM security risks
-🛡️ Practical security tips for your business
-📋 EU compliance basics (GDPR, NIS2)
-
-**Try asking me:**
-- "What is XSS?"
-- "How does SQL injection work?"
-- "What are the OWASP Top 10?"
-- "How can I secure my website?"
-- "What is prompt injection?"
-
-I'll explain everything in plain English with real-world examples!
-
-**Remember:** No question is too simple. Security is for everyone! 🎓
-
-What would you like to learn about today?
-
-*Currently in demo mode - full AI responses coming soon!*"""
+        Args:
+            messages: Conversation to send upstream
+            with_system_prompt: Send the tutor system prompt along
+            outcome: Receives the backend that answered (optional)
 
-        elif "owasp top 10" in msg_lower or "owasp top ten" in msg_lower:
-            return """🔒 **The OWASP Top 10 - Your Essential Security Checklist**
+        Returns:
+            Generated response text
+        """
+        waiting = time.perf_counter()
+        async with self._upstream_slots:
+            record("queue", time.perf_counter() - waiting)
+            return await self.router.generate(messages, with_system_prompt, outcome)
+
+    async def _generate_stream(
+        self, messages: List[Message], outcome: Optional[RouteOutcome] = None
+    ) -> AsyncIterator[str]:
+        """
+        Stream an answer through the router as it is produced
 
-Great question! The OWASP Top 10 is like a "Most Wanted" list for web vulnerabilities.
+        Args:
+            messages: Conversation to send upstream
+            outcome: Receives the backend that answered (optional)
 
-**The 2021 OWASP Top 10:**
+        Yields:
+            Text chunks in generation order
+        """
+        waiting = time.perf_counter()
+        async with self._upstream_slots:
+            record("queue", time.perf_counter() - waiting)
+            async for chunk in self.router.stream(messages, outcome=outcome):
+                yield chunk
 
-1. **Broken Access Control** - Users accessing things they shouldn't
-2. **Cryptographic Failures** - Weak encryption or storing passwords in plain text
-3. **Injection** - SQL injection, command injection, XSS
-4. **Insecure Design** - Security flaws in how the app was built
-5. **Security Misconfiguration** - Default passwords, unnecessary features enabled
-6. **Vulnerable Components** - Using outdated libraries with known flaws
-7. **Authentication Failures** - Weak login systems, session management
-8. **Data Integrity Failures** - Not verifying data hasn't been tampered with
-9. **Logging Failures** - Not logging security events (can't detect attacks!)
-10. **Server-Side Request Forgery (SSRF)** - Tricking servers into making malicious requests
+    def _cacheable(self, route: RouteOutcome) -> bool:
+        """
+        Whether an answer may be cached: only the primary backend's, since the
+        cache key names the primary model (failover answers would outlive the outage)
+        """
+        return self.response_cache is not None and route.backend == self.router.backends[0].name
 
-**Why it matters:**
-These 10 vulnerabilities cause 90%+ of web security breaches!
+    def _build_messages(
+        self, user_message: str, conversation: Optional[Conversation] = None
+    ) -> List[Message]:
+        """
+        Build the conversation sent upstream (the system prompt travels separately)
 
-**Want to learn more?**
-Ask me about any specific vulnerability! For example:
-- "Tell me about Broken Access Control"
-- "What is SSRF?"
-- "How do I fix Security Misconfiguration?"
+        Roles alternate: the running summary is a user turn, answered by a
+        short acknowledgement unless the oldest kept turn is already a reply.
+        """
+        messages: List[Message] = []
+        if conversation is not None:
+            if conversation.summary_lines:
+                messages.append(("user", f"Summary of our conversation so far:\n{conversation.summary}"))
+                if not conversation.turns or conversation.turns[0][0] == "user":
+                    messages.append(("assistant", SUMMARY_ACKNOWLEDGEMENT))
+            messages.extend(conversation.turns)
+
+        messages.append(("user", user_message))
+        return messages
+
+    def _cache_key(self, user_message: str, conversation_history: list = None) -> str:
+        """Cache key for a request under the current model and prompt"""
+        return ResponseCache.make_key(
+            user_message, conversation_history, self.model_name, PROMPT_VERSION
+        )
+
+    def _remember(
+        self, conversation: Optional[Conversation], user_message: str, reply: str
+    ) -> None:
+        """Record a completed exchange in the server-side conversation"""
+        if conversation is not None:
+            self.conversations.record(conversation, user_message, reply)
+
+    @staticmethod
+    def _error_reply(error: Exception) -> str:
+        """Friendly reply used when the upstream call fails (details go to the log only)"""
+        log_with_context(
+            logger,
+            "error",
+            "Tutor upstream call failed",
+            dedupe_key=f"tutor_upstream_failed:{type(error).__name__}",
+            error=type(error).__name__,
+            detail=str(error)[:200]
+        )
+        return (
+            "I apologize, but I'm having trouble processing that right now. "
+            "Please try again in a moment."
+        )
+
+    def _fallback_reply(self, cache_key: str, user_message: str, generic: bool = True) -> Optional[str]:
+        """
+        Answer served without upstream: a stale cached answer, else the topic catalog
 
-🛡️ **Quick win:** Start with #1 and work your way down!
+        Args:
+            cache_key: Response cache key of the request
+            user_message: The user's message
+            generic: Answer unmatched questions with the catalog's generic
+                answer (otherwise None is returned for them)
+        """
+        stale = self.response_cache.get_stale(cache_key) if self.response_cache is not None else None
+        if stale is not None:
+            return stale
+        topic = self.topics.match(user_message)
+        if topic is None and not generic:
+            return None
+        return self.topics.answer(user_message, topic)
+
+    def faq_reply(
+        self, user_message: str, conversation: Optional[Conversation] = None
+    ) -> Optional[TutorReply]:
+        """
+        Pre-written answer if the message is a canonical question, else None
 
-*Demo mode - Real Professor Shield coming soon!*"""
+        Args:
+            user_message: The user's sanitized message
+            conversation: Server-side conversation to record the exchange in
+        """
+        if not settings.FAQ_ENABLED:
+            return None
+        answer = self.faq.lookup(user_message)
+        if answer is None:
+            FAQ_MISS.inc()
+            return None
+        FAQ_HIT.inc()
+        self._remember(conversation, user_message, answer)
+        return TutorReply(answer, TIER_FAQ)
+
+    async def chat(
+        self,
+        user_message: str,
+        conversation_history: list = None,
+        conversation: Optional[Conversation] = None
+    ) -> str:
+        """
+        Process a chat message and return response
 
-        else:
-            # Generic educational response
-            return f"""🤔 **Interesting question about: "{user_message[:100]}..."**
+        Args:
+            user_message: The user's question or message
+            conversation_history: Previous messages (optional)
+            conversation: Server-side conversation to continue (optional, takes
+                precedence over conversation_history)
 
-I'm Professor Shield, your cybersecurity tutor! While I'm in demo mode right now, I can still help you learn!
+        Returns:
+            Agent's response as string
 
-**Popular topics I cover:**
-🔐 **Vulnerabilities:** XSS, SQL Injection, CSRF, SSRF, etc.
-🤖 **AI Security:** Prompt injection, data leakage, model poisoning
-📋 **Compliance:** GDPR, NIS2 basics
-🛡️ **Best Practices:** Authentication, encryption, secure coding
+        Raises:
+            DeadlineExceeded: The request deadline passed before an answer arrived
+        """
+        reply = await self.reply(user_message, conversation_history, conversation)
+        return reply.text
+
+    async def reply(
+        self,
+        user_message: str,
+        conversation_history: list = None,
+        conversation: Optional[Conversation] = None
+    ) -> TutorReply:
+        """
+        Same as chat(), also reporting which tier answered
 
-**Try asking:**
-- "What is SQL injection?"
-- "Explain XSS in simple terms"
-- "What are the OWASP Top 10?"
-- "How does CSRF work?"
-- "What is prompt injection?"
+        Raises:
+            DeadlineExceeded: The request deadline passed before an answer arrived
+        """
+        # Mock mode for testing (when Gemini API isn't working)
+        if settings.USE_MOCK_RESPONSES:
+            response_text = self.topics.answer(user_message)
+            self._remember(conversation, user_message, response_text)
+            return TutorReply(response_text, TIER_OFFLINE)
+
+        context = conversation.context() if conversation is not None else conversation_history
+        with phase("cache"):
+            cache_key = self._cache_key(user_message, context)
+            cached = self.response_cache.get(cache_key) if self.response_cache is not None else None
+        if cached is not None:
+            self._remember(conversation, user_message, cached)
+            return TutorReply(cached, TIER_CACHE)
+
+        messages = self._build_messages(user_message, conversation)
+        tier = TIER_LLM
+        try:
+            # Identical concurrent requests share a single upstream call
+            # ("upstream" includes waiting on a coalesced call; "queue" and the
+            # backend's phase break down the call this request started, if any)
+            with phase("upstream"):
+                response_text = await self._inflight.do(
+                    cache_key,
+                    lambda: self._generate_and_cache(cache_key, messages)
+                )
 
-I'll explain everything step-by-step with real-world examples!
+        except CircuitOpenError:
+            # Upstream is known to be down: answer at once from stale cache or canned content
+            response_text = self._fallback_reply(cache_key, user_message)
+            tier = TIER_OFFLINE
+        except DeadlineExceeded:
+            # Out of time: the route answers 504
+            raise
+        except Exception as e:
+            # Upstream failed: a stale or catalog answer on the topic beats an apology
+            apology = self._error_reply(e)
+            response_text = self._fallback_reply(cache_key, user_message, generic=False)
+            if response_text is None:
+                return TutorReply(apology, TIER_ERROR)
+            tier = TIER_OFFLINE
+
+        self._remember(conversation, user_message, response_text)
+        return TutorReply(response_text, tier)
+
+    async def _generate_and_cache(self, cache_key: str, messages: List[Message]) -> str:
+        """Generate an answer upstream and store it in the response cache"""
+        # Generate response without blocking other requests
+        route = RouteOutcome()
+        response_text = await self._generate(messages, outcome=route)
+
+        if response_text and self._cacheable(route):
+            self.response_cache.set(cache_key, response_text)
+        return response_text
+
+    async def chat_stream(
+        self,
+        user_message: str,
+        conversation_history: list = None,
+        conversation: Optional[Conversation] = None,
+        outcome: Optional[StreamOutcome] = None
+    ) -> AsyncIterator[str]:
+        """
+        Process a chat message and stream the response as it is generated
 
-Security doesn't have to be scary - let's learn together! 🎓
+        Args:
+            user_message: The user's question or message
+            conversation_history: Previous messages (optional)
+            conversation: Server-side conversation to continue (optional, takes
+                precedence over conversation_history)
+            outcome: Receives the tier that answered (optional)
 
-*Note: Demo mode active. Full AI responses coming when Gemini API is configured!*"""
+        Yields:
+            Response text chunks
+        """
+        outcome = outcome if outcome is not None else StreamOutcome()
 
-    async def get_quick_tip(self) -> str:
-        """Generate a quick security tip"""
+        # Mock mode streams the canned response word by word
+        if settings.USE_MOCK_RESPONSES:
+            outcome.tier = TIER_OFFLINE
+            chunks = []
+            async for chunk in self.mock.stream([("user", user_message)]):
+                chunks.append(chunk)
+                yield chunk
+            self._remember(conversation, user_message, "".join(chunks))
+            return
+
+        context = conversation.context() if conversation is not None else conversation_history
+        cache_key = self._cache_key(user_message, context)
+        if self.response_cache is not None:
+            cached = self.response_cache.get(cache_key)
+            if cached is not None:
+                outcome.tier = TIER_CACHE
+                yield cached
+                self._remember(conversation, user_message, cached)
+                return
+
+        chunks = []
+        outcome.tier = TIER_LLM
+        route = RouteOutcome()
         try:
-            prompt = "Give me one quick, actionable cybersecurity tip for a small business owner. Keep it under 50 words."
-
-            # Use direct API
-            response = self.client.models.generate_content(
-                model=self.model_name,
-                contents=[types.Content(
-                    role="user",
-                    parts=[types.Part(text=prompt)]
-                )]
-            )
-
-            return response.text
+            async for chunk in self._generate_stream(self._build_messages(user_message, conversation), route):
+                chunks.append(chunk)
+                yield chunk
+
+        except CircuitOpenError:
+            # Raised before any text was sent, so the fallback is the whole answer
+            response_text = self._fallback_reply(cache_key, user_message)
+            outcome.tier = TIER_OFFLINE
+            yield response_text
+            self._remember(conversation, user_message, response_text)
+            return
+        except DeadlineExceeded:
+            raise
         except Exception as e:
-            # Fallback tip
-            return "🔒 Enable two-factor authentication (2FA) on all business accounts. This single step blocks 99% of automated attacks!"
+            apology = self._error_reply(e)
+            response_text = None if chunks else self._fallback_reply(cache_key, user_message, generic=False)
+            if response_text is None:
+                # Same graceful reply as chat(), appended to whatever was already sent
+                outcome.tier = TIER_ERROR
+                yield apology
+                return
+            outcome.tier = TIER_OFFLINE
+            yield response_text
+            self._remember(conversation, user_message, response_text)
+            return
+
+        if chunks:
+            response_text = "".join(chunks)
+            if self._cacheable(route):
+                self.response_cache.set(cache_key, response_text)
+            self._remember(conversation, user_message, response_text)
+
+    async def _generate_tip(self) -> str:
+        """Generate a fresh security tip upstream (used to fill the tip pool)"""
+        prompt = "Give me one quick, actionable cybersecurity tip for a small business owner. Keep it under 50 words."
+
+        return await self._generate([("user", prompt)], with_system_prompt=False)
+
+    async def get_quick_tip(self) -> str:
+        """Get a quick security tip from the pre-generated pool"""
+        tip = self.tip_pool.get()
+        if tip is None:
+            # Fallback tip while the pool is empty or the providers are down
+            TIP_POOL_MISS.inc()
+            return FALLBACK_TIP
+        TIP_POOL_HIT.inc()
+        return tip
 
 
 # Global instance (singleton pattern)
@@ -0,0 +1,128 @@
+"""
+System prompt reuse for Gemini requests
+
+The tutor's system prompt is sent as a system instruction built once per
+process. When context caching is enabled, the prompt is uploaded once as
+Gemini cached content and requests reference it by name instead; the handle
+is refreshed before it expires. If the prompt can't be cached (a 4xx such
+as the prompt being below the model's minimum cacheable size) we fall back
+to the plain system instruction for good. Other failures (timeouts, 429,
+5xx) only fall back for a while: creation is retried with exponential
+backoff, and a still-valid handle keeps being used in the meantime.
+"""
+import asyncio
+import logging
+import time
+from typing import Callable, Optional
+
+from google.genai import errors as genai_errors
+from google.genai import types
+
+logger = logging.getLogger(__name__)
+
+
+class SystemPromptCache:
+    """
+    Provides the GenerateContentConfig carrying the system prompt
+    Uses a cached-content handle when enabled, else a prebuilt system instruction
+    """
+
+    def __init__(
+        self,
+        client,
+        model_name: str,
+        system_prompt: str,
+        use_context_cache: bool = False,
+        ttl_seconds: int = 3600,
+        refresh_margin_seconds: int = 300,
+        retry_base_seconds: float = 30.0,
+        retry_max_seconds: float = 900.0,
+        clock: Callable[[], float] = time.monotonic
+    ):
+        self.client = client
+        self.model_name = model_name
+        self.system_prompt = system_prompt
+        self.use_context_cache = use_context_cache
+        self.ttl_seconds = ttl_seconds
+        self.refresh_margin_seconds = refresh_margin_seconds
+        self.retry_base_seconds = retry_base_seconds
+        self.retry_max_seconds = retry_max_seconds
+        self.clock = clock
+
+        # Static scaffolding, built once per process
+        self.instruction_config = types.GenerateContentConfig(system_instruction=system_prompt)
+
+        self._cached_config: Optional[types.GenerateContentConfig] = None
+        self._cache_name: Optional[str] = None
+        self._refresh_at = 0.0
+        self._expires_at = 0.0
+        # Consecutive failed creations, for the backoff
+        self._failures = 0
+        self._lock = asyncio.Lock()
+
+    async def config(self) -> types.GenerateContentConfig:
+        """Return the config to send with a tutor request"""
+        if not self.use_context_cache:
+            return self.instruction_config
+
+        # Before _refresh_at: the current handle, or the instruction while backing off
+        if self.clock() < self._refresh_at:
+            return self._cached_config or self.instruction_config
+
+        async with self._lock:
+            # Another request may have refreshed the handle while we waited
+            if self.use_context_cache and self.clock() >= self._refresh_at:
+                await self._refresh()
+
+        return self._cached_config or self.instruction_config
+
+    async def _refresh(self) -> None:
+        """Create a new cached-content handle for the system prompt"""
+        try:
+            cached = await self.client.aio.caches.create(
+                model=self.model_name,
+                config=types.CreateCachedContentConfig(
+                    system_instruction=self.system_prompt,
+                    ttl=f"{self.ttl_seconds}s"
+                )
+            )
+        except genai_errors.ClientError as e:
+            if e.code in (408, 429):
+                self._back_off(e)
+                return
+            # Not cacheable - stick to the system instruction
+            logger.warning(f"Context caching disabled, using system instruction: {str(e)[:100]}")
+            self.use_context_cache = False
+            self._cached_config = None
+            self._cache_name = None
+            return
+        except Exception as e:
+            self._back_off(e)
+            return
+
+        now = self.clock()
+        self._failures = 0
+        self._cache_name = cached.name
+        self._cached_config = types.GenerateContentConfig(cached_content=cached.name)
+        self._expires_at = now + self.ttl_seconds
+        self._refresh_at = self._expires_at - self.refresh_margin_seconds
+        logger.info(f"System prompt cached as {cached.name}")
+
+    def _back_off(self, error: Exception) -> None:
+        """Retry creation later, keeping the current handle until it expires"""
+        self._failures += 1
+        delay = min(self.retry_max_seconds, self.retry_base_seconds * 2 ** (self._failures - 1))
+        now = self.clock()
+        if now >= self._expires_at:
+            self._cached_config = None
+            self._cache_name = None
+        retry_at = now + delay
+        if self._cached_config is not None:
+            retry_at = min(retry_at, self._expires_at)
+        self._refresh_at = retry_at
+        logger.warning(f"Context cache creation failed, retrying in {retry_at - now:.0f}s: {str(error)[:100]}")
+
+    @property
+    def cache_name(self) -> Optional[str]:
+        """Name of the current cached-content handle, if any"""
+        return self._cache_name
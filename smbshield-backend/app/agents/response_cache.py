@@ -0,0 +1,149 @@
+"""
+Response cache for tutor answers
+
+In-memory LRU cache with TTL and a byte budget. Keys combine the normalized
+question, the conversation context, the model name and the system prompt
+version, so changing the prompt or model invalidates old answers automatically.
+"""
+import hashlib
+import json
+import re
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+
+from app.utils.metrics import RESPONSE_CACHE_HIT, RESPONSE_CACHE_MISS
+
+# Rough per-entry bookkeeping cost (key, tuple, OrderedDict node)
+_ENTRY_OVERHEAD_BYTES = 200
+
+_WHITESPACE = re.compile(r"\s+")
+
+
+def normalize_message(message: str) -> str:
+    """
+    Normalize a sanitized message for cache lookups
+
+    Case, repeated whitespace and trailing punctuation don't change the
+    answer, so "What is XSS?" and "what is xss" share an entry.
+    """
+    return _WHITESPACE.sub(" ", message).strip().casefold().rstrip("?!. ")
+
+
+def fingerprint(text: str) -> str:
+    """Short stable hash of a string"""
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()[:16]
+
+
+def context_fingerprint(conversation_history: Optional[list]) -> str:
+    """Hash of the conversation context sent alongside a message"""
+    if not conversation_history:
+        return "-"
+    return fingerprint(json.dumps(conversation_history, sort_keys=True, ensure_ascii=False))
+
+
+class ResponseCache:
+    """
+    LRU cache with TTL and a byte budget
+    Tracks hits, misses and evictions for monitoring. Expired entries are
+    kept for stale_seconds more, for get_stale() when an upstream call fails.
+    """
+
+    def __init__(
+        self,
+        max_bytes: int = 8 * 1024 * 1024,
+        ttl_seconds: float = 3600,
+        stale_seconds: float = 0
+    ):
+        self.max_bytes = max_bytes
+        self.ttl_seconds = ttl_seconds
+        self.stale_seconds = stale_seconds
+        # Format: {key: (value, expires_at, size_bytes)}, least recently used first
+        self._entries: "OrderedDict[str, Tuple[str, float, int]]" = OrderedDict()
+        self._bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @staticmethod
+    def make_key(
+        message: str,
+        conversation_history: Optional[list],
+        model_name: str,
+        prompt_version: str
+    ) -> str:
+        """Build the cache key for a tutor request"""
+        return "|".join((
+            model_name,
+            prompt_version,
+            context_fingerprint(conversation_history),
+            fingerprint(normalize_message(message)),
+        ))
+
+    def get(self, key: str) -> Optional[str]:
+        """Return the cached answer, or None on a miss or expired entry"""
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            RESPONSE_CACHE_MISS.inc()
+            return None
+
+        value, expires_at, _ = entry
+        now = time.monotonic()
+        if expires_at <= now:
+            if expires_at + self.stale_seconds <= now:
+                self._remove(key)
+            self.misses += 1
+            RESPONSE_CACHE_MISS.inc()
+            return None
+
+        self._entries.move_to_end(key)
+        self.hits += 1
+        RESPONSE_CACHE_HIT.inc()
+        return value
+
+    def get_stale(self, key: str) -> Optional[str]:
+        """Return the answer even if expired (within stale_seconds), without counting a lookup"""
+        entry = self._entries.get(key)
+        if entry is None or entry[1] + self.stale_seconds <= time.monotonic():
+            return None
+        return entry[0]
+
+    def set(self, key: str, value: str) -> None:
+        """Store an answer, evicting least recently used entries to fit the budget"""
+        size = len(key) + len(value.encode("utf-8")) + _ENTRY_OVERHEAD_BYTES
+        if size > self.max_bytes:
+            return
+
+        if key in self._entries:
+            self._remove(key)
+
+        self._entries[key] = (value, time.monotonic() + self.ttl_seconds, size)
+        self._bytes += size
+
+        while self._bytes > self.max_bytes:
+            oldest_key = next(iter(self._entries))
+            self._remove(oldest_key)
+            self.evictions += 1
+
+    def _remove(self, key: str) -> None:
+        _, _, size = self._entries.pop(key)
+        self._bytes -= size
+
+    def clear(self) -> None:
+        """Drop all entries (counters are kept)"""
+        self._entries.clear()
+        self._bytes = 0
+
+    def stats(self) -> Dict[str, Any]:
+        """Hit/miss counters and memory use"""
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "bytes": self._bytes,
+            "max_bytes": self.max_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+        }
@@ -0,0 +1,97 @@
+"""
+Single-flight coalescing for identical in-flight requests
+
+Concurrent callers that share a key await one shared upstream call instead
+of each starting their own. The call runs in its own task, so a caller that
+disconnects doesn't cancel the work for everyone else; the call is only
+cancelled once no callers are left waiting for it.
+
+Callers may have different request deadlines, so the shared call runs
+without one and each caller stops waiting (DeadlineExceeded) at its own.
+"""
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, TypeVar
+
+from app.utils.deadline import DeadlineExceeded, remaining, without_deadline
+from app.utils.metrics import COALESCED_REQUESTS
+
+T = TypeVar("T")
+
+
+class _Call:
+    """A shared upstream call and the number of callers waiting on it"""
+
+    __slots__ = ("task", "waiters")
+
+    def __init__(self, task: asyncio.Task):
+        self.task = task
+        self.waiters = 0
+
+
+class SingleFlight:
+    """
+    Coalesce concurrent calls that share a key into one execution
+    Results and exceptions are delivered to every waiting caller
+    """
+
+    def __init__(self):
+        self._calls: Dict[str, _Call] = {}
+        self.coalesced = 0
+
+    async def do(self, key: str, fn: Callable[[], Awaitable[T]]) -> T:
+        """
+        Run fn() once for all concurrent callers with the same key
+
+        Args:
+            key: Identity of the call (requests with equal keys are interchangeable)
+            fn: Zero-argument coroutine factory performing the actual work
+
+        Returns:
+            The shared result of fn()
+
+        Raises:
+            DeadlineExceeded: This caller's deadline passed while waiting
+            Whatever fn() raised, in every waiting caller
+        """
+        call = self._calls.get(key)
+        if call is None:
+            task = asyncio.get_running_loop().create_task(fn(), context=without_deadline())
+            call = _Call(task)
+            self._calls[key] = call
+            call.task.add_done_callback(lambda _: self._forget(key, call))
+        else:
+            self.coalesced += 1
+            COALESCED_REQUESTS.inc()
+
+        call.waiters += 1
+        try:
+            # shield() keeps one caller's cancellation from cancelling the shared task
+            seconds = remaining()
+            if seconds is None:
+                return await asyncio.shield(call.task)
+            try:
+                async with asyncio.timeout(max(seconds, 0)):
+                    return await asyncio.shield(call.task)
+            except TimeoutError as e:
+                if call.task.done():
+                    raise
+                raise DeadlineExceeded("Request deadline exceeded") from e
+        finally:
+            call.waiters -= 1
+            if call.waiters == 0 and not call.task.done():
+                # Last interested caller went away - stop the upstream work.
+                # Forget it first so newcomers start a fresh call instead of
+                # joining one that is being cancelled.
+                self._forget(key, call)
+                call.task.cancel()
+
+    def _forget(self, key: str, call: _Call) -> None:
+        if self._calls.get(key) is call:
+            del self._calls[key]
+
+    def stats(self) -> Dict[str, Any]:
+        """Number of shared calls in flight and callers coalesced so far"""
+        return {
+            "in_flight": len(self._calls),
+            "coalesced": self.coalesced,
+        }
@@ -0,0 +1,112 @@
+"""
+Pre-generated pool of quick security tips
+
+Tips are generated in the background at a controlled rate and served from
+memory, so the quick-tip endpoint never waits on the model.
+"""
+import asyncio
+import logging
+import random
+from collections import deque
+from typing import Awaitable, Callable, Deque, Optional, Set
+
+from app.agents.response_cache import fingerprint, normalize_message
+
+logger = logging.getLogger(__name__)
+
+
+class TipPool:
+    """
+    In-memory pool of de-duplicated tips with background replenishment
+
+    While the pool is below its target size a new tip is generated every
+    refill_interval seconds. Once full, one tip is rotated every
+    refresh_interval seconds to keep the selection fresh. Upstream failures
+    back off exponentially up to max_backoff.
+    """
+
+    def __init__(
+        self,
+        generate: Callable[[], Awaitable[str]],
+        max_size: int = 20,
+        refill_interval: float = 5.0,
+        refresh_interval: float = 900.0,
+        max_backoff: float = 600.0
+    ):
+        self._generate = generate
+        self.max_size = max_size
+        self.refill_interval = refill_interval
+        self.refresh_interval = refresh_interval
+        self.max_backoff = max_backoff
+        self._tips: Deque[str] = deque()
+        self._fingerprints: Set[str] = set()
+        self._task: Optional[asyncio.Task] = None
+
+    def __len__(self) -> int:
+        return len(self._tips)
+
+    def get(self) -> Optional[str]:
+        """Return a random pooled tip, or None if the pool is empty"""
+        if not self._tips:
+            return None
+        return random.choice(self._tips)
+
+    def add(self, tip: str) -> bool:
+        """
+        Add a tip, rotating out the oldest one when the pool is full
+
+        Returns:
+            False if the tip is empty or a duplicate of a pooled tip
+        """
+        tip = tip.strip()
+        if not tip:
+            return False
+
+        tip_fingerprint = fingerprint(normalize_message(tip))
+        if tip_fingerprint in self._fingerprints:
+            return False
+
+        if len(self._tips) >= self.max_size:
+            oldest = self._tips.popleft()
+            self._fingerprints.discard(fingerprint(normalize_message(oldest)))
+
+        self._tips.append(tip)
+        self._fingerprints.add(tip_fingerprint)
+        return True
+
+    async def refill_once(self) -> bool:
+        """Generate one tip and add it to the pool"""
+        return self.add(await self._generate())
+
+    async def run(self) -> None:
+        """Replenish the pool forever (run as a background task)"""
+        backoff = self.refill_interval
+        while True:
+            try:
+                await self.refill_once()
+                backoff = self.refill_interval
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning(f"Quick tip generation failed: {str(e)[:100]}")
+                backoff = min(backoff * 2, self.max_backoff)
+                await asyncio.sleep(backoff)
+                continue
+
+            full = len(self._tips) >= self.max_size
+            await asyncio.sleep(self.refresh_interval if full else self.refill_interval)
+
+    def start(self) -> None:
+        """Start background replenishment on the running event loop"""
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self.run())
+
+    async def stop(self) -> None:
+        """Stop background replenishment"""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
@@ -0,0 +1,147 @@
+"""
+Offline answer engine for the tutor
+
+Answers come from a catalog of topics (app.agents.topics), each with the
+keywords that identify it. Keywords are indexed by their first word, so a
+message is matched in a single pass over its words with one dict lookup per
+word; at each word the longest keyword wins ("sql injection" over
+"injection"), and whole words only ("hi" no longer fires inside "this").
+
+The catalog answers in mock mode and is the zero-latency degraded tier when
+no LLM backend can answer.
+"""
+import re
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Optional, Tuple
+
+# Words are runs of letters and digits; anything else (spaces, hyphens,
+# punctuation) separates them, so "cross-site" matches "cross site"
+_WORD = re.compile(r"[^\W_]+")
+
+# Reference codes in titles, e.g. "Injection (A03)"
+_TITLE_CODE = re.compile(r"\s*\(([^)]*)\)")
+
+
+@dataclass(frozen=True)
+class Topic:
+    """A topic the tutor can answer offline"""
+
+    slug: str
+    title: str
+    keywords: Tuple[str, ...]
+    answer: str
+    # Other names the topic is asked about by ("sqli"); with the title and
+    # slug these are its canonical subjects (see TopicCatalog.subject_for)
+    aliases: Tuple[str, ...] = ()
+    # Matches add this much to the topic's score; broad topics (greetings,
+    # overviews) use less so a specific topic in the same message wins
+    weight: float = 1.0
+
+
+def _words(text: str) -> List[str]:
+    return _WORD.findall(text.casefold())
+
+
+class TopicCatalog:
+    """
+    Keyword index over a set of topics
+    The index is built once; matching costs one dict lookup per word of the
+    message, plus a comparison per candidate keyword starting with that word.
+    """
+
+    def __init__(self, topics: Iterable[Topic], generic_answer: str):
+        """
+        Args:
+            topics: Topics to index (keywords are matched case-insensitively)
+            generic_answer: Answer for unmatched messages; "{question}" is
+                replaced by the start of the message
+        """
+        self.topics: Dict[str, Topic] = {}
+        self.generic_answer = generic_answer
+
+        # Keyword words -> topic
+        self._keywords: Dict[Tuple[str, ...], Topic] = {}
+        for topic in topics:
+            if topic.slug in self.topics:
+                raise ValueError(f"Duplicate topic {topic.slug!r}")
+            self.topics[topic.slug] = topic
+            for keyword in topic.keywords:
+                words = tuple(_words(keyword))
+                if not words:
+                    raise ValueError(f"Topic {topic.slug!r} has an empty keyword")
+                owner = self._keywords.setdefault(words, topic)
+                if owner is not topic:
+                    raise ValueError(
+                        f"Keyword {keyword!r} belongs to both {owner.slug!r} and {topic.slug!r}"
+                    )
+
+        # Canonical subjects -> topic: names of the topic itself, not every
+        # keyword used for scoring ("encryption" is not Cryptographic Failures)
+        self._subjects: Dict[Tuple[str, ...], Topic] = {}
+        for topic in self.topics.values():
+            for name in (*self._names(topic), *topic.aliases):
+                words = tuple(_words(name))
+                # A name that is another topic's keyword is ambiguous
+                if not words or self._keywords.get(words, topic) is not topic:
+                    continue
+                owner = self._subjects.setdefault(words, topic)
+                if owner is not topic:
+                    raise ValueError(
+                        f"Subject {name!r} belongs to both {owner.slug!r} and {topic.slug!r}"
+                    )
+
+        # First word -> (remaining words, topic), longest keywords first
+        self._index: Dict[str, List[Tuple[Tuple[str, ...], Topic]]] = {}
+        for words, topic in sorted(self._keywords.items(), key=lambda item: len(item[0]), reverse=True):
+            self._index.setdefault(words[0], []).append((words[1:], topic))
+
+    @staticmethod
+    def _names(topic: Topic) -> Tuple[str, ...]:
+        """Title without its leading article or code, the code, and the slug"""
+        title = re.sub(r"^the\s+", "", _TITLE_CODE.sub("", topic.title), flags=re.IGNORECASE)
+        return (title, *_TITLE_CODE.findall(topic.title), topic.slug)
+
+    def subject_for(self, phrase: str) -> Optional[Topic]:
+        """Topic that this phrase names exactly (title, code, slug or alias), or None"""
+        return self._subjects.get(tuple(_words(phrase)))
+
+    def match(self, message: str) -> Optional[Topic]:
+        """
+        Best topic for a message, or None
+
+        Every keyword hit adds its topic's weight; the highest score wins
+        and ties go to the topic mentioned first.
+        """
+        words = _words(message)
+        scores: Dict[str, float] = {}
+        position = 0
+        while position < len(words):
+            candidates = self._index.get(words[position])
+            position += 1
+            if candidates is None:
+                continue
+            for rest, topic in candidates:
+                if tuple(words[position:position + len(rest)]) == rest:
+                    # Dicts keep insertion order, so max() breaks ties by first mention
+                    scores[topic.slug] = scores.get(topic.slug, 0.0) + topic.weight
+                    position += len(rest)
+                    break
+        if not scores:
+            return None
+        return self.topics[max(scores, key=scores.__getitem__)]
+
+    def answer(self, message: str, topic: Optional[Topic] = None) -> str:
+        """
+        Catalog answer for a message
+
+        Args:
+            message: The user's (sanitized) message
+            topic: Topic already matched for this message, to skip the scan
+
+        Returns:
+            The matched topic's answer, or the generic answer
+        """
+        topic = topic or self.match(message)
+        if topic is not None:
+            return topic.answer
+        return self.generic_answer.replace("{question}", message[:100])
@@ -1,10 +1,26 @@
 """
 Chat API routes - OWASP Tutor interactions
 """
-from fastapi import APIRouter, HTTPException, status
-from app.models.schemas import ChatRequest, ChatResponse
-from app.agents.owasp_tutor import get_tutor
+from typing import AsyncIterator, Dict, List, Optional, Tuple
+from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi.responses import StreamingResponse
+from app.config import settings
+from app.models.schemas import (
+    ChatBatchRequest,
+    ChatBatchResponse,
+    ChatBatchResult,
+    ChatRequest,
+    ChatResponse,
+    ChatStreamEnd
+)
+from app.agents.conversation_store import Conversation
+from app.agents.owasp_tutor import OWASPTutor, StreamOutcome, get_tutor
+from app.middleware.auth import require_api_key
 from app.utils import sanitize_user_input, sanitize_conversation_history
+from app.utils.deadline import DeadlineExceeded
+from app.utils.request_timing import phase
+import asyncio
+import json
 import logging
 
 logger = logging.getLogger(__name__)
@@ -12,6 +28,35 @@ logger = logging.getLogger(__name__)
 router = APIRouter(prefix="/chat", tags=["Chat"])
 
 
+def _prepare_chat(request: ChatRequest, tutor: OWASPTutor) -> Tuple[str, Conversation]:
+    """
+    Sanitize the new message and open its server-side conversation
+
+    Client-sent history is only sanitized when it seeds a new conversation;
+    known conversations already hold their history server-side.
+
+    Raises:
+        HTTPException: 400 if the input is rejected by sanitization
+    """
+    # Sanitize user input to prevent XSS and injection attacks
+    try:
+        with phase("sanitize"):
+            sanitized_message = sanitize_user_input(request.message)
+
+            conversation = tutor.conversations.get(request.conversation_id)
+            if conversation is None:
+                history = [m.model_dump() for m in request.conversation_history or []]
+                conversation = tutor.conversations.create(sanitize_conversation_history(history))
+    except ValueError as e:
+        logger.warning(f"Invalid input detected: {str(e)}")
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+
+    return sanitized_message, conversation
+
+
 @router.post("/", response_model=ChatResponse, status_code=status.HTTP_200_OK)
 async def chat_with_tutor(request: ChatRequest):
     """
@@ -26,35 +71,37 @@ async def chat_with_tutor(request: ChatRequest):
     Perfect for SMB owners learning about security!
     """
     try:
-        # Sanitize user input to prevent XSS and injection attacks
-        try:
-            sanitized_message = sanitize_user_input(request.message)
-            sanitized_history = sanitize_conversation_history(request.conversation_history)
-        except ValueError as e:
-            logger.warning(f"Invalid input detected: {str(e)}")
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail=str(e)
-            )
-
         # Get the tutor agent
         tutor = get_tutor()
 
+        sanitized_message, conversation = _prepare_chat(request, tutor)
+
+        # Canonical questions get a pre-written answer without an LLM call
+        with phase("faq"):
+            reply = tutor.faq_reply(sanitized_message, conversation)
+
         # Process the sanitized message
-        response_text = await tutor.chat(
-            user_message=sanitized_message,
-            conversation_history=sanitized_history
-        )
+        if reply is None:
+            reply = await tutor.reply(
+                user_message=sanitized_message,
+                conversation=conversation
+            )
 
         # Return response
         return ChatResponse(
-            response=response_text,
-            conversation_id=None  # We'll add conversation tracking later
+            response=reply.text,
+            conversation_id=conversation.id,
+            tier=reply.tier
         )
 
     except HTTPException:
         # Re-raise HTTP exceptions
         raise
+    except DeadlineExceeded:
+        raise HTTPException(
+            status_code=status.HTTP_504_GATEWAY_TIMEOUT,
+            detail="Request timed out. Please try again."
+        )
     except Exception as e:
         logger.error(f"Chat error: {str(e)}")
         raise HTTPException(
@@ -63,6 +110,166 @@ async def chat_with_tutor(request: ChatRequest):
         )
 
 
+def _sse_event(event: str, data: str) -> str:
+    """Format a single Server-Sent Events frame"""
+    return f"event: {event}\ndata: {data}\n\n"
+
+
+@router.post("/stream", status_code=status.HTTP_200_OK)
+async def stream_chat_with_tutor(request: ChatRequest):
+    """
+    Chat with Professor Shield and stream the answer as Server-Sent Events
+
+    Emits `token` events (`{"text": "..."}`) as the answer is generated,
+    then a single `done` event carrying the conversation metadata.
+    """
+    tutor = get_tutor()
+
+    # Validate before the stream starts so bad input still gets a plain 400
+    sanitized_message, conversation = _prepare_chat(request, tutor)
+
+    # Canonical questions get a pre-written answer, sent as a single token
+    with phase("faq"):
+        faq = tutor.faq_reply(sanitized_message, conversation)
+
+    async def event_stream() -> AsyncIterator[str]:
+        outcome = StreamOutcome()
+        try:
+            if faq is not None:
+                outcome.tier = faq.tier
+                yield _sse_event("token", json.dumps({"text": faq.text}))
+            else:
+                async for chunk in tutor.chat_stream(
+                    user_message=sanitized_message,
+                    conversation=conversation,
+                    outcome=outcome
+                ):
+                    yield _sse_event("token", json.dumps({"text": chunk}))
+        except DeadlineExceeded:
+            yield _sse_event(
+                "error",
+                json.dumps({"detail": "Request timed out. Please try again.", "status": 504})
+            )
+            return
+        except Exception as e:
+            logger.error(f"Chat stream error: {str(e)}")
+            yield _sse_event(
+                "error",
+                json.dumps({"detail": "Failed to process chat message. Please try again."})
+            )
+            return
+
+        yield _sse_event(
+            "done",
+            ChatStreamEnd(conversation_id=conversation.id, tier=outcome.tier).model_dump_json()
+        )
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={
+            "Cache-Control": "no-cache",
+            "X-Accel-Buffering": "no",  # Stop proxies from buffering the stream
+        }
+    )
+
+
+async def _answer_batch_prompt(tutor: OWASPTutor, message: str) -> Tuple[Optional[str], Optional[str], Optional[str]]:
+    """Answer one sanitized batch prompt as (response, tier, error), never raising"""
+    try:
+        reply = tutor.faq_reply(message)
+        if reply is None:
+            reply = await tutor.reply(user_message=message)
+        return reply.text, reply.tier, None
+    except DeadlineExceeded:
+        return None, None, "Request timed out. Please try again."
+    except Exception as e:
+        logger.error(f"Batch chat error: {str(e)}")
+        return None, None, "Failed to process chat message. Please try again."
+
+
+@router.post("/batch", status_code=status.HTTP_200_OK, dependencies=[Depends(require_api_key)])
+async def batch_chat_with_tutor(request: ChatBatchRequest):
+    """
+    Answer many independent prompts in one request, streamed as Server-Sent Events
+
+    Requires a valid API key even when the rest of the API is public. Prompts
+    are sanitized up front; rejected ones fail on their own without stopping
+    the batch. The rest are answered CHAT_BATCH_CONCURRENCY at a time, going
+    through the FAQ and response cache like single chats; identical prompts
+    are answered once.
+
+    Emits a `result` event (ChatBatchResult) per prompt as it completes, then
+    a single `done` event (ChatBatchResponse) with every result in prompt order.
+    """
+    if len(request.prompts) > settings.CHAT_BATCH_MAX_PROMPTS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Too many prompts (max {settings.CHAT_BATCH_MAX_PROMPTS})"
+        )
+
+    tutor = get_tutor()
+    results: List[Optional[ChatBatchResult]] = [None] * len(request.prompts)
+
+    # Bulk sanitization: each distinct prompt once, rejections become per-item errors
+    work: List[Tuple[str, List[int]]] = []
+    with phase("sanitize"):
+        positions: Dict[str, List[int]] = {}
+        for index, prompt in enumerate(request.prompts):
+            positions.setdefault(prompt, []).append(index)
+        for prompt, indexes in positions.items():
+            try:
+                work.append((sanitize_user_input(prompt), indexes))
+            except ValueError as e:
+                for index in indexes:
+                    results[index] = ChatBatchResult(index=index, error=str(e))
+
+    async def event_stream() -> AsyncIterator[str]:
+        completed: asyncio.Queue = asyncio.Queue()
+        pending = iter(work)
+
+        async def worker() -> None:
+            # Workers share one iterator, so at most CHAT_BATCH_CONCURRENCY prompts run at once
+            for message, indexes in pending:
+                completed.put_nowait((indexes, await _answer_batch_prompt(tutor, message)))
+
+        workers = [
+            asyncio.create_task(worker())
+            for _ in range(min(max(1, settings.CHAT_BATCH_CONCURRENCY), len(work)))
+        ]
+        try:
+            for result in results:
+                if result is not None:
+                    yield _sse_event("result", result.model_dump_json())
+
+            for _ in range(len(work)):
+                indexes, (text, tier, error) = await completed.get()
+                for index in indexes:
+                    results[index] = ChatBatchResult(index=index, response=text, tier=tier, error=error)
+                    yield _sse_event("result", results[index].model_dump_json())
+        finally:
+            # Client gone or deadline passed: stop answering
+            for task in workers:
+                task.cancel()
+
+        failed = sum(result.error is not None for result in results)
+        yield _sse_event(
+            "done",
+            ChatBatchResponse(
+                results=results, succeeded=len(results) - failed, failed=failed
+            ).model_dump_json()
+        )
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={
+            "Cache-Control": "no-cache",
+            "X-Accel-Buffering": "no",  # Stop proxies from buffering the stream
+        }
+    )
+
+
 @router.get("/quick-tip", status_code=status.HTTP_200_OK)
 async def get_security_tip():
     """
@@ -0,0 +1,65 @@
+"""
+Lesson API routes - OWASP content library
+"""
+from typing import Optional
+from fastapi import APIRouter, HTTPException, Query, Request, Response, status
+from app.content.lessons import get_lesson_library
+from app.models.schemas import LessonDetail, LessonList, LessonSearchResults
+
+router = APIRouter(prefix="/lessons", tags=["Lessons"])
+
+# Lessons only change with a deploy
+_CACHE_CONTROL = "public, max-age=300"
+
+
+def _json(request: Request, body: bytes, etag: str) -> Response:
+    """Send a pre-serialized payload, or 304 if the client already has this bundle's version"""
+    headers = {"ETag": etag, "Cache-Control": _CACHE_CONTROL}
+    if request.headers.get("if-none-match") == etag:
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    return Response(content=body, media_type="application/json", headers=headers)
+
+
+@router.get("/", response_model=LessonList)
+async def list_lessons(
+    request: Request,
+    category: Optional[str] = Query(None, max_length=50, description="e.g. owasp-top-10, owasp-llm-top-10"),
+    difficulty: Optional[str] = Query(None, max_length=20, description="beginner, intermediate or advanced"),
+    offset: int = Query(0, ge=0),
+    limit: int = Query(20, ge=1, le=100)
+):
+    """
+    List lessons, optionally filtered by category and difficulty
+
+    Served from the precompiled lesson bundle; unknown filters return an empty page.
+    """
+    library = get_lesson_library()
+    return _json(request, library.page(category, difficulty, offset, limit), library.etag)
+
+
+@router.get("/search", response_model=LessonSearchResults)
+async def search_lessons(
+    request: Request,
+    q: str = Query(..., min_length=1, max_length=200, description="Words to search for"),
+    category: Optional[str] = Query(None, max_length=50),
+    difficulty: Optional[str] = Query(None, max_length=20),
+    limit: int = Query(10, ge=1, le=50)
+):
+    """
+    Search lesson content, examples and key takeaways
+
+    Ranked with BM25 over an index built with the lesson bundle. Words also
+    match as prefixes ("crypto") and with a single typo ("injcetion").
+    """
+    library = get_lesson_library()
+    return _json(request, library.search(q, category, difficulty, limit), library.etag)
+
+
+@router.get("/{lesson_id}", response_model=LessonDetail)
+async def get_lesson(request: Request, lesson_id: str):
+    """Get a lesson's full content"""
+    library = get_lesson_library()
+    body = library.detail(lesson_id)
+    if body is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Lesson not found")
+    return _json(request, body, library.etag)
@@ -2,10 +2,31 @@
 Configuration management for SMBShield API
 """
 
-from typing import List
+import logging
+from typing import Dict, List
 
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
+logger = logging.getLogger(__name__)
+
+
+def _parse_number_map(setting: str, raw: str) -> Dict[str, float]:
+    """Parse "key=number,..." into a dict, skipping (and warning about) malformed entries"""
+    parsed = {}
+    for item in raw.split(","):
+        key, _, value = item.partition("=")
+        if not key.strip() and not value.strip():
+            continue
+        try:
+            number = float(value)
+        except ValueError:
+            number = None
+        if not key.strip() or number is None or number < 0:
+            logger.warning("Ignoring malformed %s entry: %r", setting, item.strip())
+            continue
+        parsed[key.strip()] = number
+    return parsed
+
 
 class Settings(BaseSettings):
     """Application settings loaded from environment variables"""
@@ -15,19 +36,122 @@ class Settings(BaseSettings):
     PROJECT_NAME: str = "SMBShield API"
     DEBUG: bool = True
 
+    # Logging: format and write log lines on a background thread
+    LOG_QUEUE_ENABLED: bool = True
+    # Repeated warnings (rate limit / auth rejections) are summarized once per interval
+    LOG_AGGREGATION_INTERVAL_SECONDS: float = 60.0
+    # Fraction of repeats still logged individually, per logger (e.g. "app.middleware.auth=0.1")
+    LOG_SAMPLE_RATIOS: str = ""
+    # Requests at least this slow get an INFO "Request completed" line with their phase timings
+    # (faster ones only at DEBUG)
+    REQUEST_LOG_MIN_DURATION_MS: float = 1000.0
+
+    @property
+    def log_sample_ratios(self) -> Dict[str, float]:
+        """Parse LOG_SAMPLE_RATIOS string into {logger name: ratio}"""
+        return _parse_number_map("LOG_SAMPLE_RATIOS", self.LOG_SAMPLE_RATIOS)
+
     # Security
     SECRET_KEY: str
     ALGORITHM: str = "HS256"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 30
 
+    # Reverse proxies allowed to report the client IP (comma-separated IPs/CIDRs)
+    TRUSTED_PROXIES: str = ""
+    # Header the trusted proxy puts the client IP in (X-Forwarded-For is the fallback)
+    CLIENT_IP_HEADER: str | None = "Fly-Client-IP"
+
+    @property
+    def trusted_proxies(self) -> List[str]:
+        """Parse TRUSTED_PROXIES string into list"""
+        return [proxy.strip() for proxy in self.TRUSTED_PROXIES.split(",") if proxy.strip()]
+
     # AI Configuration
     ANTHROPIC_API_KEY: str | None = None
     GEMINI_API_KEY: str
+    # Override the Gemini API endpoint (e.g. the local fake used for load tests)
+    GEMINI_BASE_URL: str | None = None
+    GEMINI_MODEL: str = "gemini-2.5-flash"
+    ANTHROPIC_MODEL: str = "claude-3-5-haiku-latest"
+    ANTHROPIC_BASE_URL: str = "https://api.anthropic.com"
+    ANTHROPIC_MAX_TOKENS: int = 1024
+
+    # LLM backends in failover order (gemini, anthropic, mock); ones without an API key are skipped
+    LLM_BACKENDS: str = "gemini,anthropic"
+    # Max seconds per backend attempt (to the first chunk when streaming) before failing over
+    LLM_ATTEMPT_TIMEOUT_SECONDS: float = 15.0
+    # Backends erroring more often than this (decaying average) drop behind healthy ones
+    LLM_FAILOVER_ERROR_RATE: float = 0.5
+    # Duplicate a slow call on the next backend once it passes the observed p95 latency
+    LLM_HEDGE_ENABLED: bool = False
+    LLM_HEDGE_MIN_DELAY_SECONDS: float = 0.5
+    # Transient errors (timeouts, 429, 5xx) are retried with jittered backoff within this budget
+    LLM_RETRY_ATTEMPTS: int = 3
+    LLM_RETRY_BUDGET_SECONDS: float = 20.0
+    # Consecutive failures that open a backend's circuit, and seconds before it is probed again
+    LLM_CIRCUIT_FAILURE_THRESHOLD: int = 5
+    LLM_CIRCUIT_RESET_SECONDS: float = 30.0
+
+    @property
+    def llm_backends(self) -> List[str]:
+        """Parse LLM_BACKENDS string into list"""
+        return [name.strip().lower() for name in self.LLM_BACKENDS.split(",") if name.strip()]
 
     # API Security
     API_KEY: str | None = None  # Optional API key for protected endpoints
     REQUIRE_API_KEY: bool = False  # Set to True in production
 
+    # Request deadlines: work is cancelled and 504 returned once they pass
+    REQUEST_DEADLINE_SECONDS: float = 30.0
+    # Per-route overrides by path prefix (e.g. "/api/v1/chat/stream=120")
+    ROUTE_DEADLINES: str = "/api/v1/chat/stream=120,/api/v1/chat/batch=300,/health=5"
+
+    @property
+    def route_deadlines(self) -> Dict[str, float]:
+        """Parse ROUTE_DEADLINES string into {path prefix: seconds}"""
+        return _parse_number_map("ROUTE_DEADLINES", self.ROUTE_DEADLINES)
+
+    # Rate limiting per client
+    RATE_LIMIT_PER_MINUTE: int = 20
+    RATE_LIMIT_PER_HOUR: int = 100
+
+    # Gemini concurrency: max in-flight upstream calls per worker process
+    GEMINI_MAX_CONCURRENT_REQUESTS: int = 32
+
+    # Gemini context caching for the system prompt (falls back to system_instruction)
+    GEMINI_CONTEXT_CACHE_ENABLED: bool = False
+    GEMINI_CONTEXT_CACHE_TTL_SECONDS: int = 3600
+
+    # Response cache for repeated tutor questions
+    RESPONSE_CACHE_ENABLED: bool = True
+    RESPONSE_CACHE_TTL_SECONDS: int = 3600
+    RESPONSE_CACHE_MAX_BYTES: int = 8 * 1024 * 1024
+    # Expired answers kept this much longer, served when the upstream call fails (or every circuit is open)
+    RESPONSE_CACHE_STALE_SECONDS: int = 86400
+
+    # Canonical questions ("What is XSS?") answered with pre-written answers, no LLM call
+    FAQ_ENABLED: bool = True
+
+    # Batch chat (API key only): prompts per request (at most 1000), and how many are answered at once
+    CHAT_BATCH_MAX_PROMPTS: int = 100
+    CHAT_BATCH_CONCURRENCY: int = 8
+
+    # Server-side conversations (older turns folded into a running summary)
+    CONVERSATION_MAX_SESSIONS: int = 2000
+    CONVERSATION_IDLE_TTL_SECONDS: int = 1800
+    CONVERSATION_CONTEXT_TOKEN_BUDGET: int = 1500
+    CONVERSATION_SUMMARY_TOKEN_BUDGET: int = 300
+
+    # Quick tip pool (filled in the background, served from memory)
+    QUICK_TIP_POOL_SIZE: int = 20
+    QUICK_TIP_REFILL_INTERVAL_SECONDS: float = 5.0
+    QUICK_TIP_REFRESH_INTERVAL_SECONDS: float = 900.0
+
+    # Prometheus metrics endpoint (public unless METRICS_TOKEN is set)
+    METRICS_ENABLED: bool = True
+    METRICS_PATH: str = "/metrics"
+    METRICS_TOKEN: str | None = None  # Require "Authorization: Bearer <token>" to scrape
+
     # Mock mode for testing (when Gemini API isn't working)
     USE_MOCK_RESPONSES: bool = False  # Set to True for mock responses
 
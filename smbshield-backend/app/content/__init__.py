@@ -0,0 +1 @@
+"""Learning content: lesson sources and the precompiled bundle the API serves"""
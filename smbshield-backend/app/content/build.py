@@ -0,0 +1,152 @@
+"""
+Compile the lesson sources into the bundle served by the lessons API
+
+Lessons are written as TOML files in app/content/lessons/ (one per lesson,
+named after its id). An optional search_terms list names what a lesson is
+about beyond its title; it is only indexed, never served. The build validates every lesson against the API
+schema and stores the summary and detail payloads already serialized, so
+the API only loads the bundle and sends bytes. It also builds the search
+index (app.content.search) over the lessons' sections.
+
+    python -m app.content.build          # write app/content/lessons.bundle.json
+    python -m app.content.build --check  # exit 1 if the bundle is missing or stale
+"""
+import argparse
+import hashlib
+import json
+import sys
+import tomllib
+from pathlib import Path
+from typing import List, Optional, Sequence, Tuple
+
+from app.content.search import build_index
+from app.models.schemas import LessonDetail, LessonSummary
+
+CONTENT_DIR = Path(__file__).parent
+SOURCE_DIR = CONTENT_DIR / "lessons"
+BUNDLE_PATH = CONTENT_DIR / "lessons.bundle.json"
+
+# Bumped when the bundle layout changes; older bundles are rebuilt
+BUNDLE_FORMAT = 3
+
+DIFFICULTIES = ("beginner", "intermediate", "advanced")
+
+
+def source_files(source_dir: Path = SOURCE_DIR) -> List[Path]:
+    """Lesson sources in catalog order (file name order)"""
+    return sorted(source_dir.glob("*.toml"))
+
+
+def source_digest(source_dir: Path = SOURCE_DIR) -> str:
+    """Hash of every source file's name and contents"""
+    digest = hashlib.sha256(str(BUNDLE_FORMAT).encode("utf-8"))
+    for path in source_files(source_dir):
+        digest.update(path.name.encode("utf-8"))
+        digest.update(path.read_bytes())
+    return digest.hexdigest()[:16]
+
+
+def load_lesson(path: Path) -> Tuple[LessonDetail, List[str]]:
+    """
+    Parse and validate one lesson source
+
+    Returns:
+        (lesson, its search terms)
+
+    Raises:
+        ValueError: The file is not valid TOML, doesn't match the schema, its
+            id doesn't match the file name or its difficulty is unknown
+    """
+    try:
+        with path.open("rb") as source:
+            data = tomllib.load(source)
+        search_terms = data.pop("search_terms", [])
+        if not isinstance(search_terms, list) or not all(isinstance(term, str) for term in search_terms):
+            raise ValueError("search_terms must be a list of strings")
+        lesson = LessonDetail(**data)
+    except (tomllib.TOMLDecodeError, ValueError) as e:
+        raise ValueError(f"{path.name}: {e}") from e
+
+    if lesson.id != path.stem:
+        raise ValueError(f"{path.name}: id {lesson.id!r} doesn't match the file name")
+    if lesson.difficulty not in DIFFICULTIES:
+        raise ValueError(f"{path.name}: difficulty must be one of {', '.join(DIFFICULTIES)}")
+    # TOML multi-line strings keep their trailing newline
+    lesson.content = lesson.content.strip()
+    return lesson, search_terms
+
+
+def lesson_sections(lesson: LessonDetail, search_terms: Sequence[str] = ()) -> List[Tuple[str, str]]:
+    """(kind, text) sections a lesson is searched by: title, search terms, paragraphs, examples, takeaways"""
+    sections = [("title", lesson.title)]
+    if search_terms:
+        sections.append(("terms", ", ".join(search_terms)))
+    paragraphs = (paragraph.strip() for paragraph in lesson.content.split("\n\n"))
+    sections.extend(("content", paragraph) for paragraph in paragraphs if paragraph)
+    sections.extend(("example", example) for example in lesson.examples)
+    sections.extend(("takeaway", takeaway) for takeaway in lesson.key_takeaways)
+    return sections
+
+
+def compile_bundle(source_dir: Path = SOURCE_DIR) -> dict:
+    """
+    Build the lesson bundle from the sources
+
+    Returns:
+        {"format", "digest", "lessons": [{"id", "category", "difficulty",
+        "summary": JSON text, "detail": JSON text}], "search": search index}
+    """
+    lessons = []
+    sections = []
+    for position, path in enumerate(source_files(source_dir)):
+        lesson, search_terms = load_lesson(path)
+        sections.extend(
+            (position, kind, text) for kind, text in lesson_sections(lesson, search_terms)
+        )
+        summary = LessonSummary(**lesson.model_dump(include=set(LessonSummary.model_fields)))
+        lessons.append({
+            "id": lesson.id,
+            "category": lesson.category,
+            "difficulty": lesson.difficulty,
+            "summary": summary.model_dump_json(),
+            "detail": lesson.model_dump_json(),
+        })
+    return {
+        "format": BUNDLE_FORMAT,
+        "digest": source_digest(source_dir),
+        "lessons": lessons,
+        "search": build_index(sections),
+    }
+
+
+def write_bundle(bundle: dict, path: Path = BUNDLE_PATH) -> None:
+    """Write the bundle atomically, so a running server never reads half a file"""
+    partial = path.with_suffix(".tmp")
+    partial.write_text(json.dumps(bundle, ensure_ascii=False), encoding="utf-8")
+    partial.replace(path)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Compile the lesson bundle")
+    parser.add_argument("--check", action="store_true", help="only check the bundle is up to date")
+    args = parser.parse_args(argv)
+
+    if args.check:
+        try:
+            bundle = json.loads(BUNDLE_PATH.read_text(encoding="utf-8"))
+        except FileNotFoundError:
+            print(f"{BUNDLE_PATH} is missing", file=sys.stderr)
+            return 1
+        if bundle.get("digest") != source_digest():
+            print(f"{BUNDLE_PATH} is out of date", file=sys.stderr)
+            return 1
+        return 0
+
+    bundle = compile_bundle()
+    write_bundle(bundle)
+    print(f"Wrote {len(bundle['lessons'])} lessons to {BUNDLE_PATH}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,169 @@
+"""
+Lesson library served by the lessons API
+
+The compiled bundle (see app.content.build) is read once at startup. Its
+summary and detail payloads are already JSON, so requests only pick byte
+strings: list pages are the precomputed item fragments for the filter,
+sliced and joined, and search results wrap the same fragments. No models
+are built per request.
+"""
+import json
+import logging
+from itertools import product
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from app.content.build import BUNDLE_FORMAT, BUNDLE_PATH, SOURCE_DIR, compile_bundle, source_digest
+from app.content.search import SearchIndex
+
+logger = logging.getLogger(__name__)
+
+# (category, difficulty); None matches any
+_Filter = Tuple[Optional[str], Optional[str]]
+
+SNIPPET_LENGTH = 200
+
+
+def _snippet(text: str) -> str:
+    if len(text) <= SNIPPET_LENGTH:
+        return text
+    return text[:SNIPPET_LENGTH].rsplit(" ", 1)[0] + "…"
+
+
+class LessonLibrary:
+    """In-memory lessons with pre-serialized payloads"""
+
+    def __init__(self, bundle: dict):
+        """
+        Args:
+            bundle: Compiled bundle, as returned by compile_bundle()
+        """
+        self.digest: str = bundle["digest"]
+        # Quoted so it can be sent as an ETag header as is
+        self.etag = f'"{self.digest}"'
+        self._details: Dict[str, bytes] = {}
+        self._summaries: List[bytes] = []
+        self._filtered: Dict[_Filter, List[bytes]] = {}
+        # Per filter, which lesson positions search may return
+        self._masks: Dict[_Filter, List[bool]] = {}
+        lessons = bundle["lessons"]
+
+        for position, lesson in enumerate(lessons):
+            summary = lesson["summary"].encode("utf-8")
+            self._summaries.append(summary)
+            self._details[lesson["id"]] = lesson["detail"].encode("utf-8")
+            # Every filter combination the lesson satisfies, wildcards included
+            for key in product((None, lesson["category"]), (None, lesson["difficulty"])):
+                self._filtered.setdefault(key, []).append(summary)
+                self._masks.setdefault(key, [False] * len(lessons))[position] = True
+        self._masks.pop((None, None), None)
+
+        self.search_index = SearchIndex(bundle["search"])
+
+        self.categories = sorted({category for category, _ in self._filtered if category})
+        self.difficulties = sorted({difficulty for _, difficulty in self._filtered if difficulty})
+
+    @classmethod
+    def load(cls, path: Path = BUNDLE_PATH, source_dir: Path = SOURCE_DIR) -> "LessonLibrary":
+        """
+        Load the compiled bundle
+
+        A missing or stale bundle (sources edited since the last build, e.g.
+        in development) is compiled from the sources in memory instead.
+        """
+        try:
+            bundle = json.loads(path.read_text(encoding="utf-8"))
+        except FileNotFoundError:
+            bundle = None
+
+        stale = bundle is None or bundle.get("format") != BUNDLE_FORMAT
+        if not stale and source_dir.is_dir():
+            stale = bundle["digest"] != source_digest(source_dir)
+        if stale:
+            logger.warning(
+                f"Lesson bundle {path} is missing or out of date; compiling it in memory "
+                "(run python -m app.content.build)"
+            )
+            bundle = compile_bundle(source_dir)
+
+        library = cls(bundle)
+        logger.info(f"Loaded {len(library)} lessons")
+        return library
+
+    def __len__(self) -> int:
+        return len(self._summaries)
+
+    def detail(self, lesson_id: str) -> Optional[bytes]:
+        """Serialized LessonDetail, or None for an unknown id"""
+        return self._details.get(lesson_id)
+
+    def page(
+        self,
+        category: Optional[str] = None,
+        difficulty: Optional[str] = None,
+        offset: int = 0,
+        limit: int = 20
+    ) -> bytes:
+        """
+        Serialized LessonList page
+
+        Args:
+            category: Only lessons in this category
+            difficulty: Only lessons of this difficulty
+            offset: Matching lessons to skip
+            limit: Maximum number of lessons returned
+
+        Returns:
+            {"items": [LessonSummary, ...], "total", "offset", "limit"} as JSON
+        """
+        matching = self._filtered.get((category, difficulty), ())
+        items = b",".join(matching[offset:offset + limit])
+        return b'{"items":[%b],"total":%d,"offset":%d,"limit":%d}' % (
+            items, len(matching), offset, limit
+        )
+
+    def search(
+        self,
+        query: str,
+        category: Optional[str] = None,
+        difficulty: Optional[str] = None,
+        limit: int = 10
+    ) -> bytes:
+        """
+        Serialized LessonSearchResults for a free-text query
+
+        Args:
+            query: Words to look for (typos and word beginnings are matched)
+            category: Only lessons in this category
+            difficulty: Only lessons of this difficulty
+            limit: Maximum number of lessons returned
+
+        Returns:
+            {"query", "results": [{"lesson": LessonSummary, "score", "snippet"}]}
+            as JSON, best match first
+        """
+        mask = None
+        if category is not None or difficulty is not None:
+            mask = self._masks.get((category, difficulty))
+            if mask is None:
+                return b'{"query":%b,"results":[]}' % json.dumps(query).encode("utf-8")
+
+        results = b",".join(
+            b'{"lesson":%b,"score":%.4f,"snippet":%b}' % (
+                self._summaries[hit.lesson], hit.score, json.dumps(_snippet(hit.snippet)).encode("utf-8")
+            )
+            for hit in self.search_index.search(query, limit, mask)
+        )
+        return b'{"query":%b,"results":[%b]}' % (json.dumps(query).encode("utf-8"), results)
+
+
+# Global instance (singleton pattern)
+_library_instance = None
+
+
+def get_lesson_library() -> LessonLibrary:
+    """Get or load the lesson library"""
+    global _library_instance
+    if _library_instance is None:
+        _library_instance = LessonLibrary.load()
+    return _library_instance
@@ -0,0 +1,210 @@
+"""
+Full-text search over lesson sections
+
+Each lesson is split into sections (title, content paragraphs, examples,
+key takeaways) and indexed as separate documents in an inverted index,
+ranked with BM25. build_index() runs at bundle build time and returns plain
+JSON data; SearchIndex loads it at startup.
+
+Query words are matched exactly, as prefixes ("inject" finds "injection")
+and, when neither finds anything, with one typo ("injcetion"). When a word
+has more candidates than MAX_EXPANSIONS, those in the most sections are kept. Typos are
+looked up in a deletion map built at load time (SymSpell), so a query costs
+a few dict lookups per word plus one pass over the matching postings.
+"""
+import re
+from bisect import bisect_left
+from collections import Counter
+from math import log
+from typing import Dict, Iterable, List, Optional, Sequence, Set, Tuple
+
+_WORD = re.compile(r"[^\W_]+")
+
+STOP_WORDS = frozenset(
+    "a an and are as at be by can do does for from how i in is it my of on or "
+    "the this to was what when where which who why with you your".split()
+)
+
+# BM25 parameters
+K1 = 1.2
+B = 0.75
+
+# Section kinds and how much a match in each counts ("terms" are a lesson's
+# curated search terms: indexed like a title, never shown as a snippet)
+FIELD_BOOST = {"title": 2.0, "terms": 2.0, "takeaway": 1.2, "content": 1.0, "example": 1.0}
+
+# Expanded terms count less than the word as typed
+PREFIX_WEIGHT = 0.7
+TYPO_WEIGHT = 0.6
+MIN_PREFIX_LENGTH = 3
+MIN_TYPO_LENGTH = 4
+MAX_EXPANSIONS = 30
+
+
+def tokenize(text: str) -> List[str]:
+    """Lowercase words, stop words removed"""
+    return [word for word in _WORD.findall(text.casefold()) if word not in STOP_WORDS]
+
+
+def build_index(sections: Iterable[Tuple[int, str, str]]) -> dict:
+    """
+    Build the serialized index
+
+    Args:
+        sections: (lesson position, kind, text) for every section, kind being
+            a FIELD_BOOST key
+
+    Returns:
+        {"sections": [[lesson, kind, text]], "lengths": [tokens per section],
+        "postings": {term: [[section, term frequency], ...]}}
+    """
+    stored = []
+    lengths = []
+    postings: Dict[str, List[List[int]]] = {}
+    for number, (lesson, kind, text) in enumerate(sections):
+        tokens = tokenize(text)
+        stored.append([lesson, kind, text])
+        lengths.append(len(tokens))
+        for term, frequency in Counter(tokens).items():
+            postings.setdefault(term, []).append([number, frequency])
+    return {"sections": stored, "lengths": lengths, "postings": dict(sorted(postings.items()))}
+
+
+def _deletes(term: str) -> Set[str]:
+    return {term[:i] + term[i + 1:] for i in range(len(term))}
+
+
+def _within_one_edit(a: str, b: str) -> bool:
+    """Levenshtein distance <= 1, or a single swap of adjacent letters"""
+    if a == b:
+        return True
+    if abs(len(a) - len(b)) > 1:
+        return False
+    if len(a) == len(b):
+        diffs = [i for i in range(len(a)) if a[i] != b[i]]
+        if len(diffs) == 1:
+            return True
+        return (
+            len(diffs) == 2 and diffs[1] == diffs[0] + 1
+            and a[diffs[0]] == b[diffs[1]] and a[diffs[1]] == b[diffs[0]]
+        )
+    shorter, longer = (a, b) if len(a) < len(b) else (b, a)
+    return any(longer[:i] + longer[i + 1:] == shorter for i in range(len(longer)))
+
+
+class SearchHit:
+    """A lesson matching a query, with its best section"""
+
+    __slots__ = ("lesson", "score", "snippet")
+
+    def __init__(self, lesson: int, score: float, snippet: str):
+        self.lesson = lesson
+        self.score = score
+        self.snippet = snippet
+
+
+class SearchIndex:
+    """BM25 ranking over an index made by build_index()"""
+
+    def __init__(self, data: dict):
+        self._sections: List[Tuple[int, str, str]] = [tuple(section) for section in data["sections"]]
+        lengths: List[int] = data["lengths"]
+        average = (sum(lengths) / len(lengths)) if lengths else 1.0
+        count = len(lengths)
+
+        # Per section: BM25's length normalization (K1 scaled by relative length), and the
+        # field boost search() multiplies into the section's summed score
+        self._norms = [K1 * (1 - B + B * length / (average or 1.0)) for length in lengths]
+        self._boosts = [FIELD_BOOST[kind] for _, kind, _ in self._sections]
+        self._titles = {lesson: text for lesson, kind, text in self._sections if kind == "title"}
+
+        self._postings: Dict[str, List[Tuple[int, int]]] = {}
+        self._idf: Dict[str, float] = {}
+        for term, postings in data["postings"].items():
+            self._postings[term] = [(section, frequency) for section, frequency in postings]
+            matches = len(postings)
+            self._idf[term] = log(1 + (count - matches + 0.5) / (matches + 0.5))
+
+        # Sorted vocabulary for prefix ranges, deletion map for typos
+        self._terms = sorted(self._postings)
+        self._by_delete: Dict[str, List[str]] = {}
+        for term in self._terms:
+            if len(term) >= MIN_TYPO_LENGTH - 1:
+                for variant in _deletes(term):
+                    self._by_delete.setdefault(variant, []).append(term)
+
+    def __len__(self) -> int:
+        return len(self._sections)
+
+    def expand(self, word: str) -> List[Tuple[str, float]]:
+        """Index terms a query word matches, with their weights"""
+        expansions: Dict[str, float] = {}
+        if word in self._postings:
+            expansions[word] = 1.0
+        if len(word) >= MIN_PREFIX_LENGTH:
+            start = bisect_left(self._terms, word)
+            end = start
+            while end < len(self._terms) and self._terms[end].startswith(word):
+                end += 1
+            for term in self._most_common(self._terms[start:end]):
+                expansions.setdefault(term, PREFIX_WEIGHT)
+        if not expansions and len(word) >= MIN_TYPO_LENGTH:
+            candidates = set(self._by_delete.get(word, ()))
+            for variant in _deletes(word):
+                if variant in self._postings:
+                    candidates.add(variant)
+                candidates.update(self._by_delete.get(variant, ()))
+            close = [term for term in candidates if _within_one_edit(word, term)]
+            for term in self._most_common(close):
+                expansions[term] = TYPO_WEIGHT
+        return list(expansions.items())
+
+    def _most_common(self, terms: Sequence[str]) -> List[str]:
+        """The MAX_EXPANSIONS terms found in the most sections (ties alphabetically)"""
+        if len(terms) <= MAX_EXPANSIONS:
+            return sorted(terms)
+        return sorted(terms, key=lambda term: (-len(self._postings[term]), term))[:MAX_EXPANSIONS]
+
+    def search(
+        self, query: str, limit: int = 10, lessons: Optional[Sequence[bool]] = None
+    ) -> List[SearchHit]:
+        """
+        Rank lessons for a query
+
+        Args:
+            query: Free text
+            limit: Maximum number of lessons returned
+            lessons: Per lesson position, whether it may be returned (filters)
+
+        Returns:
+            Best lessons first, each scored by its best matching section
+        """
+        totals: Dict[int, float] = {}
+        for word in dict.fromkeys(tokenize(query)):
+            # A word's expansions don't add up: each section keeps its best one
+            best: Dict[int, float] = {}
+            for term, weight in self.expand(word):
+                idf = self._idf[term] * weight
+                for section, frequency in self._postings[term]:
+                    score = idf * frequency * (K1 + 1) / (frequency + self._norms[section])
+                    if score > best.get(section, 0.0):
+                        best[section] = score
+            for section, score in best.items():
+                totals[section] = totals.get(section, 0.0) + score
+
+        # A lesson scores by its best section; its snippet is the best section a reader can see
+        hits: Dict[int, SearchHit] = {}
+        snippet_scores: Dict[int, float] = {}
+        for section, score in totals.items():
+            lesson, kind, text = self._sections[section]
+            if lessons is not None and not lessons[lesson]:
+                continue
+            score *= self._boosts[section]
+            hit = hits.get(lesson)
+            if hit is None:
+                hit = hits[lesson] = SearchHit(lesson, score, self._titles.get(lesson, ""))
+            hit.score = max(hit.score, score)
+            if kind != "terms" and score > snippet_scores.get(lesson, 0.0):
+                snippet_scores[lesson] = score
+                hit.snippet = text
+        return sorted(hits.values(), key=lambda hit: hit.score, reverse=True)[:limit]
@@ -2,21 +2,67 @@
 SMBShield API - Main Application
 A security-focused educational platform for SMBs
 """
-from fastapi import FastAPI, status
+from contextlib import asynccontextmanager
+from fastapi import FastAPI, Request, Response, status
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.middleware.trustedhost import TrustedHostMiddleware
 from fastapi.responses import JSONResponse
 import logging
+import secrets
 
 from app.config import settings
-from app.api.routes import chat
-from app.middleware import RateLimitMiddleware, APIKeyMiddleware
+from app.api.routes import chat, lessons
+from app.middleware import (
+    RateLimitMiddleware,
+    APIKeyMiddleware,
+    MetricsMiddleware,
+    RequestTimingMiddleware,
+    DeadlineMiddleware,
+)
+from app.middleware.redis_rate_limit import close_redis_limiters
 from app.utils import setup_logging
+from app.utils.log_sampling import log_aggregator
+from app.utils.metrics import mark_process_dead, render_metrics
+from app.utils.logging_config import stop_logging
+from app.utils.sanitization import history_cache
 
 # Configure logging
-setup_logging(debug=settings.DEBUG)
+setup_logging(
+    debug=settings.DEBUG,
+    use_queue=settings.LOG_QUEUE_ENABLED,
+    static_fields={"service": settings.PROJECT_NAME},
+    aggregation_interval=settings.LOG_AGGREGATION_INTERVAL_SECONDS,
+    sample_ratios=settings.log_sample_ratios,
+)
 logger = logging.getLogger(__name__)
 
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Start and stop background tasks"""
+    from app.agents.owasp_tutor import get_tutor
+    from app.content.lessons import get_lesson_library
+
+    tutor = get_tutor()
+    get_lesson_library()
+    log_aggregator.start()
+
+    # No upstream to pre-generate tips from in mock mode
+    if not settings.USE_MOCK_RESPONSES:
+        tutor.tip_pool.start()
+
+    yield
+
+    await tutor.tip_pool.stop()
+    await tutor.router.aclose()
+    await close_redis_limiters()
+    await log_aggregator.stop()
+    mark_process_dead()
+
+    # Flush log lines still queued for the background writer
+    stop_logging()
+
+
 # Create FastAPI app
 app = FastAPI(
     title=settings.PROJECT_NAME,
@@ -24,6 +70,7 @@ app = FastAPI(
     version="1.0.0",
     docs_url="/docs" if settings.DEBUG else None,  # Disable docs in production
     redoc_url="/redoc" if settings.DEBUG else None,
+    lifespan=lifespan,
 )
 
 # Security Middleware
@@ -33,16 +80,18 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["GET", "POST", "PUT", "DELETE"],
     allow_headers=["*"],
+    # Let the frontend read the timing breakdown and correlation ID
+    expose_headers=["Server-Timing", "X-Request-ID"],
 )
 
 # API Key authentication (optional, controlled by REQUIRE_API_KEY)
 app.add_middleware(APIKeyMiddleware)
 
-# Rate limiting (20 requests/min, 100 requests/hour)
+# Rate limiting (default 20 requests/min, 100 requests/hour)
 app.add_middleware(
     RateLimitMiddleware,
-    requests_per_minute=20,
-    requests_per_hour=100
+    requests_per_minute=settings.RATE_LIMIT_PER_MINUTE,
+    requests_per_hour=settings.RATE_LIMIT_PER_HOUR
 )
 
 # Trust only specific hosts in production
@@ -52,8 +101,26 @@ if not settings.DEBUG:
         allowed_hosts=["smbshield.com", "*.smbshield.com"]
     )
 
+# Per-route deadlines; cancels upstream work on timeout (504) or client disconnect
+app.add_middleware(
+    DeadlineMiddleware,
+    default_seconds=settings.REQUEST_DEADLINE_SECONDS,
+    route_seconds=settings.route_deadlines
+)
+
+# Request metrics (outermost, so rejected requests are measured too)
+if settings.METRICS_ENABLED:
+    app.add_middleware(MetricsMiddleware)
+
+# Correlation ID and Server-Timing phase breakdown for every request
+app.add_middleware(
+    RequestTimingMiddleware,
+    log_min_duration_ms=settings.REQUEST_LOG_MIN_DURATION_MS
+)
+
 # Include routers
 app.include_router(chat.router, prefix=settings.API_V1_PREFIX)
+app.include_router(lessons.router, prefix=settings.API_V1_PREFIX)
 
 # Log startup
 logger.info(f"Starting {settings.PROJECT_NAME}")
@@ -98,16 +165,28 @@ async def readiness_probe():
     try:
         # Check if critical dependencies are available
         from app.agents.owasp_tutor import get_tutor
+        from app.content.lessons import get_lesson_library
 
         # Try to get the tutor (validates Gemini API key is configured)
         tutor = get_tutor()
 
+        checks = {
+            "api_key_configured": bool(settings.GEMINI_API_KEY),
+            "tutor_agent": "initialized"
+        }
+        if tutor.response_cache is not None:
+            checks["response_cache"] = tutor.response_cache.stats()
+        checks["llm_backends"] = tutor.router.stats()
+        checks["request_coalescing"] = tutor.coalescing_stats()
+        checks["quick_tip_pool"] = len(tutor.tip_pool)
+        checks["conversations"] = len(tutor.conversations)
+        checks["history_sanitization_cache"] = history_cache.stats()
+        checks["lessons"] = len(get_lesson_library())
+
+        # Every backend's circuit open: still serving, but only fallback answers
         return {
-            "status": "ready",
-            "checks": {
-                "api_key_configured": bool(settings.GEMINI_API_KEY),
-                "tutor_agent": "initialized"
-            }
+            "status": "ready" if tutor.router.available else "degraded",
+            "checks": checks
         }
     except Exception as e:
         logger.error(f"Readiness check failed: {str(e)}")
@@ -120,6 +199,30 @@ async def readiness_probe():
         )
 
 
+async def metrics(request: Request):
+    """
+    Prometheus metrics
+    Public unless METRICS_TOKEN is set, then requires Authorization: Bearer <token>
+    """
+    if settings.METRICS_TOKEN:
+        supplied = request.headers.get("authorization", "").removeprefix("Bearer ")
+        if not secrets.compare_digest(
+            supplied.encode("utf-8"), settings.METRICS_TOKEN.encode("utf-8")
+        ):
+            return JSONResponse(
+                status_code=status.HTTP_401_UNAUTHORIZED,
+                content={"detail": "Invalid metrics token"},
+                headers={"WWW-Authenticate": "Bearer"}
+            )
+
+    body, content_type = render_metrics()
+    return Response(content=body, media_type=content_type)
+
+
+if settings.METRICS_ENABLED:
+    app.add_api_route(settings.METRICS_PATH, metrics, methods=["GET"], include_in_schema=False)
+
+
 # Error handlers
 @app.exception_handler(404)
 async def not_found_handler(request, exc):
@@ -2,6 +2,17 @@
 Middleware modules for SMBShield API
 """
 from app.middleware.rate_limit import RateLimitMiddleware, RateLimiter
-from app.middleware.auth import APIKeyMiddleware
+from app.middleware.auth import APIKeyMiddleware, require_api_key
+from app.middleware.metrics import MetricsMiddleware
+from app.middleware.request_timing import RequestTimingMiddleware
+from app.middleware.deadline import DeadlineMiddleware
 
-__all__ = ["RateLimitMiddleware", "RateLimiter", "APIKeyMiddleware"]
+__all__ = [
+    "RateLimitMiddleware",
+    "RateLimiter",
+    "APIKeyMiddleware",
+    "require_api_key",
+    "MetricsMiddleware",
+    "RequestTimingMiddleware",
+    "DeadlineMiddleware",
+]
@@ -2,21 +2,64 @@
 API Key Authentication Middleware
 Simple authentication for protecting endpoints
 """
-from fastapi import Request, HTTPException, status
-from starlette.middleware.base import BaseHTTPMiddleware
+from typing import Optional
+from fastapi import HTTPException, Request, status
+from fastapi.responses import JSONResponse
+from starlette.datastructures import Headers
+from starlette.types import ASGIApp, Receive, Scope, Send
 from app.config import settings
+from app.middleware.client_ip import ClientIPResolver
+from app.utils import log_with_context
+from app.utils.request_timing import phase
 import logging
+import secrets
 
 logger = logging.getLogger(__name__)
 
 
-class APIKeyMiddleware(BaseHTTPMiddleware):
+def api_key_from_headers(headers: Headers) -> Optional[str]:
+    """API key sent as X-API-Key or Authorization: Bearer <key>, if any"""
+    api_key = headers.get("x-api-key") or headers.get("authorization")
+
+    # Authorization header might be "Bearer <key>"
+    if api_key and api_key.startswith("Bearer "):
+        api_key = api_key[7:]  # Remove "Bearer " prefix
+    return api_key
+
+
+def is_valid_api_key(api_key: Optional[str]) -> bool:
+    """Whether api_key matches the configured API_KEY (never true without one)"""
+    return bool(api_key) and bool(settings.API_KEY) and secrets.compare_digest(
+        api_key.encode("utf-8"), settings.API_KEY.encode("utf-8")
+    )
+
+
+async def require_api_key(request: Request) -> None:
+    """
+    Route dependency demanding a valid API key, even when REQUIRE_API_KEY is off
+
+    For endpoints that must never be public (e.g. bulk chat). Without an
+    API_KEY configured they are unavailable.
+
+    Raises:
+        HTTPException: 401 if the key is missing or wrong
+    """
+    if not is_valid_api_key(api_key_from_headers(request.headers)):
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Valid API key required. Include X-API-Key header or Authorization: Bearer <key>",
+            headers={"WWW-Authenticate": "ApiKey"}
+        )
+
+
+class APIKeyMiddleware:
     """
     Middleware to enforce API key authentication
+    Pure ASGI: rejects with 401 directly and passes response bodies through untouched
     """
 
     # Paths that don't require authentication
-    PUBLIC_PATHS = [
+    PUBLIC_PATHS = frozenset({
         "/",
         "/health",
         "/health/live",
@@ -24,41 +67,58 @@ class APIKeyMiddleware(BaseHTTPMiddleware):
         "/docs",
         "/redoc",
         "/openapi.json"
-    ]
+    })
 
-    async def dispatch(self, request: Request, call_next):
-        # Skip auth for public paths
-        if request.url.path in self.PUBLIC_PATHS:
-            return await call_next(request)
+    def __init__(self, app: ASGIApp):
+        self.app = app
+        # The metrics endpoint has its own optional token (METRICS_TOKEN)
+        self.public_paths = self.PUBLIC_PATHS | {settings.METRICS_PATH}
+        self.client_ip = ClientIPResolver(
+            settings.trusted_proxies, settings.CLIENT_IP_HEADER
+        )
 
-        # Skip auth if not required
-        if not settings.REQUIRE_API_KEY:
-            return await call_next(request)
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        # Skip auth for non-HTTP traffic, public paths, or when not required
+        if (
+            scope["type"] != "http"
+            or scope["path"] in self.public_paths
+            or not settings.REQUIRE_API_KEY
+        ):
+            await self.app(scope, receive, send)
+            return
 
-        # Check for API key
-        api_key = request.headers.get("X-API-Key") or request.headers.get("Authorization")
-
-        # Authorization header might be "Bearer <key>"
-        if api_key and api_key.startswith("Bearer "):
-            api_key = api_key[7:]  # Remove "Bearer " prefix
+        with phase("auth"):
+            api_key = api_key_from_headers(Headers(scope=scope))
+            key_valid = is_valid_api_key(api_key)
 
         # Validate API key
         if not api_key:
-            logger.warning(f"Missing API key from {request.client.host if request.client else 'unknown'}")
-            raise HTTPException(
+            client_ip = self.client_ip(scope)
+            log_with_context(
+                logger, "warning", f"Missing API key from {client_ip}",
+                dedupe_key=f"missing_api_key:{client_ip}", client_ip=client_ip
+            )
+            response = JSONResponse(
                 status_code=status.HTTP_401_UNAUTHORIZED,
-                detail="API key required. Include X-API-Key header or Authorization: Bearer <key>",
+                content={"detail": "API key required. Include X-API-Key header or Authorization: Bearer <key>"},
                 headers={"WWW-Authenticate": "ApiKey"}
             )
+            await response(scope, receive, send)
+            return
 
-        if api_key != settings.API_KEY:
-            logger.warning(f"Invalid API key from {request.client.host if request.client else 'unknown'}")
-            raise HTTPException(
+        if not key_valid:
+            client_ip = self.client_ip(scope)
+            log_with_context(
+                logger, "warning", f"Invalid API key from {client_ip}",
+                dedupe_key=f"invalid_api_key:{client_ip}", client_ip=client_ip
+            )
+            response = JSONResponse(
                 status_code=status.HTTP_401_UNAUTHORIZED,
-                detail="Invalid API key",
+                content={"detail": "Invalid API key"},
                 headers={"WWW-Authenticate": "ApiKey"}
             )
+            await response(scope, receive, send)
+            return
 
         # API key is valid, process request
-        response = await call_next(request)
-        return response
+        await self.app(scope, receive, send)
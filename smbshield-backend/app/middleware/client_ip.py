@@ -0,0 +1,71 @@
+"""
+Client IP resolution behind trusted reverse proxies
+"""
+import ipaddress
+from typing import Iterable, List, Optional, Union
+
+IPNetwork = Union[ipaddress.IPv4Network, ipaddress.IPv6Network]
+
+
+def _parse_ip(value: str) -> Optional[str]:
+    """Return the normalized IP, or None if value isn't a valid address"""
+    try:
+        return str(ipaddress.ip_address(value.strip()))
+    except ValueError:
+        return None
+
+
+class ClientIPResolver:
+    """
+    Resolve the real client IP from an ASGI scope
+
+    Forwarding headers are only honoured when the direct peer is a trusted
+    proxy; otherwise anyone could pick their own rate limit bucket by
+    sending X-Forwarded-For.
+    """
+
+    def __init__(self, trusted_proxies: Iterable[str] = (), client_ip_header: Optional[str] = None):
+        self.trusted_networks: List[IPNetwork] = [
+            ipaddress.ip_network(proxy.strip(), strict=False)
+            for proxy in trusted_proxies
+            if proxy.strip()
+        ]
+        # ASGI header names are lowercase bytes
+        self.client_ip_header = client_ip_header.lower().encode("latin-1") if client_ip_header else None
+
+    def is_trusted(self, ip: Optional[str]) -> bool:
+        """Check whether an address belongs to a trusted proxy"""
+        if not ip or not self.trusted_networks:
+            return False
+        try:
+            address = ipaddress.ip_address(ip)
+        except ValueError:
+            return False
+        return any(address in network for network in self.trusted_networks)
+
+    def __call__(self, scope) -> str:
+        """Return the client IP for a request scope"""
+        client = scope.get("client")
+        peer = client[0] if client else None
+        if not self.is_trusted(peer):
+            return peer or "unknown"
+
+        forwarded_for = None
+        for name, value in scope.get("headers", ()):
+            if self.client_ip_header is not None and name == self.client_ip_header:
+                ip = _parse_ip(value.decode("latin-1"))
+                if ip:
+                    return ip
+            elif name == b"x-forwarded-for":
+                forwarded_for = value.decode("latin-1")
+
+        if forwarded_for:
+            # Rightmost address not added by one of our own proxies
+            for hop in reversed(forwarded_for.split(",")):
+                ip = _parse_ip(hop)
+                if ip is None:
+                    break
+                if not self.is_trusted(ip):
+                    return ip
+
+        return peer
@@ -0,0 +1,160 @@
+"""
+Request deadline middleware
+Cancels the work behind a request when its deadline passes or the client goes away
+"""
+import asyncio
+import logging
+from typing import Dict, Optional
+
+from fastapi import status
+from fastapi.responses import JSONResponse
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.utils import log_with_context
+from app.utils.deadline import reset_deadline, set_deadline
+from app.utils.metrics import REQUEST_CANCELLATIONS
+
+logger = logging.getLogger(__name__)
+
+# nginx's "client closed request"; never reaches the client, only logs and metrics
+CLIENT_CLOSED_REQUEST = 499
+
+
+class DeadlineMiddleware:
+    """
+    Middleware giving every request a deadline
+    Pure ASGI. The route runs under asyncio.timeout(): at the deadline it is
+    cancelled (upstream calls included) and answered with 504, or the body is
+    ended if the response already started. Requests still running after
+    watch_after seconds also get a task listening for http.disconnect, which
+    cancels them when the client goes away; fast requests never pay for it.
+    While the route is reading its body the check is retried with doubling
+    delays; once the response has started it stops (streaming responses
+    listen for the disconnect themselves).
+    Routes see the deadline through app.utils.deadline and can finish first.
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        default_seconds: float = 30.0,
+        route_seconds: Optional[Dict[str, float]] = None,
+        watch_after: float = 0.05
+    ):
+        self.app = app
+        self.default_seconds = default_seconds
+        self.watch_after = watch_after
+        # Longest path prefix wins
+        self.route_seconds = sorted(
+            (route_seconds or {}).items(), key=lambda item: len(item[0]), reverse=True
+        )
+
+    def deadline_for(self, path: str) -> float:
+        for prefix, seconds in self.route_seconds:
+            if path.startswith(prefix):
+                return seconds
+        return self.default_seconds
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        seconds = self.deadline_for(scope["path"])
+        loop = asyncio.get_running_loop()
+        task = asyncio.current_task()
+        receiving = False
+        response_started = False
+        disconnected = False
+        relayed: Optional[asyncio.Queue] = None
+        watcher: Optional[asyncio.Task] = None
+
+        async def receive_tracking() -> Message:
+            nonlocal receiving
+            if relayed is not None:
+                # The watcher owns receive() now and relays what it reads
+                return await relayed.get()
+            receiving = True
+            try:
+                return await receive()
+            finally:
+                receiving = False
+
+        async def send_tracking(message: Message) -> None:
+            nonlocal response_started
+            if message["type"] == "http.response.start":
+                response_started = True
+            await send(message)
+
+        async def watch() -> None:
+            nonlocal disconnected
+            while True:
+                message = await receive()
+                relayed.put_nowait(message)
+                if message["type"] == "http.disconnect":
+                    disconnected = True
+                    task.cancel()
+                    return
+
+        def start_watching(delay: float = self.watch_after) -> None:
+            nonlocal relayed, watcher, watch_handle
+            if receiving:
+                if response_started:
+                    # A streaming response's own listener holds receive() and handles the disconnect
+                    return
+                # The route is mid-receive (reading the body); try again later
+                watch_handle = loop.call_later(delay * 2, start_watching, delay * 2)
+                return
+            relayed = asyncio.Queue()
+            watcher = asyncio.ensure_future(watch())
+
+        watch_handle = loop.call_later(self.watch_after, start_watching)
+        token = set_deadline(seconds)
+        timeout = asyncio.timeout(seconds)
+        try:
+            async with timeout:
+                await self.app(scope, receive_tracking, send_tracking)
+            return
+        except TimeoutError:
+            if not timeout.expired():
+                raise
+            reason = "deadline"
+        except asyncio.CancelledError:
+            if not disconnected:
+                raise
+            task.uncancel()
+            reason = "disconnect"
+        finally:
+            reset_deadline(token)
+            watch_handle.cancel()
+            if watcher is not None:
+                watcher.cancel()
+
+        REQUEST_CANCELLATIONS.labels(reason).inc()
+        log_with_context(
+            logger,
+            "warning",
+            "Request cancelled" if reason == "disconnect" else "Request deadline exceeded",
+            dedupe_key=f"request_{reason}",
+            path=scope["path"],
+            reason=reason,
+            deadline_seconds=seconds
+        )
+
+        if response_started:
+            # Status already sent: end the body so the client isn't left hanging
+            await send({"type": "http.response.body", "body": b"", "more_body": False})
+            return
+
+        if reason == "disconnect":
+            # The server drops this; it lets the outer middleware record a 499
+            response = JSONResponse(
+                status_code=CLIENT_CLOSED_REQUEST,
+                content={"detail": "Client closed request"}
+            )
+        else:
+            response = JSONResponse(
+                status_code=status.HTTP_504_GATEWAY_TIMEOUT,
+                content={"detail": "Request timed out. Please try again."}
+            )
+        await response(scope, receive, send)
@@ -0,0 +1,54 @@
+"""
+Request metrics middleware
+Records latency per route template, method and status for /metrics
+"""
+import time
+from typing import Any, Dict, Tuple
+
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.utils.metrics import HTTP_REQUEST_DURATION
+
+# Methods labelled as themselves; any other verb a client sends becomes "other"
+STANDARD_METHODS = frozenset(
+    {"GET", "HEAD", "POST", "PUT", "DELETE", "CONNECT", "OPTIONS", "TRACE", "PATCH"}
+)
+
+
+class MetricsMiddleware:
+    """
+    Middleware timing every HTTP request
+    Pure ASGI and outermost, so rejections by the other middleware are counted too
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+        # Histogram children by (method, route, status), skipping labels() per request
+        self._histograms: Dict[Tuple[str, str, int], Any] = {}
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        started = time.perf_counter()
+        status_code = 500
+
+        async def send_with_status(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            # Route templates and known methods keep label cardinality bounded
+            method = scope["method"] if scope["method"] in STANDARD_METHODS else "other"
+            labels = (method, getattr(scope.get("route"), "path", "unmatched"), status_code)
+            histogram = self._histograms.get(labels)
+            if histogram is None:
+                histogram = self._histograms[labels] = HTTP_REQUEST_DURATION.labels(
+                    labels[0], labels[1], str(status_code)
+                )
+            histogram.observe(time.perf_counter() - started)
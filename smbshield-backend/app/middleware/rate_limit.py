@@ -2,101 +2,214 @@
 Rate limiting middleware for API protection
 Simple in-memory implementation for demo/staging
 """
-from fastapi import Request, HTTPException, status
-from starlette.middleware.base import BaseHTTPMiddleware
-from datetime import datetime, timedelta
-from collections import defaultdict
-from typing import Dict, Tuple
+from fastapi import status
+from fastapi.responses import JSONResponse
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+from collections import OrderedDict
+from typing import Callable, Tuple
 import logging
+import time
+
+from app.config import settings
+from app.middleware.client_ip import ClientIPResolver
+from app.utils import log_with_context
+from app.utils.metrics import RATE_LIMIT_REJECTIONS
+from app.utils.request_timing import phase
 
 logger = logging.getLogger(__name__)
 
+MINUTE = 60.0
+HOUR = 3600.0
+
+
+class _Bucket:
+    """
+    Sliding-window counters for one client
+    Each window keeps (index, count, previous window's count)
+    """
+
+    __slots__ = (
+        "minute_index", "minute_count", "minute_prev",
+        "hour_index", "hour_count", "hour_prev",
+        "last_seen",
+    )
+
+    def __init__(self):
+        self.minute_index = self.minute_count = self.minute_prev = 0
+        self.hour_index = self.hour_count = self.hour_prev = 0
+        self.last_seen = 0.0
+
+
+def _roll(index: int, count: int, prev: int, current_index: int) -> Tuple[int, int]:
+    """Advance a window to current_index, returning (count, prev)"""
+    if current_index == index:
+        return count, prev
+    if current_index == index + 1:
+        return 0, count
+    return 0, 0
+
 
 class RateLimiter:
     """
     Simple in-memory rate limiter
-    Tracks requests per IP address
+    Tracks requests per client key (usually the client IP)
+
+    Uses sliding-window counters: constant time and a few integers per key.
+    The previous window's count is weighted by how much of it still overlaps
+    the sliding window. Keys idle for longer than an hour (plus one window of
+    history) are evicted, and at most max_keys are tracked at once.
     """
 
-    def __init__(self, requests_per_minute: int = 20, requests_per_hour: int = 100):
+    def __init__(
+        self,
+        requests_per_minute: int = 20,
+        requests_per_hour: int = 100,
+        max_keys: int = 100_000,
+        clock: Callable[[], float] = time.monotonic
+    ):
         self.requests_per_minute = requests_per_minute
         self.requests_per_hour = requests_per_hour
-        # Format: {ip: [(timestamp1, timestamp2, ...)]}
-        self.request_history: Dict[str, list] = defaultdict(list)
-
-    def _cleanup_old_requests(self, ip: str, now: datetime):
-        """Remove requests older than 1 hour"""
-        cutoff = now - timedelta(hours=1)
-        self.request_history[ip] = [
-            timestamp for timestamp in self.request_history[ip]
-            if timestamp > cutoff
-        ]
+        self.max_keys = max_keys
+        self._clock = clock
+        # Least recently seen first, so idle keys are evicted from the front
+        self._buckets: "OrderedDict[str, _Bucket]" = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._buckets)
+
+    def _evict_idle(self, now: float) -> None:
+        """Drop keys whose windows have fully expired"""
+        cutoff = now - 2 * HOUR
+        buckets = self._buckets
+        while buckets:
+            key, bucket = next(iter(buckets.items()))
+            if bucket.last_seen > cutoff and len(buckets) <= self.max_keys:
+                break
+            del buckets[key]
 
     def is_allowed(self, ip: str) -> Tuple[bool, str]:
         """
         Check if request is allowed
         Returns: (allowed: bool, reason: str)
         """
-        now = datetime.now()
-
-        # Cleanup old requests
-        self._cleanup_old_requests(ip, now)
+        now = self._clock()
+        self._evict_idle(now)
+
+        bucket = self._buckets.get(ip)
+        if bucket is None:
+            bucket = self._buckets[ip] = _Bucket()
+        else:
+            self._buckets.move_to_end(ip)
+        bucket.last_seen = now
+
+        # Roll both windows forward
+        minute_index = int(now // MINUTE)
+        bucket.minute_count, bucket.minute_prev = _roll(
+            bucket.minute_index, bucket.minute_count, bucket.minute_prev, minute_index
+        )
+        bucket.minute_index = minute_index
 
-        # Get request timestamps for this IP
-        timestamps = self.request_history[ip]
+        hour_index = int(now // HOUR)
+        bucket.hour_count, bucket.hour_prev = _roll(
+            bucket.hour_index, bucket.hour_count, bucket.hour_prev, hour_index
+        )
+        bucket.hour_index = hour_index
 
         # Check per-minute limit
-        minute_ago = now - timedelta(minutes=1)
-        recent_requests = sum(1 for ts in timestamps if ts > minute_ago)
-
-        if recent_requests >= self.requests_per_minute:
+        minute_overlap = 1.0 - (now % MINUTE) / MINUTE
+        if bucket.minute_prev * minute_overlap + bucket.minute_count >= self.requests_per_minute:
             return False, f"Rate limit exceeded: {self.requests_per_minute} requests per minute"
 
         # Check per-hour limit
-        if len(timestamps) >= self.requests_per_hour:
+        hour_overlap = 1.0 - (now % HOUR) / HOUR
+        if bucket.hour_prev * hour_overlap + bucket.hour_count >= self.requests_per_hour:
             return False, f"Rate limit exceeded: {self.requests_per_hour} requests per hour"
 
         # Request is allowed
-        self.request_history[ip].append(now)
+        bucket.minute_count += 1
+        bucket.hour_count += 1
         return True, "OK"
 
+    async def check(self, ip: str) -> Tuple[bool, str]:
+        """Async form of is_allowed, shared with the Redis-backed limiter"""
+        return self.is_allowed(ip)
+
+    def reset(self) -> None:
+        """Forget all tracked clients"""
+        self._buckets.clear()
 
-class RateLimitMiddleware(BaseHTTPMiddleware):
+
+class RateLimitMiddleware:
     """
     Middleware to enforce rate limiting
+    Pure ASGI: rejects with 429 directly and passes response bodies through untouched
     """
 
-    def __init__(self, app, requests_per_minute: int = 20, requests_per_hour: int = 100):
-        super().__init__(app)
+    # Health checks (and metrics scrapes) are never rate limited
+    EXEMPT_PATHS = frozenset({"/", "/health", "/health/live", "/health/ready"})
+
+    def __init__(self, app: ASGIApp, requests_per_minute: int = 20, requests_per_hour: int = 100):
+        self.app = app
         self.limiter = RateLimiter(requests_per_minute, requests_per_hour)
+        # Scrapers poll metrics on a fixed schedule
+        self.exempt_paths = self.EXEMPT_PATHS | {settings.METRICS_PATH}
+
+        # Share limits across instances when Redis is configured
+        if settings.REDIS_URL:
+            try:
+                from app.middleware.redis_rate_limit import RedisRateLimiter
+                self.limiter = RedisRateLimiter.from_url(settings.REDIS_URL, fallback=self.limiter)
+                logger.info("Rate limiting backed by Redis")
+            except ImportError:
+                logger.warning("REDIS_URL is set but the redis package is missing; using in-memory rate limiting")
+
+        self.client_ip = ClientIPResolver(
+            settings.trusted_proxies, settings.CLIENT_IP_HEADER
+        )
+
+        # Rate limit headers added to every limited response
+        self.limit_headers = [
+            (b"x-ratelimit-limit-minute", str(requests_per_minute).encode("latin-1")),
+            (b"x-ratelimit-limit-hour", str(requests_per_hour).encode("latin-1")),
+        ]
         logger.info(
             f"Rate limiting enabled: {requests_per_minute}/min, {requests_per_hour}/hour"
         )
 
-    async def dispatch(self, request: Request, call_next):
-        # Skip rate limiting for health checks
-        if request.url.path in ["/", "/health", "/health/live", "/health/ready"]:
-            return await call_next(request)
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        # Skip rate limiting for non-HTTP traffic and health checks
+        if scope["type"] != "http" or scope["path"] in self.exempt_paths:
+            await self.app(scope, receive, send)
+            return
 
-        # Get client IP
-        client_ip = request.client.host if request.client else "unknown"
+        with phase("ratelimit"):
+            # Get client IP (real client behind trusted proxies)
+            client_ip = self.client_ip(scope)
 
-        # Check rate limit
-        allowed, reason = self.limiter.is_allowed(client_ip)
+            # Check rate limit
+            allowed, reason = await self.limiter.check(client_ip)
 
         if not allowed:
-            logger.warning(f"Rate limit exceeded for IP {client_ip}: {reason}")
-            raise HTTPException(
+            RATE_LIMIT_REJECTIONS.labels("minute" if "minute" in reason else "hour").inc()
+            # Collapsed per client so a flood doesn't become a flood of log lines
+            log_with_context(
+                logger, "warning", f"Rate limit exceeded for IP {client_ip}: {reason}",
+                dedupe_key=f"rate_limited:{client_ip}", client_ip=client_ip
+            )
+            response = JSONResponse(
                 status_code=status.HTTP_429_TOO_MANY_REQUESTS,
-                detail=reason,
+                content={"detail": reason},
                 headers={"Retry-After": "60"}  # Suggest retry after 60 seconds
             )
+            response.raw_headers.extend(self.limit_headers)
+            await response(scope, receive, send)
+            return
 
-        # Process request
-        response = await call_next(request)
-
-        # Add rate limit headers to response
-        response.headers["X-RateLimit-Limit-Minute"] = str(self.limiter.requests_per_minute)
-        response.headers["X-RateLimit-Limit-Hour"] = str(self.limiter.requests_per_hour)
+        async def send_with_limit_headers(message: Message) -> None:
+            # Add rate limit headers to response
+            if message["type"] == "http.response.start":
+                message["headers"] = [*message.get("headers", ()), *self.limit_headers]
+            await send(message)
 
-        return response
+        # Process request
+        await self.app(scope, receive, send_with_limit_headers)
@@ -0,0 +1,222 @@
+"""
+Redis-backed rate limiting shared across instances
+
+Same sliding-window counters as the in-memory RateLimiter, but kept in Redis
+so the limit holds across every machine behind the load balancer. Each check
+is a single EVALSHA round trip running an atomic Lua script.
+
+Keys that are clearly under their limit are allowed from a short-lived local
+snapshot of their Redis counts; the requests allowed that way are flushed in
+the next script call for that key. If Redis is unreachable we fall back to
+the in-memory limiter and retry Redis after a cooldown; increments not yet
+flushed are kept for the next successful call.
+"""
+import logging
+import time
+import weakref
+from collections import OrderedDict
+from typing import Callable, Tuple
+
+from app.middleware.rate_limit import HOUR, MINUTE, RateLimiter
+
+logger = logging.getLogger(__name__)
+
+# KEYS: minute current/previous, hour current/previous
+# ARGV: minute limit, hour limit, minute weight, hour weight, pending increments
+# Returns: {allowed, exceeded window (0 none, 1 minute, 2 hour), minute estimate, hour estimate}
+SLIDING_WINDOW_SCRIPT = """
+local pending = tonumber(ARGV[5])
+if pending > 0 then
+    redis.call('INCRBY', KEYS[1], pending)
+    redis.call('EXPIRE', KEYS[1], 120)
+    redis.call('INCRBY', KEYS[3], pending)
+    redis.call('EXPIRE', KEYS[3], 7200)
+end
+
+local minute = tonumber(redis.call('GET', KEYS[2]) or '0') * tonumber(ARGV[3])
+    + tonumber(redis.call('GET', KEYS[1]) or '0')
+if minute >= tonumber(ARGV[1]) then
+    return {0, 1, math.floor(minute), 0}
+end
+
+local hour = tonumber(redis.call('GET', KEYS[4]) or '0') * tonumber(ARGV[4])
+    + tonumber(redis.call('GET', KEYS[3]) or '0')
+if hour >= tonumber(ARGV[2]) then
+    return {0, 2, math.floor(minute), math.floor(hour)}
+end
+
+redis.call('INCR', KEYS[1])
+redis.call('EXPIRE', KEYS[1], 120)
+redis.call('INCR', KEYS[3])
+redis.call('EXPIRE', KEYS[3], 7200)
+return {1, 0, math.floor(minute) + 1, math.floor(hour) + 1}
+"""
+
+
+class _Snapshot:
+    """Last counts seen in Redis for a key, plus requests allowed locally since"""
+
+    __slots__ = ("minute", "hour", "taken_at", "pending")
+
+    def __init__(self, minute: int, hour: int, taken_at: float):
+        self.minute = minute
+        self.hour = hour
+        self.taken_at = taken_at
+        self.pending = 0
+
+
+class RedisRateLimiter:
+    """
+    Distributed rate limiter using Redis, with local pre-check and fallback
+
+    A key is allowed locally (no Redis call) while its last Redis snapshot is
+    younger than local_window seconds and its estimated usage stays below
+    local_fraction of both limits.
+    """
+
+    def __init__(
+        self,
+        redis,
+        fallback: RateLimiter,
+        key_prefix: str = "smbshield:rl",
+        local_fraction: float = 0.5,
+        local_window: float = 1.0,
+        retry_after: float = 5.0,
+        max_snapshots: int = 100_000,
+        clock: Callable[[], float] = time.time
+    ):
+        self.redis = redis
+        self.fallback = fallback
+        self.requests_per_minute = fallback.requests_per_minute
+        self.requests_per_hour = fallback.requests_per_hour
+        self.key_prefix = key_prefix
+        self.local_fraction = local_fraction
+        self.local_window = local_window
+        self.retry_after = retry_after
+        self.max_snapshots = max_snapshots
+        self._clock = clock
+        self._script = redis.register_script(SLIDING_WINDOW_SCRIPT)
+        self._snapshots: "OrderedDict[str, _Snapshot]" = OrderedDict()
+        self._redis_down_until = 0.0
+        self.redis_calls = 0
+        self.local_hits = 0
+
+    @classmethod
+    def from_url(cls, url: str, fallback: RateLimiter, **kwargs) -> "RedisRateLimiter":
+        """Create a limiter for a redis:// URL (short timeouts so outages fail fast)"""
+        import redis.asyncio as redis_asyncio
+
+        client = redis_asyncio.from_url(
+            url, socket_timeout=0.25, socket_connect_timeout=0.25
+        )
+        limiter = cls(client, fallback, **kwargs)
+        # The limiter owns this client; close_redis_limiters() closes it at shutdown
+        _owned_limiters.add(limiter)
+        return limiter
+
+    def _local_check(self, key: str, now: float) -> bool:
+        """Allow a clearly-under-limit key without asking Redis"""
+        snapshot = self._snapshots.get(key)
+        if snapshot is None or now - snapshot.taken_at > self.local_window:
+            return False
+
+        used = snapshot.pending + 1
+        if (snapshot.minute + used >= self.requests_per_minute * self.local_fraction
+                or snapshot.hour + used >= self.requests_per_hour * self.local_fraction):
+            return False
+
+        snapshot.pending = used
+        return True
+
+    def _keys(self, key: str, now: float) -> list:
+        # Hash tag keeps all four keys in one cluster slot
+        base = f"{self.key_prefix}:{{{key}}}"
+        minute_index = int(now // MINUTE)
+        hour_index = int(now // HOUR)
+        return [
+            f"{base}:m:{minute_index}", f"{base}:m:{minute_index - 1}",
+            f"{base}:h:{hour_index}", f"{base}:h:{hour_index - 1}",
+        ]
+
+    async def check(self, key: str) -> Tuple[bool, str]:
+        """
+        Check if request is allowed
+        Returns: (allowed: bool, reason: str)
+        """
+        now = self._clock()
+
+        if now < self._redis_down_until:
+            return self.fallback.is_allowed(key)
+
+        if self._local_check(key, now):
+            self.local_hits += 1
+            return True, "OK"
+
+        # Taken out so concurrent checks of the key don't flush the same increments
+        snapshot = self._snapshots.pop(key, None)
+        pending = snapshot.pending if snapshot is not None else 0
+
+        try:
+            self.redis_calls += 1
+            allowed, exceeded, minute, hour = await self._script(
+                keys=self._keys(key, now),
+                args=[
+                    self.requests_per_minute,
+                    self.requests_per_hour,
+                    1.0 - (now % MINUTE) / MINUTE,
+                    1.0 - (now % HOUR) / HOUR,
+                    pending,
+                ]
+            )
+        except Exception as e:
+            logger.warning(
+                f"Redis rate limiter unavailable, using in-memory fallback: {str(e)[:100]}"
+            )
+            self._redis_down_until = now + self.retry_after
+            self._keep_pending(key, snapshot)
+            return self.fallback.is_allowed(key)
+
+        self._snapshots[key] = _Snapshot(int(minute), int(hour), now)
+        while len(self._snapshots) > self.max_snapshots:
+            self._snapshots.popitem(last=False)
+
+        if allowed:
+            return True, "OK"
+        if exceeded == 1:
+            return False, f"Rate limit exceeded: {self.requests_per_minute} requests per minute"
+        return False, f"Rate limit exceeded: {self.requests_per_hour} requests per hour"
+
+    def _keep_pending(self, key: str, snapshot: _Snapshot | None) -> None:
+        """Put back increments a failed script call didn't flush"""
+        if snapshot is None or not snapshot.pending:
+            return
+        current = self._snapshots.get(key)
+        if current is None:
+            # Too old for the local pre-check by the time Redis is retried
+            self._snapshots[key] = snapshot
+        else:
+            current.pending += snapshot.pending
+
+    def reset(self) -> None:
+        """Forget local state (Redis counters are left alone)"""
+        self._snapshots.clear()
+        self._redis_down_until = 0.0
+        self.fallback.reset()
+
+    async def aclose(self) -> None:
+        """Close the Redis client"""
+        await self.redis.aclose()
+
+
+# Limiters that own their Redis client (made by from_url)
+_owned_limiters: "weakref.WeakSet[RedisRateLimiter]" = weakref.WeakSet()
+
+
+async def close_redis_limiters() -> None:
+    """Close the Redis clients of limiters created with from_url (app shutdown)"""
+    for limiter in list(_owned_limiters):
+        try:
+            await limiter.aclose()
+        except Exception as e:
+            logger.warning(f"Failed to close Redis rate limiter client: {str(e)[:100]}")
+        _owned_limiters.discard(limiter)
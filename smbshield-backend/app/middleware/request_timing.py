@@ -0,0 +1,74 @@
+"""
+Request timing middleware
+Adds a correlation ID and per-phase Server-Timing header to every response
+"""
+import logging
+import re
+
+from starlette.datastructures import Headers
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.utils import log_with_context
+from app.utils.request_timing import finish_request, start_request
+
+logger = logging.getLogger(__name__)
+
+# Client-supplied IDs end up in logs, so only plain tokens are accepted
+_REQUEST_ID = re.compile(r"[A-Za-z0-9._-]{1,64}")
+
+
+class RequestTimingMiddleware:
+    """
+    Middleware starting the per-request timers
+    Pure ASGI and outermost. The Server-Timing header carries the phases that
+    finished before the response started; the completion log has all of them.
+    Only requests of at least log_min_duration_ms are logged at INFO; the
+    rest (health probes, cache hits) only at DEBUG.
+    """
+
+    def __init__(self, app: ASGIApp, log_min_duration_ms: float = 1000.0):
+        self.app = app
+        self.log_min_duration_ms = log_min_duration_ms
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        # Reuse the caller's correlation ID (e.g. from the frontend) when sane
+        request_id = Headers(scope=scope).get("x-request-id")
+        if request_id is not None and not _REQUEST_ID.fullmatch(request_id):
+            request_id = None
+
+        timings, token = start_request(request_id)
+        status_code = 500
+
+        async def send_with_timing(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                message["headers"] = [
+                    *message.get("headers", ()),
+                    (b"server-timing", timings.server_timing().encode("latin-1")),
+                    (b"x-request-id", timings.request_id.encode("latin-1")),
+                ]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            finish_request(token)
+            duration_ms = timings.elapsed_ms()
+            slow = duration_ms >= self.log_min_duration_ms
+            if slow or logger.isEnabledFor(logging.DEBUG):
+                log_with_context(
+                    logger,
+                    "info" if slow else "debug",
+                    "Request completed",
+                    request_id=timings.request_id,
+                    method=scope["method"],
+                    path=scope["path"],
+                    status=status_code,
+                    duration_ms=round(duration_ms, 1),
+                    **timings.log_fields()
+                )
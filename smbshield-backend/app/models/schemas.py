@@ -2,9 +2,13 @@
 Pydantic models for API requests and responses
 """
 from pydantic import BaseModel, Field
-from typing import List, Optional
+from typing import Annotated, List, Optional
 from datetime import datetime
 
+# Hard ceiling on prompts per batch, checked while parsing; CHAT_BATCH_MAX_PROMPTS
+# (enforced by the route) can only lower it
+BATCH_PROMPTS_LIMIT = 1000
+
 
 class ChatMessage(BaseModel):
     """Single chat message"""
@@ -15,16 +19,21 @@ class ChatMessage(BaseModel):
 class ChatRequest(BaseModel):
     """Request model for chat endpoint"""
     message: str = Field(..., min_length=1, max_length=2000, description="User's message")
+    conversation_id: Optional[str] = Field(
+        default=None,
+        max_length=100,
+        description="Conversation to continue (from a previous response); the server keeps the history"
+    )
     conversation_history: Optional[List[ChatMessage]] = Field(
         default=None,
-        description="Previous messages in the conversation"
+        description="Previous messages, only used to seed a new conversation"
     )
     
     class Config:
         json_schema_extra = {
             "example": {
                 "message": "What is SQL injection?",
-                "conversation_history": []
+                "conversation_id": "conv_123"
             }
         }
 
@@ -33,6 +42,10 @@ class ChatResponse(BaseModel):
     """Response model for chat endpoint"""
     response: str = Field(..., description="Agent's response")
     conversation_id: Optional[str] = Field(None, description="Conversation identifier")
+    tier: str = Field(
+        "llm",
+        description="What answered: faq (pre-written), cache, llm, offline (upstream unavailable) or error"
+    )
     timestamp: datetime = Field(default_factory=datetime.utcnow)
     
     class Config:
@@ -40,11 +53,52 @@ class ChatResponse(BaseModel):
             "example": {
                 "response": "SQL injection is a code injection technique...",
                 "conversation_id": "conv_123",
+                "tier": "llm",
                 "timestamp": "2024-01-20T10:30:00Z"
             }
         }
 
 
+class ChatStreamEnd(BaseModel):
+    """Final event of a streamed chat response"""
+    conversation_id: Optional[str] = Field(None, description="Conversation identifier")
+    tier: Optional[str] = Field(None, description="What answered (see ChatResponse.tier)")
+    timestamp: datetime = Field(default_factory=datetime.utcnow)
+
+
+class ChatBatchRequest(BaseModel):
+    """Request model for the batch chat endpoint"""
+    prompts: List[Annotated[str, Field(max_length=2000)]] = Field(
+        ...,
+        min_length=1,
+        max_length=BATCH_PROMPTS_LIMIT,
+        description="Independent messages, each answered without conversation context"
+    )
+
+    class Config:
+        json_schema_extra = {
+            "example": {
+                "prompts": ["What is SQL injection?", "Write a one-line quiz hint about phishing"]
+            }
+        }
+
+
+class ChatBatchResult(BaseModel):
+    """Outcome of one batch prompt; exactly one of response and error is set"""
+    index: int = Field(..., description="Position of the prompt in the request")
+    response: Optional[str] = Field(None, description="Agent's response")
+    tier: Optional[str] = Field(None, description="What answered (see ChatResponse.tier)")
+    error: Optional[str] = Field(None, description="Why the prompt wasn't answered")
+
+
+class ChatBatchResponse(BaseModel):
+    """Final event of a batch: every result, in prompt order"""
+    results: List[ChatBatchResult]
+    succeeded: int = Field(..., description="Prompts answered")
+    failed: int = Field(..., description="Prompts rejected or not answered")
+    timestamp: datetime = Field(default_factory=datetime.utcnow)
+
+
 class LessonSummary(BaseModel):
     """Summary of an OWASP lesson"""
     id: str
@@ -59,3 +113,24 @@ class LessonDetail(LessonSummary):
     content: str
     examples: List[str]
     key_takeaways: List[str]
+
+
+class LessonList(BaseModel):
+    """A page of lesson summaries"""
+    items: List[LessonSummary]
+    total: int = Field(..., description="Lessons matching the filters")
+    offset: int
+    limit: int
+
+
+class LessonSearchHit(BaseModel):
+    """A lesson matching a search, with the passage that matched best"""
+    lesson: LessonSummary
+    score: float = Field(..., description="BM25 relevance, higher is better")
+    snippet: str
+
+
+class LessonSearchResults(BaseModel):
+    """Lesson search results, best match first"""
+    query: str
+    results: List[LessonSearchHit]
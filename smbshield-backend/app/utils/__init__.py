@@ -4,7 +4,9 @@ Utility functions for SMBShield API
 from app.utils.sanitization import (
     sanitize_user_input,
     sanitize_conversation_history,
-    validate_api_key
+    validate_api_key,
+    UnsafeInputError,
+    SanitizationCache
 )
 from app.utils.logging_config import (
     setup_logging,
@@ -16,6 +18,8 @@ __all__ = [
     "sanitize_user_input",
     "sanitize_conversation_history",
     "validate_api_key",
+    "UnsafeInputError",
+    "SanitizationCache",
     "setup_logging",
     "get_logger",
     "log_with_context"
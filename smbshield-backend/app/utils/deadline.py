@@ -0,0 +1,53 @@
+"""
+Per-request deadlines
+
+The deadline middleware stores an absolute time.monotonic() deadline in a
+context variable for each request. Upstream callers (the LLM router) cap
+their timeouts and retry budgets with remaining(), and raise
+DeadlineExceeded once it is gone. Tasks started while handling the request
+inherit the deadline, unless started in without_deadline(). Outside a
+request there is no deadline.
+"""
+import asyncio
+import time
+from contextvars import Context, ContextVar, Token, copy_context
+from typing import Optional
+
+
+class DeadlineExceeded(asyncio.TimeoutError):
+    """The request ran out of time; not retried, answered with 504"""
+
+
+_deadline: ContextVar[Optional[float]] = ContextVar("request_deadline", default=None)
+
+
+def set_deadline(seconds: float) -> Token:
+    """Give the current request seconds from now (called by the middleware)"""
+    return _deadline.set(time.monotonic() + seconds)
+
+
+def reset_deadline(token: Token) -> None:
+    _deadline.reset(token)
+
+
+def current_deadline() -> Optional[float]:
+    """Absolute time.monotonic() deadline of the current request, if any"""
+    return _deadline.get()
+
+
+def remaining() -> Optional[float]:
+    """Seconds left before the current request's deadline (None without one)"""
+    deadline = _deadline.get()
+    return None if deadline is None else deadline - time.monotonic()
+
+
+def expired() -> bool:
+    deadline = _deadline.get()
+    return deadline is not None and time.monotonic() >= deadline
+
+
+def without_deadline() -> Context:
+    """Copy of the current context with no request deadline (for work shared between requests)"""
+    context = copy_context()
+    context.run(_deadline.set, None)
+    return context
@@ -0,0 +1,194 @@
+"""
+Sampling and aggregation for high-volume log events
+
+An abusive client can trigger the same warning thousands of times a minute.
+Events logged with a dedupe key are collapsed: the first occurrence of a key
+in each interval is logged as usual, repeats are only counted (or sampled at
+the logger's ratio), and a summary record with the count and first/last seen
+times is logged when the interval ends.
+"""
+import asyncio
+import logging
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+
+class _Repeats:
+    """Occurrences of one (logger, key) event in the current interval"""
+
+    __slots__ = ("logger", "key", "level", "message", "context", "count", "first_seen", "last_seen")
+
+    def __init__(
+        self, logger: logging.Logger, key: str, level: int, message: str, context: dict, now: float
+    ):
+        self.logger = logger
+        self.key = key
+        self.level = level
+        self.message = message
+        self.context = context
+        self.count = 0  # Repeats after the first occurrence
+        self.first_seen = now
+        self.last_seen = now
+
+
+def _iso(timestamp: float) -> str:
+    return datetime.fromtimestamp(timestamp, timezone.utc).isoformat()
+
+
+class LogAggregator:
+    """
+    Collapses repeated log events into periodic summary records
+
+    Sample ratios map logger names to the fraction of repeats still logged
+    individually (0 logs only the first occurrence and the summary). The
+    longest matching logger name prefix wins, like logging's own hierarchy.
+    """
+
+    def __init__(
+        self,
+        interval_seconds: float = 60.0,
+        sample_ratios: Optional[Dict[str, float]] = None,
+        default_ratio: float = 0.0,
+        max_keys: int = 10_000,
+        clock: Callable[[], float] = time.time
+    ):
+        self.interval_seconds = interval_seconds
+        self.default_ratio = default_ratio
+        self.max_keys = max_keys
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._events: "OrderedDict[Tuple[str, str], _Repeats]" = OrderedDict()
+        self._next_flush = clock() + interval_seconds
+        self._ratio_cache: Dict[str, float] = {}
+        self._task: Optional[asyncio.Task] = None
+        self.sample_ratios = dict(sample_ratios or {})
+        self.suppressed = 0
+
+    def configure(
+        self,
+        interval_seconds: Optional[float] = None,
+        sample_ratios: Optional[Dict[str, float]] = None
+    ) -> None:
+        """Change the interval and/or sample ratios at runtime"""
+        with self._lock:
+            if interval_seconds is not None:
+                self.interval_seconds = interval_seconds
+                self._next_flush = self._clock() + interval_seconds
+            if sample_ratios is not None:
+                self.sample_ratios = dict(sample_ratios)
+                self._ratio_cache.clear()
+
+    def sample_ratio(self, logger_name: str) -> float:
+        """Fraction of repeats logged individually for a logger"""
+        ratio = self._ratio_cache.get(logger_name)
+        if ratio is None:
+            ratio = self.default_ratio
+            name = logger_name
+            while name:
+                if name in self.sample_ratios:
+                    ratio = self.sample_ratios[name]
+                    break
+                name = name.rpartition(".")[0]
+            self._ratio_cache[logger_name] = ratio
+        return ratio
+
+    def log(
+        self,
+        logger: logging.Logger,
+        level: int,
+        message: str,
+        key: str,
+        context: Dict[str, Any]
+    ) -> None:
+        """Log an event unless it repeats a key already logged this interval"""
+        if not logger.isEnabledFor(level):
+            return
+
+        now = self._clock()
+        summaries: List[_Repeats] = []
+        with self._lock:
+            if now >= self._next_flush:
+                summaries = self._drain()
+                self._next_flush = now + self.interval_seconds
+
+            event_id = (logger.name, key)
+            repeats = self._events.get(event_id)
+            if repeats is None:
+                self._events[event_id] = _Repeats(logger, key, level, message, context, now)
+                while len(self._events) > self.max_keys:
+                    summaries.append(self._events.popitem(last=False)[1])
+                emit = True
+            else:
+                repeats.count += 1
+                repeats.last_seen = now
+                repeats.message = message
+                repeats.context = context
+                self._events.move_to_end(event_id)
+                # Deterministic sampling: every (1 / ratio)th repeat
+                ratio = self.sample_ratio(logger.name)
+                emit = ratio > 0 and int(repeats.count * ratio) != int((repeats.count - 1) * ratio)
+                if not emit:
+                    self.suppressed += 1
+
+        self._emit_summaries(summaries)
+        if emit:
+            logger.log(level, message, extra={"extra_fields": {**context, "event_key": key}})
+
+    def flush(self) -> None:
+        """Log summaries for every event repeated since the last flush"""
+        with self._lock:
+            summaries = self._drain()
+            self._next_flush = self._clock() + self.interval_seconds
+        self._emit_summaries(summaries)
+
+    def _drain(self) -> List[_Repeats]:
+        """Forget all tracked events, returning those that need a summary"""
+        summaries = list(self._events.values())
+        self._events.clear()
+        return summaries
+
+    @staticmethod
+    def _emit_summaries(summaries: List[_Repeats]) -> None:
+        for repeats in summaries:
+            if repeats.count == 0:
+                continue
+            repeats.logger.log(
+                repeats.level,
+                f"{repeats.message} (repeated {repeats.count} more times)",
+                extra={"extra_fields": {
+                    **repeats.context,
+                    "event_key": repeats.key,
+                    "repeat_count": repeats.count,
+                    "first_seen": _iso(repeats.first_seen),
+                    "last_seen": _iso(repeats.last_seen),
+                }},
+            )
+
+    async def run(self) -> None:
+        """Flush summaries every interval (run as a background task)"""
+        while True:
+            await asyncio.sleep(self.interval_seconds)
+            self.flush()
+
+    def start(self) -> None:
+        """Start periodic flushing on the running event loop"""
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self.run())
+
+    async def stop(self) -> None:
+        """Stop periodic flushing and log any pending summaries"""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        self.flush()
+
+
+# Shared by log_with_context(..., dedupe_key=...)
+log_aggregator = LogAggregator()
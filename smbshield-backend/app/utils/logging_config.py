@@ -1,12 +1,34 @@
 """
 Structured logging configuration for production debugging
+
+With use_queue, log calls only put the record on an in-memory queue; a
+background listener thread formats and writes it, so the event loop never
+blocks on JSON encoding or stdout.
 """
+import atexit
 import logging
+import logging.handlers
+import queue
 import sys
-from datetime import datetime
-from typing import Any, Dict
+import time
+from typing import Any, Dict, Optional
 import json
 
+from app.utils.log_sampling import log_aggregator
+from app.utils.request_timing import current_request_id
+
+try:
+    import orjson
+except ImportError:  # Optional faster encoder
+    orjson = None
+
+
+def _dumps(data: Dict[str, Any]) -> str:
+    """Serialize a log record dict, using orjson when installed"""
+    if orjson is not None:
+        return orjson.dumps(data, default=str).decode("utf-8")
+    return json.dumps(data, default=str)
+
 
 class StructuredFormatter(logging.Formatter):
     """
@@ -14,10 +36,26 @@ class StructuredFormatter(logging.Formatter):
     Makes logs easily parseable by log aggregators
     """
 
+    def __init__(self, static_fields: Optional[Dict[str, Any]] = None):
+        super().__init__()
+        # Fields that are the same on every line, merged in once per record
+        self.static_fields = dict(static_fields or {})
+        # (whole second, formatted "YYYY-MM-DDTHH:MM:SS") for the last record
+        self._second = (None, "")
+
+    def _timestamp(self, created: float) -> str:
+        """UTC ISO-8601 timestamp of the record, formatting each second once"""
+        second = int(created)
+        cached_second, prefix = self._second
+        if second != cached_second:
+            prefix = time.strftime("%Y-%m-%dT%H:%M:%S", time.gmtime(second))
+            self._second = (second, prefix)
+        return f"{prefix}.{int((created - second) * 1_000_000):06d}"
+
     def format(self, record: logging.LogRecord) -> str:
         """Format log record as JSON"""
         log_data: Dict[str, Any] = {
-            "timestamp": datetime.utcnow().isoformat(),
+            "timestamp": self._timestamp(record.created),
             "level": record.levelname,
             "logger": record.name,
             "message": record.getMessage(),
@@ -26,6 +64,9 @@ class StructuredFormatter(logging.Formatter):
             "line": record.lineno,
         }
 
+        if self.static_fields:
+            log_data.update(self.static_fields)
+
         # Add exception info if present
         if record.exc_info:
             log_data["exception"] = self.formatException(record.exc_info)
@@ -34,7 +75,7 @@ class StructuredFormatter(logging.Formatter):
         if hasattr(record, "extra_fields"):
             log_data.update(record.extra_fields)
 
-        return json.dumps(log_data)
+        return _dumps(log_data)
 
 
 class SimpleFormatter(logging.Formatter):
@@ -71,18 +112,71 @@ class SimpleFormatter(logging.Formatter):
         return formatted
 
 
-def setup_logging(debug: bool = True) -> None:
+class _HandOffQueueHandler(logging.handlers.QueueHandler):
+    """
+    Queue handler that leaves formatting to the listener thread
+
+    The stock QueueHandler formats the record before enqueueing it. Records
+    stay in this process, so only the message is merged (its args may change
+    after the call returns) and everything else is done off-thread.
+    """
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        record.msg = record.getMessage()
+        record.args = None
+        return record
+
+
+# Listener draining the log queue, if setup_logging(use_queue=True) started one
+_listener: Optional[logging.handlers.QueueListener] = None
+
+
+def stop_logging() -> None:
+    """
+    Flush queued log records and stop the listener thread
+    Later records are written synchronously by the listener's handlers
+    """
+    global _listener
+    if _listener is None:
+        return
+
+    _listener.stop()
+    root_logger = logging.getLogger()
+    root_logger.handlers = [
+        handler for handler in root_logger.handlers
+        if not isinstance(handler, _HandOffQueueHandler)
+    ] + list(_listener.handlers)
+    _listener = None
+
+
+atexit.register(stop_logging)
+
+
+def setup_logging(
+    debug: bool = True,
+    use_queue: bool = False,
+    static_fields: Optional[Dict[str, Any]] = None,
+    aggregation_interval: Optional[float] = None,
+    sample_ratios: Optional[Dict[str, float]] = None
+) -> None:
     """
     Configure application logging
 
     Args:
         debug: If True, use simple colored output. If False, use JSON structured logs.
+        use_queue: If True, format and write records on a background thread
+        static_fields: Fields added to every JSON log line (e.g. service name)
+        aggregation_interval: Seconds between summaries of repeated events
+        sample_ratios: Per-logger fraction of repeated events still logged individually
     """
+    global _listener
+
     # Root logger
     root_logger = logging.getLogger()
     root_logger.setLevel(logging.DEBUG if debug else logging.INFO)
 
-    # Remove existing handlers
+    # Remove existing handlers (and flush a previous queue listener)
+    stop_logging()
     root_logger.handlers = []
 
     # Console handler
@@ -93,10 +187,21 @@ def setup_logging(debug: bool = True) -> None:
     if debug:
         formatter = SimpleFormatter()
     else:
-        formatter = StructuredFormatter()
+        formatter = StructuredFormatter(static_fields)
 
     console_handler.setFormatter(formatter)
-    root_logger.addHandler(console_handler)
+
+    if use_queue:
+        log_queue: "queue.SimpleQueue[logging.LogRecord]" = queue.SimpleQueue()
+        root_logger.addHandler(_HandOffQueueHandler(log_queue))
+        _listener = logging.handlers.QueueListener(
+            log_queue, console_handler, respect_handler_level=True
+        )
+        _listener.start()
+    else:
+        root_logger.addHandler(console_handler)
+
+    log_aggregator.configure(aggregation_interval, sample_ratios)
 
     # Reduce noise from third-party libraries
     logging.getLogger("uvicorn").setLevel(logging.INFO)
@@ -108,6 +213,7 @@ def setup_logging(debug: bool = True) -> None:
     logger = logging.getLogger(__name__)
     logger.info(
         f"Logging configured: {'DEBUG mode (colored)' if debug else 'PRODUCTION mode (JSON)'}"
+        f"{', background writer' if use_queue else ''}"
     )
 
 
@@ -128,6 +234,7 @@ def log_with_context(
     logger: logging.Logger,
     level: str,
     message: str,
+    dedupe_key: Optional[str] = None,
     **context: Any
 ) -> None:
     """
@@ -137,8 +244,21 @@ def log_with_context(
         logger: Logger instance
         level: Log level (debug, info, warning, error, critical)
         message: Log message
+        dedupe_key: Collapse repeats of this event into periodic summaries (optional)
         **context: Additional context key-value pairs
+
+    Inside a request, the request's correlation ID is added as request_id.
     """
+    request_id = current_request_id()
+    if request_id is not None:
+        context.setdefault("request_id", request_id)
+
+    if dedupe_key is not None:
+        log_aggregator.log(
+            logger, logging.getLevelName(level.upper()), message, dedupe_key, context
+        )
+        return
+
     log_func = getattr(logger, level.lower())
 
     # Create a log record with extra fields
@@ -0,0 +1,121 @@
+"""
+Prometheus metrics for the API
+
+Metrics are plain prometheus_client collectors updated in-process; each
+update is a dict lookup and an uncontended per-process lock, so the hot path
+stays cheap. Label children used on every request are bound once at import.
+
+With several uvicorn workers, set PROMETHEUS_MULTIPROC_DIR to an empty
+directory shared by the workers (before they start). Each worker then writes
+its samples to its own memory-mapped file and /metrics merges them, so a
+scrape sees the whole machine whichever worker answers it. Workers call
+mark_process_dead() on shutdown so their live gauges drop out of the merge.
+"""
+import os
+
+from prometheus_client import (
+    CONTENT_TYPE_LATEST,
+    REGISTRY,
+    CollectorRegistry,
+    Counter,
+    Gauge,
+    Histogram,
+    generate_latest,
+)
+
+# HTTP latency buckets (seconds): fast health checks up to slow LLM answers
+_HTTP_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+_UPSTREAM_BUCKETS = (0.1, 0.25, 0.5, 1.0, 2.0, 4.0, 8.0, 15.0, 30.0, 60.0)
+
+HTTP_REQUEST_DURATION = Histogram(
+    "smbshield_http_request_duration_seconds",
+    "HTTP request latency by route template, method and status (its _count is the request count)",
+    ["method", "route", "status"],
+    buckets=_HTTP_BUCKETS,
+)
+
+GEMINI_REQUEST_DURATION = Histogram(
+    "smbshield_gemini_request_duration_seconds",
+    "Gemini call latency by operation",
+    ["operation"],
+    buckets=_UPSTREAM_BUCKETS,
+)
+
+GEMINI_ERRORS = Counter(
+    "smbshield_gemini_errors_total",
+    "Failed Gemini calls by operation and exception type",
+    ["operation", "error"],
+)
+
+LLM_ROUTER_EVENTS = Counter(
+    "smbshield_llm_router_events_total",
+    "LLM router outcomes by backend: error, timeout, rejected, retry, failover, hedge, hedge_won, circuit_open",
+    ["backend", "event"],
+)
+
+LLM_CIRCUIT_STATE = Gauge(
+    "smbshield_llm_circuit_state",
+    "Circuit breaker state per LLM backend (0 closed, 1 half-open, 2 open)",
+    ["backend"],
+    multiprocess_mode="livemax",
+)
+
+REQUEST_CANCELLATIONS = Counter(
+    "smbshield_request_cancellations_total",
+    "Requests whose work was cancelled, by reason (deadline or client disconnect)",
+    ["reason"],
+)
+
+RATE_LIMIT_REJECTIONS = Counter(
+    "smbshield_rate_limit_rejections_total",
+    "Requests rejected by the rate limiter, by exceeded window",
+    ["window"],
+)
+
+SANITIZATION_REJECTIONS = Counter(
+    "smbshield_sanitization_rejections_total",
+    "Inputs rejected by an injection rule",
+    ["rule"],
+)
+
+CACHE_LOOKUPS = Counter(
+    "smbshield_cache_lookups_total",
+    "Cache lookups by cache and result (hit ratio = hit / (hit + miss))",
+    ["cache", "result"],
+)
+
+# Bound once so hot paths skip the label lookup
+RESPONSE_CACHE_HIT = CACHE_LOOKUPS.labels("response", "hit")
+RESPONSE_CACHE_MISS = CACHE_LOOKUPS.labels("response", "miss")
+HISTORY_CACHE_HIT = CACHE_LOOKUPS.labels("history_sanitization", "hit")
+HISTORY_CACHE_MISS = CACHE_LOOKUPS.labels("history_sanitization", "miss")
+TIP_POOL_HIT = CACHE_LOOKUPS.labels("quick_tip_pool", "hit")
+TIP_POOL_MISS = CACHE_LOOKUPS.labels("quick_tip_pool", "miss")
+COALESCED_REQUESTS = CACHE_LOOKUPS.labels("request_coalescing", "hit")
+FAQ_HIT = CACHE_LOOKUPS.labels("faq", "hit")
+FAQ_MISS = CACHE_LOOKUPS.labels("faq", "miss")
+
+
+def render_metrics() -> tuple:
+    """
+    Current metrics in the Prometheus text format
+
+    Returns:
+        (body bytes, content type)
+    """
+    if os.environ.get("PROMETHEUS_MULTIPROC_DIR"):
+        from prometheus_client import multiprocess
+
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    else:
+        registry = REGISTRY
+    return generate_latest(registry), CONTENT_TYPE_LATEST
+
+
+def mark_process_dead() -> None:
+    """Drop this worker's live gauge samples from a multiprocess metrics directory"""
+    if os.environ.get("PROMETHEUS_MULTIPROC_DIR"):
+        from prometheus_client import multiprocess
+
+        multiprocess.mark_process_dead(os.getpid())
@@ -0,0 +1,87 @@
+"""
+Per-request phase timers and correlation IDs
+
+The request timing middleware puts a RequestTimings in a context variable for
+each request; code anywhere below it (middleware, routes, the tutor) adds
+phases with `with phase("name"):` or record(). Tasks started while handling
+the request inherit the context, so their phases land on the same request.
+Outside a request these helpers are no-ops.
+"""
+import secrets
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar, Token
+from typing import Dict, Iterator, Optional, Tuple
+
+
+class RequestTimings:
+    """Correlation ID plus accumulated milliseconds per phase"""
+
+    __slots__ = ("request_id", "started", "phases")
+
+    def __init__(self, request_id: Optional[str] = None):
+        self.request_id = request_id or secrets.token_hex(8)
+        self.started = time.perf_counter()
+        self.phases: Dict[str, float] = {}
+
+    def add(self, name: str, seconds: float) -> None:
+        self.phases[name] = self.phases.get(name, 0.0) + seconds * 1000
+
+    def elapsed_ms(self) -> float:
+        return (time.perf_counter() - self.started) * 1000
+
+    def server_timing(self) -> str:
+        """Server-Timing header value: phases so far plus the total"""
+        entries = [f"{name};dur={ms:.1f}" for name, ms in self.phases.items()]
+        entries.append(f"total;dur={self.elapsed_ms():.1f}")
+        return ", ".join(entries)
+
+    def log_fields(self) -> Dict[str, float]:
+        """Phases as flat log fields, e.g. timing_gemini_ms"""
+        return {f"timing_{name}_ms": round(ms, 1) for name, ms in self.phases.items()}
+
+
+_current: ContextVar[Optional[RequestTimings]] = ContextVar("request_timings", default=None)
+
+
+def start_request(request_id: Optional[str] = None) -> Tuple[RequestTimings, Token]:
+    """Begin timing the current request (called by the middleware)"""
+    timings = RequestTimings(request_id)
+    return timings, _current.set(timings)
+
+
+def finish_request(token: Token) -> None:
+    """Stop attributing phases to the request started with token"""
+    _current.reset(token)
+
+
+def current_timings() -> Optional[RequestTimings]:
+    """Timings of the request being handled, if any"""
+    return _current.get()
+
+
+def current_request_id() -> Optional[str]:
+    """Correlation ID of the request being handled, if any"""
+    timings = _current.get()
+    return timings.request_id if timings is not None else None
+
+
+def record(name: str, seconds: float) -> None:
+    """Add time to a phase of the current request"""
+    timings = _current.get()
+    if timings is not None:
+        timings.add(name, seconds)
+
+
+@contextmanager
+def phase(name: str) -> Iterator[None]:
+    """Time the enclosed block as a phase of the current request"""
+    timings = _current.get()
+    if timings is None:
+        yield
+        return
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        timings.add(name, time.perf_counter() - started)
@@ -4,7 +4,91 @@ Prevents XSS, injection attacks, and malicious input
 """
 import re
 import html
-from typing import Optional
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import Dict, Optional, Tuple
+
+from app.utils.metrics import HISTORY_CACHE_HIT, HISTORY_CACHE_MISS, SANITIZATION_REJECTIONS
+
+# Injection rules in the order they are checked:
+# (name, pattern, case-insensitive, literal-first lowercase form)
+# The last form matches lowercased text exactly when the pattern matches the
+# original text - it starts with a literal so the regex engine can skip ahead
+# instead of trying every position ("d(?<!\w.)rop" is "\bdrop" with the word
+# boundary checked after the first letter).
+INJECTION_RULES: Tuple[Tuple[str, str, bool, str], ...] = (
+    # SQL injection
+    ("sql_drop_table", r'\bDROP\s+TABLE\b', True, r'd(?<!\w.)rop\s+table\b'),
+    ("sql_delete_from", r'\bDELETE\s+FROM\b', True, r'd(?<!\w.)elete\s+from\b'),
+    ("sql_insert_into", r'\bINSERT\s+INTO\b', True, r'i(?<!\w.)nsert\s+into\b'),
+    ("sql_update_set", r'\bUPDATE\s+\w+\s+SET\b', True, r'u(?<!\w.)pdate\s+\w+\s+set\b'),
+    ("sql_stacked_drop", r';\s*DROP\s+', True, r';\s*drop\s+'),
+    ("sql_line_comment", r'--\s*$', True, r'--\s*$'),
+    ("sql_block_comment", r'/\*.*?\*/', True, r'/\*.*?\*/'),
+    # Command injection (case-sensitive, so checked on the original text)
+    ("cmd_substitution", r'\$\(', False, r'\$\('),
+    ("cmd_backtick", r'`', False, r'`'),
+    ("cmd_pipe_sh", r'\|\s*sh\b', False, r'\|\s*sh\b'),
+    ("cmd_pipe_bash", r'\|\s*bash\b', False, r'\|\s*bash\b'),
+    ("cmd_and_chain", r'&&', False, r'&&'),
+    ("cmd_or_chain", r'\|\|', False, r'\|\|'),
+)
+
+# Exact rules as written, for text the lowercase forms can't handle
+_RULE_MATCHERS = tuple(
+    (name, re.compile(pattern, re.IGNORECASE if ignore_case else 0))
+    for name, pattern, ignore_case, _ in INJECTION_RULES
+)
+
+# Literal-first rules; case-insensitive ones run on the lowercased text
+_FAST_RULE_MATCHERS = tuple(
+    (name, re.compile(fast_pattern), ignore_case)
+    for name, _, ignore_case, fast_pattern in INJECTION_RULES
+)
+
+# All rules in one pass over the lowercased text. Lowercasing can only add
+# matches to the case-sensitive rules, so text this passes is clean.
+_PREFILTER = re.compile("|".join(fast for _, _, _, fast in INJECTION_RULES))
+
+# Lowercasing keeps lengths and \w/\s classes intact, except that "İ" becomes
+# "i" plus U+0307. Besides that, only "ı" and "ſ" still match ASCII letters
+# under IGNORECASE after lowercasing, so text containing any of these is
+# checked with the exact rules instead.
+_CASEFOLD_ODDITIES = ("\u0131", "\u017f", "\u0307")
+
+
+class UnsafeInputError(ValueError):
+    """Input matched an injection rule; .rule names the rule that fired"""
+
+    def __init__(self, rule: str):
+        super().__init__("Input contains potentially dangerous content")
+        self.rule = rule
+
+
+def find_dangerous_rule(text: str) -> Optional[str]:
+    """
+    Return the name of the first injection rule matching text, or None
+
+    Args:
+        text: HTML-escaped user input
+    """
+    lowered = text.lower()
+    if not lowered.isascii() and any(c in lowered for c in _CASEFOLD_ODDITIES):
+        for name, matcher in _RULE_MATCHERS:
+            if matcher.search(text):
+                return name
+        return None
+
+    # Common case: one compiled pass proves the text clean
+    if _PREFILTER.search(lowered) is None:
+        return None
+
+    # Something looked suspicious - find the first rule that fires
+    for name, matcher, ignore_case in _FAST_RULE_MATCHERS:
+        if matcher.search(lowered if ignore_case else text):
+            return name
+    return None
 
 
 def sanitize_user_input(text: str, max_length: int = 2000) -> str:
@@ -19,7 +103,7 @@ def sanitize_user_input(text: str, max_length: int = 2000) -> str:
         Sanitized text safe for processing
 
     Raises:
-        ValueError: If input is invalid
+        ValueError: If input is invalid (UnsafeInputError if it matched an injection rule)
     """
     if not text:
         raise ValueError("Input cannot be empty")
@@ -35,44 +119,93 @@ def sanitize_user_input(text: str, max_length: int = 2000) -> str:
         raise ValueError("Input too short")
 
     # HTML escape to prevent XSS
+    # (this also removes every "<", so script tags can't survive it)
     text = html.escape(text)
 
-    # Remove potentially dangerous patterns
-    # Block script tags
-    text = re.sub(r'<script[^>]*>.*?</script>', '', text, flags=re.IGNORECASE | re.DOTALL)
-
-    # Block SQL injection attempts
-    dangerous_sql = [
-        r'\bDROP\s+TABLE\b',
-        r'\bDELETE\s+FROM\b',
-        r'\bINSERT\s+INTO\b',
-        r'\bUPDATE\s+\w+\s+SET\b',
-        r';\s*DROP\s+',
-        r'--\s*$',
-        r'/\*.*?\*/',
-    ]
-    for pattern in dangerous_sql:
-        if re.search(pattern, text, re.IGNORECASE):
-            raise ValueError("Input contains potentially dangerous content")
-
-    # Block command injection
-    dangerous_commands = [
-        r'\$\(',
-        r'`',
-        r'\|\s*sh\b',
-        r'\|\s*bash\b',
-        r'&&',
-        r'\|\|',
-    ]
-    for pattern in dangerous_commands:
-        if re.search(pattern, text):
-            raise ValueError("Input contains potentially dangerous content")
+    # Block SQL and command injection attempts
+    rule = find_dangerous_rule(text)
+    if rule is not None:
+        SANITIZATION_REJECTIONS.labels(rule).inc()
+        raise UnsafeInputError(rule)
 
     return text
 
 
+class SanitizationCache:
+    """
+    Bounded LRU memo of sanitize_user_input results, keyed by content hash
+
+    Clients resend the same prior turns with every request, so history
+    messages are usually sanitized already. Stores the sanitized text, or None
+    if the message was rejected. Thread-safe.
+    """
+
+    def __init__(self, max_entries: int = 4096):
+        self.max_entries = max_entries
+        # Format: {content digest: sanitized text or None}, least recently used first
+        self._entries: "OrderedDict[bytes, Optional[str]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @staticmethod
+    def make_key(content: str) -> bytes:
+        return hashlib.blake2b(content.encode("utf-8", "surrogatepass"), digest_size=16).digest()
+
+    def sanitize(self, content: str) -> Optional[str]:
+        """Sanitized content, or None if sanitize_user_input rejects it"""
+        key = self.make_key(content)
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                HISTORY_CACHE_HIT.inc()
+                return self._entries[key]
+            self.misses += 1
+            HISTORY_CACHE_MISS.inc()
+
+        # Sanitize outside the lock; a duplicate computation is harmless
+        try:
+            result = sanitize_user_input(content)
+        except ValueError:
+            result = None
+
+        with self._lock:
+            self._entries[key] = result
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return result
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def stats(self) -> Dict[str, float]:
+        """Counters for monitoring"""
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": round(self.hits / lookups, 3) if lookups else 0.0,
+        }
+
+
+# Shared by every request in the process
+history_cache = SanitizationCache()
+
+
 def sanitize_conversation_history(
-    history: Optional[list], max_messages: int = 50
+    history: Optional[list],
+    max_messages: int = 50,
+    cache: Optional[SanitizationCache] = history_cache
 ) -> list:
     """
     Sanitize conversation history
@@ -80,6 +213,7 @@ def sanitize_conversation_history(
     Args:
         history: List of message dictionaries
         max_messages: Maximum number of messages to keep
+        cache: Memo of previously sanitized messages (None to disable)
 
     Returns:
         Sanitized and validated history
@@ -106,17 +240,24 @@ def sanitize_conversation_history(
         if msg["role"] not in ["user", "assistant", "system"]:
             continue
 
-        # Sanitize content
-        try:
-            content = sanitize_user_input(msg["content"])
-            sanitized.append({
-                "role": msg["role"],
-                "content": content
-            })
-        except ValueError:
+        # Sanitize content (previously seen messages come from the cache)
+        if cache is not None and isinstance(msg["content"], str):
+            content = cache.sanitize(msg["content"])
+        else:
+            try:
+                content = sanitize_user_input(msg["content"])
+            except ValueError:
+                content = None
+
+        if content is None:
             # Skip invalid messages
             continue
 
+        sanitized.append({
+            "role": msg["role"],
+            "content": content
+        })
+
     return sanitized
 
 
@@ -0,0 +1,4 @@
+"""
+Benchmarks and measurement scripts for SMBShield API
+Run from smbshield-backend/ with: python -m benchmarks.<script>
+"""
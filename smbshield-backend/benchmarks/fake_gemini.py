@@ -0,0 +1,139 @@
+"""
+Local stand-in for the Gemini REST API
+
+Serves generateContent and streamGenerateContent (SSE) with configurable
+latency, latency jitter, error rate and streaming chunk size, so the API can
+be load tested without spending Gemini quota. Point the app at it with
+GEMINI_BASE_URL=http://127.0.0.1:8090.
+
+    python -m benchmarks.fake_gemini --port 8090 --latency 0.8 --jitter 0.3 --error-rate 0.01
+"""
+import argparse
+import asyncio
+import json
+import random
+from dataclasses import dataclass
+
+from starlette.applications import Starlette
+from starlette.requests import Request
+from starlette.responses import JSONResponse, StreamingResponse
+from starlette.routing import Route
+
+ANSWER = (
+    "Think of SQL injection like someone slipping extra instructions into an "
+    "order form. Use parameterized queries so your database treats what customers "
+    "type as data, never as commands. Keep your software updated, limit what your "
+    "database account can do, and ask your web developer to test every form. "
+)
+
+
+@dataclass
+class FakeGeminiConfig:
+    """Behaviour of the fake upstream"""
+    latency: float = 0.8  # Mean seconds until the full answer (first chunk for streams)
+    jitter: float = 0.2  # Standard deviation of the latency, in seconds
+    error_rate: float = 0.0  # Fraction of calls answered with HTTP 503
+    chunk_words: int = 4  # Words per streamed chunk
+    chunk_interval: float = 0.02  # Seconds between streamed chunks
+    answer_words: int = 120  # Length of every answer
+
+
+def _answer(words: int) -> str:
+    base = ANSWER.split()
+    return " ".join(base[i % len(base)] for i in range(words))
+
+
+def _payload(text: str, prompt_chars: int) -> dict:
+    return {
+        "candidates": [{
+            "content": {"role": "model", "parts": [{"text": text}]},
+            "finishReason": "STOP",
+            "index": 0,
+        }],
+        "usageMetadata": {
+            "promptTokenCount": prompt_chars // 4,
+            "candidatesTokenCount": len(text) // 4,
+            "totalTokenCount": (prompt_chars + len(text)) // 4,
+        },
+        "modelVersion": "fake-gemini",
+    }
+
+
+def create_app(config: FakeGeminiConfig) -> Starlette:
+    """Build the fake Gemini ASGI app"""
+    answer = _answer(config.answer_words)
+    stats = {"calls": 0, "errors": 0}
+
+    def delay() -> float:
+        return max(0.0, random.gauss(config.latency, config.jitter))
+
+    async def models(request: Request):
+        _, _, action = request.path_params["target"].partition(":")
+        prompt_chars = len(await request.body())
+        stats["calls"] += 1
+
+        if random.random() < config.error_rate:
+            stats["errors"] += 1
+            await asyncio.sleep(delay() / 4)
+            return JSONResponse(
+                {"error": {"code": 503, "message": "The model is overloaded.", "status": "UNAVAILABLE"}},
+                status_code=503,
+            )
+
+        if action == "generateContent":
+            await asyncio.sleep(delay())
+            return JSONResponse(_payload(answer, prompt_chars))
+
+        if action == "streamGenerateContent":
+            async def events():
+                await asyncio.sleep(delay())
+                words = answer.split(" ")
+                for i in range(0, len(words), config.chunk_words):
+                    text = " ".join(words[i:i + config.chunk_words]) + " "
+                    yield f"data: {json.dumps(_payload(text, prompt_chars))}\r\n\r\n"
+                    await asyncio.sleep(config.chunk_interval)
+
+            return StreamingResponse(events(), media_type="text/event-stream")
+
+        return JSONResponse({"error": {"code": 404, "message": f"Unsupported action {action}"}}, status_code=404)
+
+    async def stats_endpoint(request: Request):
+        return JSONResponse(stats)
+
+    return Starlette(routes=[
+        Route("/{version}/models/{target:path}", models, methods=["POST"]),
+        Route("/stats", stats_endpoint),
+    ])
+
+
+def add_arguments(parser: argparse.ArgumentParser) -> None:
+    """Fake upstream options, shared with the load test"""
+    defaults = FakeGeminiConfig()
+    parser.add_argument("--latency", type=float, default=defaults.latency)
+    parser.add_argument("--jitter", type=float, default=defaults.jitter)
+    parser.add_argument("--error-rate", type=float, default=defaults.error_rate)
+    parser.add_argument("--chunk-words", type=int, default=defaults.chunk_words)
+    parser.add_argument("--chunk-interval", type=float, default=defaults.chunk_interval)
+    parser.add_argument("--answer-words", type=int, default=defaults.answer_words)
+
+
+def config_from_args(args: argparse.Namespace) -> FakeGeminiConfig:
+    return FakeGeminiConfig(
+        latency=args.latency,
+        jitter=args.jitter,
+        error_rate=args.error_rate,
+        chunk_words=args.chunk_words,
+        chunk_interval=args.chunk_interval,
+        answer_words=args.answer_words,
+    )
+
+
+if __name__ == "__main__":
+    import uvicorn
+
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8090)
+    add_arguments(parser)
+    args = parser.parse_args()
+    uvicorn.run(create_app(config_from_args(args)), host=args.host, port=args.port, log_level="warning")
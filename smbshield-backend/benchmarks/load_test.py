@@ -0,0 +1,259 @@
+"""
+Load test the API against a local fake Gemini
+
+Starts benchmarks.fake_gemini and the app (uvicorn, production settings,
+rate limits lifted), then drives each scenario at a fixed concurrency for a
+fixed duration and reports throughput, latency percentiles, errors and the
+app's resident memory. Use --json to save results for comparing releases.
+
+    python -m benchmarks.load_test --concurrency 50 --duration 20 --latency 0.8
+    python -m benchmarks.load_test --scenarios chat --workers 2 --json results.json
+    python -m benchmarks.load_test --url http://127.0.0.1:8000   # app already running
+"""
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+from collections import Counter
+from typing import Callable, Dict, List, Optional
+
+import httpx
+
+from benchmarks import fake_gemini
+
+# Production mode only accepts these hosts (TrustedHostMiddleware)
+HOST_HEADER = "api.smbshield.com"
+
+QUESTIONS = [
+    "How do I stop phishing emails reaching my staff?",
+    "What is SQL injection and should my shop worry about it?",
+    "How should we store customer passwords?",
+    "Is our chatbot at risk of prompt injection?",
+    "What does broken access control look like in practice?",
+]
+
+
+def scenario_requests(name: str, unique_ratio: float) -> Callable[[int], dict]:
+    """Build the request for the nth call of a scenario"""
+    if name == "chat":
+        def build(n: int) -> dict:
+            question = QUESTIONS[n % len(QUESTIONS)]
+            # Unique questions miss the response cache and reach the fake upstream
+            if (n * 7919 % 1000) / 1000 < unique_ratio:
+                question = f"{question} (load test {n})"
+            return {"method": "POST", "url": "/api/v1/chat/", "json": {"message": question}}
+        return build
+    if name == "stream":
+        def build(n: int) -> dict:
+            message = f"{QUESTIONS[n % len(QUESTIONS)]} (stream {n})"
+            return {"method": "POST", "url": "/api/v1/chat/stream", "json": {"message": message}}
+        return build
+    if name == "quick-tip":
+        return lambda n: {"method": "GET", "url": "/api/v1/chat/quick-tip"}
+    if name == "health-live":
+        return lambda n: {"method": "GET", "url": "/health/live"}
+    if name == "health-ready":
+        return lambda n: {"method": "GET", "url": "/health/ready"}
+    raise ValueError(f"Unknown scenario {name}")
+
+
+def rss_mb(pids: List[int]) -> Optional[float]:
+    """Resident memory of the given processes and their children (Linux /proc)"""
+    total_kb = 0
+    seen = set()
+    pending = list(pids)
+    while pending:
+        pid = pending.pop()
+        if pid in seen:
+            continue
+        seen.add(pid)
+        try:
+            with open(f"/proc/{pid}/status") as status:
+                for line in status:
+                    if line.startswith("VmRSS:"):
+                        total_kb += int(line.split()[1])
+            with open(f"/proc/{pid}/task/{pid}/children") as children:
+                pending.extend(int(child) for child in children.read().split())
+        except (FileNotFoundError, ProcessLookupError, PermissionError):
+            continue
+    return total_kb / 1024 if seen and total_kb else None
+
+
+def percentile(sorted_values: List[float], fraction: float) -> float:
+    if not sorted_values:
+        return float("nan")
+    index = min(len(sorted_values) - 1, int(round(fraction * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+
+async def run_scenario(
+    client: httpx.AsyncClient,
+    name: str,
+    concurrency: int,
+    duration: float,
+    unique_ratio: float,
+    app_pids: List[int]
+) -> Dict:
+    """Drive one scenario and summarize it"""
+    build = scenario_requests(name, unique_ratio)
+    latencies: List[float] = []
+    statuses: Counter = Counter()
+    counter = iter(range(10**9))
+    deadline = time.perf_counter() + duration
+    peak_rss = rss_mb(app_pids)
+
+    async def worker() -> None:
+        while time.perf_counter() < deadline:
+            request = build(next(counter))
+            started = time.perf_counter()
+            try:
+                response = await client.request(**request)
+                await response.aread()
+                statuses[response.status_code] += 1
+            except httpx.HTTPError as e:
+                statuses[type(e).__name__] += 1
+            latencies.append(time.perf_counter() - started)
+
+    async def sample_memory() -> None:
+        nonlocal peak_rss
+        while time.perf_counter() < deadline:
+            current = rss_mb(app_pids)
+            if current is not None:
+                peak_rss = max(peak_rss or 0.0, current)
+            await asyncio.sleep(0.5)
+
+    started = time.perf_counter()
+    await asyncio.gather(sample_memory(), *(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    ok = sum(count for status, count in statuses.items() if isinstance(status, int) and status < 400)
+    return {
+        "scenario": name,
+        "concurrency": concurrency,
+        "requests": len(latencies),
+        "ok": ok,
+        "statuses": {str(status): count for status, count in statuses.items()},
+        "throughput_rps": round(len(latencies) / elapsed, 1),
+        "p50_ms": round(percentile(latencies, 0.50) * 1000, 1),
+        "p95_ms": round(percentile(latencies, 0.95) * 1000, 1),
+        "p99_ms": round(percentile(latencies, 0.99) * 1000, 1),
+        "mean_ms": round(statistics.fmean(latencies) * 1000, 1) if latencies else None,
+        "peak_rss_mb": round(peak_rss, 1) if peak_rss else None,
+    }
+
+
+def wait_until_up(url: str, timeout: float = 30.0) -> None:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            if httpx.get(url, headers={"Host": HOST_HEADER}, timeout=1.0).status_code < 500:
+                return
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.2)
+    raise RuntimeError(f"{url} did not come up within {timeout:.0f}s")
+
+
+def start_servers(args: argparse.Namespace) -> List[subprocess.Popen]:
+    """Start the fake Gemini and the app; returns [fake, app]"""
+    fake_cmd = [
+        sys.executable, "-m", "benchmarks.fake_gemini", "--port", str(args.fake_port),
+        "--latency", str(args.latency), "--jitter", str(args.jitter),
+        "--error-rate", str(args.error_rate), "--chunk-words", str(args.chunk_words),
+        "--chunk-interval", str(args.chunk_interval), "--answer-words", str(args.answer_words),
+    ]
+    env = {
+        **os.environ,
+        "SECRET_KEY": os.environ.get("SECRET_KEY", "load-test-secret"),
+        "GEMINI_API_KEY": "fake-key",
+        "GEMINI_BASE_URL": f"http://127.0.0.1:{args.fake_port}",
+        "LLM_BACKENDS": "gemini",
+        "DEBUG": "False",
+        "REQUIRE_API_KEY": "False",
+        "RATE_LIMIT_PER_MINUTE": str(10**9),
+        "RATE_LIMIT_PER_HOUR": str(10**9),
+        "USE_MOCK_RESPONSES": "False",
+    }
+    app_cmd = [
+        sys.executable, "-m", "uvicorn", "app.main:app", "--host", "127.0.0.1",
+        "--port", str(args.app_port), "--workers", str(args.workers), "--log-level", "warning",
+    ]
+    output = None if args.verbose else subprocess.DEVNULL
+    fake = subprocess.Popen(fake_cmd, stdout=output, stderr=output)
+    app = subprocess.Popen(app_cmd, env=env, stdout=output, stderr=output)
+    try:
+        wait_until_up(f"http://127.0.0.1:{args.fake_port}/stats")
+        wait_until_up(f"http://127.0.0.1:{args.app_port}/health/live")
+    except Exception:
+        stop_servers([fake, app])
+        raise
+    return [fake, app]
+
+
+def stop_servers(processes: List[subprocess.Popen]) -> None:
+    for process in processes:
+        process.terminate()
+    for process in processes:
+        try:
+            process.wait(timeout=10)
+        except subprocess.TimeoutExpired:
+            process.kill()
+
+
+async def main(args: argparse.Namespace) -> List[Dict]:
+    processes: List[subprocess.Popen] = []
+    base_url = args.url
+    app_pids: List[int] = []
+    if base_url is None:
+        processes = start_servers(args)
+        base_url = f"http://127.0.0.1:{args.app_port}"
+        app_pids = [processes[1].pid]
+
+    results = []
+    limits = httpx.Limits(max_connections=args.concurrency, max_keepalive_connections=args.concurrency)
+    try:
+        async with httpx.AsyncClient(
+            base_url=base_url, headers={"Host": HOST_HEADER}, limits=limits, timeout=60.0
+        ) as client:
+            for name in args.scenarios.split(","):
+                result = await run_scenario(
+                    client, name.strip(), args.concurrency, args.duration, args.unique_ratio, app_pids
+                )
+                results.append(result)
+                print(
+                    f"{result['scenario']:13s} c={result['concurrency']:<4d} "
+                    f"{result['throughput_rps']:8.1f} req/s  "
+                    f"p50 {result['p50_ms']:8.1f} ms  p95 {result['p95_ms']:8.1f} ms  "
+                    f"p99 {result['p99_ms']:8.1f} ms  ok {result['ok']}/{result['requests']}  "
+                    f"rss {result['peak_rss_mb'] or 'n/a'} MB  {result['statuses']}"
+                )
+    finally:
+        stop_servers(processes)
+
+    if args.json:
+        with open(args.json, "w") as output:
+            json.dump({"args": vars(args), "results": results}, output, indent=2)
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--scenarios", default="health-live,health-ready,quick-tip,chat,stream",
+                        help="Comma-separated: chat, stream, quick-tip, health-live, health-ready")
+    parser.add_argument("--concurrency", type=int, default=20)
+    parser.add_argument("--duration", type=float, default=15.0, help="Seconds per scenario")
+    parser.add_argument("--unique-ratio", type=float, default=1.0,
+                        help="Fraction of chat questions that miss the response cache")
+    parser.add_argument("--url", default=None, help="Target a running app instead of starting one")
+    parser.add_argument("--app-port", type=int, default=8000)
+    parser.add_argument("--fake-port", type=int, default=8090)
+    parser.add_argument("--workers", type=int, default=1, help="uvicorn workers for the app")
+    parser.add_argument("--json", default=None, help="Write results to this file")
+    parser.add_argument("--verbose", action="store_true", help="Show server output")
+    fake_gemini.add_arguments(parser)
+    asyncio.run(main(parser.parse_args()))
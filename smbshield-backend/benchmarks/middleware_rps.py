@@ -0,0 +1,97 @@
+"""
+Requests per second through the middleware stack
+
+Calls a trivial endpoint directly over ASGI (no sockets, no HTTP client) so
+the figure reflects middleware overhead only. Rate limits are raised so
+nothing is rejected.
+
+    python -m benchmarks.middleware_rps --requests 20000
+"""
+import argparse
+import asyncio
+import time
+
+from fastapi import FastAPI
+
+from app.middleware import (
+    APIKeyMiddleware,
+    DeadlineMiddleware,
+    MetricsMiddleware,
+    RateLimitMiddleware,
+)
+
+
+def build_app(with_middleware: bool) -> FastAPI:
+    bench_app = FastAPI()
+
+    @bench_app.get("/bench")
+    async def bench():
+        return {"ok": True}
+
+    if with_middleware:
+        bench_app.add_middleware(APIKeyMiddleware)
+        bench_app.add_middleware(
+            RateLimitMiddleware, requests_per_minute=10**9, requests_per_hour=10**9
+        )
+        bench_app.add_middleware(DeadlineMiddleware)
+        bench_app.add_middleware(MetricsMiddleware)
+    return bench_app
+
+
+SCOPE = {
+    "type": "http",
+    "asgi": {"version": "3.0"},
+    "http_version": "1.1",
+    "method": "GET",
+    "scheme": "http",
+    "path": "/bench",
+    "raw_path": b"/bench",
+    "root_path": "",
+    "query_string": b"",
+    "headers": [(b"host", b"bench")],
+    "client": ("203.0.113.1", 50000),
+    "server": ("bench", 80),
+}
+
+
+async def call(app) -> None:
+    messages = [{"type": "http.request", "body": b"", "more_body": False}]
+
+    async def receive():
+        # Like a server: the body once, then block until the client disconnects
+        if messages:
+            return messages.pop()
+        await asyncio.Event().wait()
+
+    async def send(message):
+        pass
+
+    await app(dict(SCOPE), receive, send)
+
+
+async def run(app, requests: int, concurrency: int) -> float:
+    # Warm up (builds the middleware stack)
+    for _ in range(100):
+        await call(app)
+
+    started = time.perf_counter()
+    for _ in range(requests // concurrency):
+        await asyncio.gather(*(call(app) for _ in range(concurrency)))
+    return requests / (time.perf_counter() - started)
+
+
+async def main(requests: int, concurrency: int) -> None:
+    bare = await run(build_app(False), requests, concurrency)
+    stacked = await run(build_app(True), requests, concurrency)
+    print(f"requests={requests} concurrency={concurrency}")
+    print(f"no middleware:        {bare:9.0f} req/s")
+    print(f"full stack:           {stacked:9.0f} req/s "
+          f"({(1 / stacked - 1 / bare) * 1e6:.1f} us/request overhead)")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--requests", type=int, default=20000)
+    parser.add_argument("--concurrency", type=int, default=1)
+    args = parser.parse_args()
+    asyncio.run(main(args.requests, args.concurrency))
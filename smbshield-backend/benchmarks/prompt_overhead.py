@@ -0,0 +1,94 @@
+"""
+Measure input tokens and latency per tutor request, before and after
+moving the system prompt into system_instruction / cached content
+
+Before: system prompt sent as a fake user turn plus a canned model reply.
+After: only the user turn, with the prompt in the request config.
+
+Needs a real GEMINI_API_KEY (this makes 2 x --requests upstream calls):
+
+    python -m benchmarks.prompt_overhead --requests 5
+    GEMINI_CONTEXT_CACHE_ENABLED=True python -m benchmarks.prompt_overhead
+"""
+import argparse
+import asyncio
+import statistics
+import time
+
+from google.genai import types
+
+from app.agents.owasp_tutor import TUTOR_SYSTEM_PROMPT, get_tutor
+
+QUESTIONS = [
+    "What is XSS?",
+    "How does SQL injection work?",
+    "What are the OWASP Top 10?",
+    "What is prompt injection?",
+    "How do I secure my small business website?",
+]
+
+
+def legacy_contents(user_message: str) -> list:
+    """Request layout used before the system prompt moved into the config"""
+    return [
+        types.Content(role="user", parts=[types.Part(text=TUTOR_SYSTEM_PROMPT)]),
+        types.Content(
+            role="model",
+            parts=[types.Part(text="Understood! I'm Professor Shield, ready to teach cybersecurity in a friendly, practical way.")]
+        ),
+        types.Content(role="user", parts=[types.Part(text=user_message)]),
+    ]
+
+
+async def measure(gemini, contents, config) -> tuple:
+    """Return (input_tokens, cached_tokens, latency_ms) for one call"""
+    started = time.perf_counter()
+    response = await gemini.client.aio.models.generate_content(
+        model=gemini.model_name,
+        contents=contents,
+        config=config
+    )
+    latency_ms = (time.perf_counter() - started) * 1000
+    usage = response.usage_metadata
+    return usage.prompt_token_count, usage.cached_content_token_count or 0, latency_ms
+
+
+def report(label: str, samples: list) -> None:
+    tokens = [s[0] for s in samples]
+    cached = [s[1] for s in samples]
+    latency = [s[2] for s in samples]
+    print(
+        f"{label:<8} input_tokens avg={statistics.mean(tokens):7.1f}  "
+        f"cached avg={statistics.mean(cached):7.1f}  "
+        f"latency_ms p50={statistics.median(latency):7.1f} max={max(latency):7.1f}"
+    )
+
+
+async def main(requests: int) -> None:
+    tutor = get_tutor()
+    gemini = tutor.router.backend("gemini")
+    if gemini is None:
+        raise SystemExit("Gemini isn't a configured LLM backend (check LLM_BACKENDS)")
+    questions = [QUESTIONS[i % len(QUESTIONS)] for i in range(requests)]
+
+    before = [await measure(gemini, legacy_contents(q), None) for q in questions]
+    after = [
+        await measure(
+            gemini, gemini._contents(tutor._build_messages(q)), await gemini.system_prompt.config()
+        )
+        for q in questions
+    ]
+
+    print(f"model={gemini.model_name} requests={requests} "
+          f"context_cache={'on' if gemini.system_prompt.cache_name else 'off'}")
+    report("before", before)
+    report("after", after)
+    saved = statistics.mean(s[0] for s in before) - statistics.mean(s[0] for s in after)
+    print(f"input tokens saved per request: {saved:.1f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--requests", type=int, default=5)
+    args = parser.parse_args()
+    asyncio.run(main(args.requests))
@@ -0,0 +1,99 @@
+"""
+Per-message cost of input sanitization
+
+Times sanitize_user_input on 2000-character messages (clean, and with an
+injection near the end) and sanitize_conversation_history on a 50-message
+history, against the previous pattern-by-pattern implementation. History is
+timed without the memo cache and with it, as a client resending the same
+turns plus one new message each request.
+
+    python -m benchmarks.sanitization_bench --iterations 2000
+"""
+import argparse
+import html
+import random
+import re
+import timeit
+
+from app.utils.sanitization import (
+    INJECTION_RULES,
+    SanitizationCache,
+    sanitize_conversation_history,
+    sanitize_user_input,
+)
+
+WORDS = (
+    "how do i protect my small business website from attackers what is sql "
+    "injection and cross site scripting should we update our passwords or "
+    "enable multi factor authentication for every employee account"
+).split()
+
+
+def legacy_sanitize(text: str, max_length: int = 2000) -> str:
+    """Previous implementation: one re.search per rule"""
+    text = text.strip()
+    if len(text) > max_length:
+        raise ValueError("Input too long")
+    text = html.escape(text)
+    text = re.sub(r'<script[^>]*>.*?</script>', '', text, flags=re.IGNORECASE | re.DOTALL)
+    for _, pattern, ignore_case, _ in INJECTION_RULES:
+        if re.search(pattern, text, re.IGNORECASE if ignore_case else 0):
+            raise ValueError("Input contains potentially dangerous content")
+    return text
+
+
+def make_message(rng: random.Random, length: int = 2000) -> str:
+    words = []
+    while sum(len(w) + 1 for w in words) < length:
+        words.append(rng.choice(WORDS))
+    return " ".join(words)[:length]
+
+
+def per_call_us(func, arg, iterations: int) -> float:
+    def call():
+        try:
+            func(arg)
+        except ValueError:
+            pass
+    return timeit.timeit(call, number=iterations) / iterations * 1e6
+
+
+def main(iterations: int) -> None:
+    rng = random.Random(42)
+    clean = make_message(rng)
+    hostile = clean[:1900] + " ; DROP TABLE users"
+    hostile = hostile[-2000:]
+    history = [
+        {"role": "user" if i % 2 == 0 else "assistant", "content": make_message(rng, 400)}
+        for i in range(50)
+    ]
+
+    print(f"iterations={iterations}")
+    for label, text in (("clean 2000 chars", clean), ("injection 2000 chars", hostile)):
+        before = per_call_us(legacy_sanitize, text, iterations)
+        after = per_call_us(sanitize_user_input, text, iterations)
+        print(f"{label:22s} legacy {before:8.1f} us   compiled {after:8.1f} us   ({before / after:.1f}x)")
+
+    rounds = max(1, iterations // 50)
+    uncached = per_call_us(
+        lambda h: sanitize_conversation_history(h, cache=None), history, rounds
+    )
+
+    cache = SanitizationCache()
+    sanitize_conversation_history(history, cache=cache)
+    growing = [history[:-1] + [{"role": "user", "content": f"{i} " + make_message(rng, 400)}]
+               for i in range(rounds)]
+    started = timeit.default_timer()
+    for turns in growing:
+        sanitize_conversation_history(turns, cache=cache)
+    cached = (timeit.default_timer() - started) / rounds * 1e6
+
+    print(f"{'history 50 x 400 chars':22s} uncached {uncached:8.1f} us   "
+          f"cached {cached:8.1f} us   hit ratio {cache.stats()['hit_ratio']:.3f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--iterations", type=int, default=2000)
+    args = parser.parse_args()
+    main(args.iterations)
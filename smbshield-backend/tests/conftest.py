@@ -0,0 +1,120 @@
+"""
+Shared fixtures and fakes for the SMBShield API test suite
+"""
+import asyncio
+import json
+from types import SimpleNamespace
+
+import pytest
+
+from app.agents.llm_backends import LLMBackend
+from app.agents.llm_router import LLMRouter
+from app.agents.owasp_tutor import OWASPTutor
+from app.main import app
+from app.middleware import RateLimitMiddleware
+
+QUESTION = [("user", "What is XSS?")]
+
+
+class FakeAsyncModels:
+    """Stand-in for client.aio.models that sleeps like a slow upstream"""
+
+    def __init__(self, delay: float = 0.05, text: str = "Use strong passwords."):
+        self.delay = delay
+        self.text = text
+        self.calls = 0
+        self.in_flight = 0
+        self.max_in_flight = 0
+
+    async def generate_content(self, model, contents, config=None):
+        self.calls += 1
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            await asyncio.sleep(self.delay)
+        finally:
+            self.in_flight -= 1
+        return SimpleNamespace(text=self.text)
+
+    async def generate_content_stream(self, model, contents, config=None):
+        self.calls += 1
+
+        async def chunks():
+            for word in self.text.split(" "):
+                await asyncio.sleep(0)
+                yield SimpleNamespace(text=word + " ")
+
+        return chunks()
+
+
+def make_tutor(models: FakeAsyncModels, max_concurrent: int = 32) -> OWASPTutor:
+    """Build a tutor wired to a fake async Gemini client (the only backend)"""
+    tutor = OWASPTutor()
+    gemini = tutor.router.backend("gemini")
+    gemini.client = SimpleNamespace(aio=SimpleNamespace(models=models))
+    # One attempt per call; retries are covered by test_llm_router
+    tutor.router = LLMRouter([gemini], retry_attempts=1)
+    tutor._upstream_slots = asyncio.Semaphore(max_concurrent)
+    return tutor
+
+
+class FakeBackend(LLMBackend):
+    """Backend answering after a delay, or failing"""
+
+    def __init__(self, name: str, delay: float = 0.0, error: Exception = None, text: str = None):
+        self.name = name
+        self.model_name = f"{name}-model"
+        self.delay = delay
+        self.error = error
+        self.text = text or f"answer from {name}"
+        self.calls = 0
+        self.cancelled = 0
+
+    async def generate(self, messages, with_system_prompt=True):
+        self.calls += 1
+        try:
+            await asyncio.sleep(self.delay)
+        except asyncio.CancelledError:
+            self.cancelled += 1
+            raise
+        if self.error is not None:
+            raise self.error
+        return self.text
+
+    async def stream(self, messages, with_system_prompt=True):
+        self.calls += 1
+        await asyncio.sleep(self.delay)
+        if self.error is not None:
+            raise self.error
+        for word in self.text.split(" "):
+            yield word + " "
+
+
+class FakeClock:
+    """Manually advanced monotonic clock"""
+
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+def parse_sse(body: str) -> list:
+    """Split an SSE body into (event, data) pairs"""
+    events = []
+    for frame in body.strip().split("\n\n"):
+        lines = dict(line.split(": ", 1) for line in frame.splitlines())
+        events.append((lines["event"], json.loads(lines["data"])))
+    return events
+
+
+@pytest.fixture(autouse=True)
+def reset_rate_limits():
+    """Start every test with empty rate limit buckets"""
+    node = app.middleware_stack
+    while node is not None:
+        if isinstance(node, RateLimitMiddleware):
+            node.limiter.reset()
+        node = getattr(node, "app", None)
+    yield
@@ -0,0 +1,48 @@
+"""
+Smoke tests for the benchmark scripts (so refactors can't silently break them)
+"""
+import importlib
+import pkgutil
+from types import SimpleNamespace
+
+import pytest
+
+import benchmarks
+from benchmarks import prompt_overhead
+from tests.conftest import make_tutor
+
+
+class FakeUsageModels:
+    """Stand-in for client.aio.models reporting token usage"""
+
+    def __init__(self):
+        self.calls = []
+
+    async def generate_content(self, model, contents, config=None):
+        self.calls.append((contents, config))
+        usage = SimpleNamespace(prompt_token_count=10 * len(contents), cached_content_token_count=None)
+        return SimpleNamespace(text="ok", usage_metadata=usage)
+
+
+class TestBenchmarks:
+    """Test that the benchmark scripts import and run against the current app"""
+
+    @pytest.mark.parametrize("name", [module.name for module in pkgutil.iter_modules(benchmarks.__path__)])
+    def test_imports(self, name):
+        """Test that every benchmark module imports"""
+        importlib.import_module(f"benchmarks.{name}")
+
+    @pytest.mark.asyncio
+    async def test_prompt_overhead_runs(self, monkeypatch, capsys):
+        """Test that prompt_overhead drives the Gemini backend before and after"""
+        models = FakeUsageModels()
+        tutor = make_tutor(models)
+        monkeypatch.setattr(prompt_overhead, "get_tutor", lambda: tutor)
+
+        await prompt_overhead.main(2)
+
+        before, after = models.calls[:2], models.calls[2:]
+        assert [len(contents) for contents, _ in before] == [3, 3]
+        assert [len(contents) for contents, _ in after] == [1, 1]
+        assert all(config.system_instruction for _, config in after)
+        assert "input tokens saved per request: 20.0" in capsys.readouterr().out
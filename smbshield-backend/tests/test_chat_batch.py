@@ -0,0 +1,131 @@
+"""
+Test suite for the batch chat endpoint
+"""
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.api.routes import chat
+from app.models.schemas import BATCH_PROMPTS_LIMIT
+from tests.conftest import FakeAsyncModels, make_tutor, parse_sse
+
+API_KEY = "batch-test-key-0123456789"
+HEADERS = {"X-API-Key": API_KEY}
+
+
+@pytest.fixture
+def batch_client(monkeypatch):
+    """Client for the chat router, with a tutor wired to a fake upstream"""
+    monkeypatch.setattr("app.agents.owasp_tutor.settings.USE_MOCK_RESPONSES", False)
+    monkeypatch.setattr("app.middleware.auth.settings.API_KEY", API_KEY)
+    monkeypatch.setattr("app.api.routes.chat.settings.CHAT_BATCH_CONCURRENCY", 3)
+    models = FakeAsyncModels(delay=0.02, text="Generated answer.")
+    monkeypatch.setattr("app.agents.owasp_tutor._tutor_instance", make_tutor(models))
+    router_app = FastAPI()
+    router_app.include_router(chat.router, prefix="/api/v1")
+    return TestClient(router_app), models
+
+
+def run_batch(client: TestClient, prompts: list) -> list:
+    response = client.post("/api/v1/chat/batch", json={"prompts": prompts}, headers=HEADERS)
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/event-stream")
+    return parse_sse(response.text)
+
+
+class TestBatchChat:
+    """Test POST /api/v1/chat/batch"""
+
+    def test_results_stream_then_done_in_order(self, batch_client):
+        """Test one result event per prompt, then every result in prompt order"""
+        client, _ = batch_client
+        prompts = [f"Should a shop with {n} staff worry about ransomware?" for n in range(6)]
+
+        events = run_batch(client, prompts)
+
+        assert [event for event, _ in events] == ["result"] * 6 + ["done"]
+        assert sorted(data["index"] for _, data in events[:-1]) == list(range(6))
+        done = events[-1][1]
+        assert [result["index"] for result in done["results"]] == list(range(6))
+        assert all(result["response"] == "Generated answer." for result in done["results"])
+        assert (done["succeeded"], done["failed"]) == (6, 0)
+
+    def test_concurrency_is_bounded(self, batch_client):
+        """Test that no more than CHAT_BATCH_CONCURRENCY prompts run at once"""
+        client, models = batch_client
+
+        run_batch(client, [f"Is backup plan {n} good enough?" for n in range(10)])
+
+        assert models.calls == 10
+        assert 1 < models.max_in_flight <= 3
+
+    def test_rejected_prompts_fail_alone(self, batch_client):
+        """Test that prompts failing sanitization get an error without stopping the batch"""
+        client, models = batch_client
+
+        done = run_batch(client, ["Should I rotate passwords?", "x; DROP TABLE users", "   "])[-1][1]
+
+        first, injected, blank = done["results"]
+        assert first["response"] and first["error"] is None
+        assert injected["error"] == "Input contains potentially dangerous content"
+        assert blank["error"] and blank["response"] is None
+        assert (done["succeeded"], done["failed"]) == (1, 2)
+        assert models.calls == 1
+
+    def test_duplicates_and_cache_are_reused(self, batch_client):
+        """Test that repeated prompts and earlier answers don't call upstream again"""
+        client, models = batch_client
+        prompt = "How often should a dentist office patch its router?"
+        client.post("/api/v1/chat/", json={"message": prompt})
+
+        done = run_batch(client, [prompt, prompt, "What is XSS?"])[-1][1]
+
+        assert [result["tier"] for result in done["results"]] == ["cache", "cache", "faq"]
+        assert models.calls == 1
+
+
+class TestBatchLimits:
+    """Test authentication and size limits"""
+
+    def test_requires_api_key(self, batch_client):
+        """Test that the batch endpoint needs a valid key even with REQUIRE_API_KEY off"""
+        client, models = batch_client
+        body = {"prompts": ["Should I rotate passwords?"]}
+
+        assert client.post("/api/v1/chat/batch", json=body).status_code == 401
+        assert client.post(
+            "/api/v1/chat/batch", json=body, headers={"X-API-Key": "wrong"}
+        ).status_code == 401
+        assert models.calls == 0
+
+    def test_unavailable_without_configured_key(self, batch_client, monkeypatch):
+        """Test that no key is accepted when API_KEY isn't configured"""
+        client, _ = batch_client
+        monkeypatch.setattr("app.middleware.auth.settings.API_KEY", None)
+
+        response = client.post("/api/v1/chat/batch", json={"prompts": ["Hi"]}, headers=HEADERS)
+        assert response.status_code == 401
+
+    def test_too_many_prompts(self, batch_client, monkeypatch):
+        """Test that batches above CHAT_BATCH_MAX_PROMPTS are rejected up front"""
+        client, models = batch_client
+        monkeypatch.setattr("app.api.routes.chat.settings.CHAT_BATCH_MAX_PROMPTS", 2)
+
+        response = client.post("/api/v1/chat/batch", json={"prompts": ["a", "b", "c"]}, headers=HEADERS)
+        assert response.status_code == 400
+        assert models.calls == 0
+
+    def test_schema_limits(self, batch_client):
+        """Test that oversized lists and prompts are rejected while parsing"""
+        client, models = batch_client
+
+        too_many = {"prompts": ["Hi"] * (BATCH_PROMPTS_LIMIT + 1)}
+        too_long = {"prompts": ["Should I rotate passwords?", "x" * 2001]}
+        assert client.post("/api/v1/chat/batch", json=too_many, headers=HEADERS).status_code == 422
+        assert client.post("/api/v1/chat/batch", json=too_long, headers=HEADERS).status_code == 422
+        assert models.calls == 0
+
+    def test_empty_batch(self, batch_client):
+        """Test that a batch needs at least one prompt"""
+        client, _ = batch_client
+        assert client.post("/api/v1/chat/batch", json={"prompts": []}, headers=HEADERS).status_code == 422
@@ -0,0 +1,72 @@
+"""
+Test suite for the streaming chat endpoint
+"""
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.api.routes import chat
+from app.main import app
+from tests.conftest import parse_sse
+
+
+@pytest.fixture
+def stream_client(monkeypatch):
+    """Client for the chat router alone, running in mock mode"""
+    monkeypatch.setattr("app.agents.owasp_tutor.settings.USE_MOCK_RESPONSES", True)
+    router_app = FastAPI()
+    router_app.include_router(chat.router, prefix="/api/v1")
+    return TestClient(router_app)
+
+
+class TestChatStream:
+    """Test Server-Sent Events streaming of tutor answers"""
+
+    def test_streams_tokens_then_done(self, stream_client):
+        """Test that mock answers arrive as several tokens followed by a done event"""
+        response = stream_client.post(
+            "/api/v1/chat/stream", json={"message": "Why is XSS dangerous for my shop?"}
+        )
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("text/event-stream")
+
+        events = parse_sse(response.text)
+        tokens = [data["text"] for event, data in events if event == "token"]
+        assert len(tokens) > 10
+        assert "Cross-Site Scripting" in "".join(tokens)
+
+        event, data = events[-1]
+        assert event == "done"
+        assert "timestamp" in data
+        assert "conversation_id" in data
+
+    def test_faq_answer_is_one_token(self, stream_client):
+        """Test that canonical questions are answered at once and flagged as faq"""
+        response = stream_client.post("/api/v1/chat/stream", json={"message": "What is XSS?"})
+
+        events = parse_sse(response.text)
+        assert [event for event, _ in events] == ["token", "done"]
+        assert "Cross-Site Scripting" in events[0][1]["text"]
+        assert events[-1][1]["tier"] == "faq"
+
+    def test_streamed_text_matches_buffered_answer(self, stream_client):
+        """Test that joining the tokens reproduces the buffered response"""
+        buffered = stream_client.post("/api/v1/chat/", json={"message": "What is CSRF?"})
+        streamed = stream_client.post("/api/v1/chat/stream", json={"message": "What is CSRF?"})
+
+        tokens = [data["text"] for event, data in parse_sse(streamed.text) if event == "token"]
+        assert "".join(tokens) == buffered.json()["response"]
+
+    def test_rejects_dangerous_input_before_streaming(self, stream_client):
+        """Test that sanitization failures return a plain 400"""
+        response = stream_client.post(
+            "/api/v1/chat/stream",
+            json={"message": "'; DROP TABLE users; --"}
+        )
+        assert response.status_code == 400
+        assert "dangerous" in response.json()["detail"].lower()
+
+    def test_stream_is_rate_limited(self):
+        """Test that the stream endpoint goes through the rate limiter"""
+        response = TestClient(app).post("/api/v1/chat/stream", json={"message": "Hello"})
+        assert "X-RateLimit-Limit-Minute" in response.headers
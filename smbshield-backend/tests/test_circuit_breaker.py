@@ -0,0 +1,273 @@
+"""
+Test suite for the LLM circuit breaker and upstream fallbacks
+"""
+import asyncio
+
+import httpx
+import pytest
+from fastapi.testclient import TestClient
+
+from app.agents.circuit_breaker import CircuitBreaker, CircuitOpenError
+from app.agents.llm_router import LLMRouter
+from app.main import app
+from tests.conftest import QUESTION, FakeAsyncModels, FakeBackend, FakeClock, make_tutor
+
+
+def http_error(status: int) -> httpx.HTTPStatusError:
+    request = httpx.Request("POST", "https://llm.example/v1/generate")
+    return httpx.HTTPStatusError(
+        f"HTTP {status}", request=request, response=httpx.Response(status, request=request)
+    )
+
+
+class TestCircuitBreaker:
+    """Test breaker state transitions"""
+
+    def test_opens_after_consecutive_failures(self):
+        """Test that the threshold of consecutive failures opens the circuit"""
+        breaker = CircuitBreaker("test", failure_threshold=3, clock=FakeClock())
+        breaker.failure()
+        breaker.failure()
+        breaker.success()
+        breaker.failure()
+        breaker.failure()
+        assert breaker.state == CircuitBreaker.CLOSED
+
+        breaker.failure()
+        assert breaker.state == CircuitBreaker.OPEN
+        assert not breaker.allow()
+
+    def test_half_open_admits_a_single_probe(self):
+        """Test that one probe is let through after the reset timeout"""
+        clock = FakeClock()
+        breaker = CircuitBreaker("test", failure_threshold=1, reset_timeout=30, clock=clock)
+        breaker.failure()
+
+        clock.now += 30
+        assert breaker.state == CircuitBreaker.HALF_OPEN
+        assert breaker.allow()
+        assert not breaker.allow()
+
+        breaker.success()
+        assert breaker.state == CircuitBreaker.CLOSED
+        assert breaker.allow()
+
+    def test_failed_probe_reopens(self):
+        """Test that a failing probe opens the circuit for another period"""
+        clock = FakeClock()
+        breaker = CircuitBreaker("test", failure_threshold=5, reset_timeout=30, clock=clock)
+        for _ in range(5):
+            breaker.failure()
+        clock.now += 30
+        assert breaker.allow()
+
+        breaker.failure()
+        assert breaker.state == CircuitBreaker.OPEN
+        assert breaker.stats()["times_opened"] == 2
+
+    def test_released_probe_can_be_retried(self):
+        """Test that a cancelled probe does not leave the circuit stuck half-open"""
+        clock = FakeClock()
+        breaker = CircuitBreaker("test", failure_threshold=1, reset_timeout=1, clock=clock)
+        breaker.failure()
+        clock.now += 1
+        assert breaker.allow()
+
+        breaker.release()
+        assert breaker.allow()
+
+
+class TestRouterBreakers:
+    """Test that the router honours open circuits and retries transient errors"""
+
+    @pytest.mark.asyncio
+    async def test_open_circuit_fails_fast(self):
+        """Test that calls stop reaching a backend once its circuit is open"""
+        backend = FakeBackend("primary", error=RuntimeError("down"))
+        router = LLMRouter([backend], failure_threshold=2, retry_attempts=1)
+
+        for _ in range(2):
+            with pytest.raises(RuntimeError):
+                await router.generate(QUESTION)
+        with pytest.raises(CircuitOpenError):
+            await router.generate(QUESTION)
+
+        assert backend.calls == 2
+        assert not router.available
+
+    @pytest.mark.asyncio
+    async def test_open_circuit_skips_to_next_backend(self):
+        """Test that an open primary is skipped without a call"""
+        primary = FakeBackend("primary", error=RuntimeError("down"))
+        router = LLMRouter([primary, FakeBackend("secondary")], failure_threshold=1, retry_attempts=1)
+        await router.generate(QUESTION)
+
+        assert await router.generate(QUESTION) == "answer from secondary"
+        assert primary.calls == 1
+
+    @pytest.mark.asyncio
+    async def test_transient_errors_are_retried(self):
+        """Test that timeouts are retried with backoff"""
+        backend = FakeBackend("primary", error=asyncio.TimeoutError())
+        router = LLMRouter([backend], retry_attempts=3, retry_base_delay=0.001, retry_max_delay=0.01)
+
+        with pytest.raises(asyncio.TimeoutError):
+            await router.generate(QUESTION)
+        assert backend.calls == 3
+
+    @pytest.mark.asyncio
+    async def test_permanent_errors_are_not_retried(self):
+        """Test that non-transient errors surface after one attempt"""
+        backend = FakeBackend("primary", error=ValueError("bad request"))
+        router = LLMRouter([backend], retry_attempts=3, retry_base_delay=0.001)
+
+        with pytest.raises(ValueError):
+            await router.generate(QUESTION)
+        assert backend.calls == 1
+
+    @pytest.mark.asyncio
+    async def test_request_errors_do_not_open_the_circuit(self):
+        """Test that a 400 caused by one prompt isn't held against the backend"""
+        backend = FakeBackend("primary", error=http_error(400))
+        router = LLMRouter([backend], failure_threshold=2, retry_attempts=1)
+
+        for _ in range(5):
+            with pytest.raises(httpx.HTTPStatusError):
+                await router.generate(QUESTION)
+
+        assert backend.calls == 5
+        assert router.available
+        assert router.health["primary"].error_rate == 0.0
+
+    @pytest.mark.asyncio
+    async def test_auth_errors_open_the_circuit(self):
+        """Test that a rejected API key counts against the backend"""
+        backend = FakeBackend("primary", error=http_error(401))
+        router = LLMRouter([backend], failure_threshold=2, retry_attempts=1)
+
+        for _ in range(2):
+            with pytest.raises(httpx.HTTPStatusError):
+                await router.generate(QUESTION)
+        assert not router.available
+
+    @pytest.mark.asyncio
+    async def test_retries_stay_within_budget(self):
+        """Test that a stalled backend can't hold a request past the retry budget"""
+        backend = FakeBackend("primary", delay=30)
+        router = LLMRouter(
+            [backend], attempt_timeout=0.2, retry_attempts=10, retry_budget=0.3, retry_base_delay=0.001
+        )
+
+        loop = asyncio.get_running_loop()
+        started = loop.time()
+        with pytest.raises(asyncio.TimeoutError):
+            await router.generate(QUESTION)
+        assert loop.time() - started < 0.6
+
+
+@pytest.fixture
+def broken_tutor(monkeypatch):
+    """Tutor whose only backend always fails, with its circuit open"""
+    monkeypatch.setattr("app.agents.owasp_tutor.settings.USE_MOCK_RESPONSES", False)
+    models = FakeAsyncModels()
+
+    async def failing(model, contents, config=None):
+        raise RuntimeError("upstream down")
+
+    models.generate_content = failing
+    tutor = make_tutor(models)
+    breaker = tutor.router.breakers["gemini"]
+    for _ in range(breaker.failure_threshold):
+        breaker.failure()
+    return tutor, models
+
+
+class TestTutorFallback:
+    """Test what the tutor answers while upstream is down"""
+
+    @pytest.mark.asyncio
+    async def test_open_circuit_serves_canned_answer(self, broken_tutor):
+        """Test that a topic answer is served without calling upstream"""
+        tutor, _ = broken_tutor
+
+        reply = await tutor.chat("What is XSS?")
+
+        assert "Cross-Site Scripting" in reply
+        assert tutor.response_cache.stats()["entries"] == 0
+
+    @pytest.mark.asyncio
+    async def test_open_circuit_prefers_stale_cache(self, broken_tutor):
+        """Test that an expired cached answer beats canned content"""
+        tutor, _ = broken_tutor
+        key = tutor._cache_key("What is XSS?")
+        tutor.response_cache.set(key, "Earlier real answer")
+        tutor.response_cache._entries[key] = ("Earlier real answer", 0.0, 100)
+
+        assert await tutor.chat("What is XSS?") == "Earlier real answer"
+
+    @pytest.mark.asyncio
+    async def test_open_circuit_stream_serves_fallback(self, broken_tutor):
+        """Test that streams fall back too, in one chunk"""
+        tutor, _ = broken_tutor
+
+        chunks = [chunk async for chunk in tutor.chat_stream("What is CSRF?")]
+
+        assert len(chunks) == 1
+        assert "CSRF" in chunks[0]
+
+    @pytest.mark.asyncio
+    async def test_upstream_error_text_is_not_echoed(self, monkeypatch):
+        """Test that the apology no longer leaks upstream error details"""
+        monkeypatch.setattr("app.agents.owasp_tutor.settings.USE_MOCK_RESPONSES", False)
+        models = FakeAsyncModels()
+
+        async def failing(model, contents, config=None):
+            raise RuntimeError("secret internal detail")
+
+        models.generate_content = failing
+        reply = await make_tutor(models).chat("Can you review my backup schedule?")
+
+        assert reply.startswith("I apologize")
+        assert "secret internal detail" not in reply
+
+    @pytest.mark.asyncio
+    async def test_upstream_error_serves_stale_cache(self, monkeypatch):
+        """Test that one failed call (circuit still closed) is enough to serve an expired answer"""
+        monkeypatch.setattr("app.agents.owasp_tutor.settings.USE_MOCK_RESPONSES", False)
+        models = FakeAsyncModels()
+
+        async def failing(model, contents, config=None):
+            raise RuntimeError("upstream down")
+
+        models.generate_content = failing
+        tutor = make_tutor(models)
+        key = tutor._cache_key("Can you review my backup schedule?")
+        tutor.response_cache.set(key, "Earlier real answer")
+        tutor.response_cache._entries[key] = ("Earlier real answer", 0.0, 100)
+
+        assert await tutor.chat("Can you review my backup schedule?") == "Earlier real answer"
+        assert tutor.router.available
+
+    @pytest.mark.asyncio
+    async def test_upstream_error_serves_known_topic(self, monkeypatch):
+        """Test that a failed call on a catalog topic is answered from the catalog"""
+        monkeypatch.setattr("app.agents.owasp_tutor.settings.USE_MOCK_RESPONSES", False)
+        models = FakeAsyncModels()
+
+        async def failing(model, contents, config=None):
+            raise RuntimeError("upstream down")
+
+        models.generate_content = failing
+        reply = await make_tutor(models).chat("How do I stop prompt injection?")
+
+        assert "Prompt Injection" in reply
+
+    def test_readiness_reports_open_circuit(self, broken_tutor, monkeypatch):
+        """Test that /health/ready shows the breaker state"""
+        tutor, _ = broken_tutor
+        monkeypatch.setattr("app.agents.owasp_tutor._tutor_instance", tutor)
+
+        data = TestClient(app).get("/health/ready").json()
+
+        assert data["status"] == "degraded"
+        assert data["checks"]["llm_backends"]["gemini"]["circuit"]["state"] == "open"
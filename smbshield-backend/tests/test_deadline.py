@@ -0,0 +1,184 @@
+"""
+Test suite for request deadlines and cancellation on client disconnect
+"""
+import asyncio
+
+import pytest
+from fastapi import FastAPI
+from fastapi.responses import StreamingResponse
+from fastapi.testclient import TestClient
+
+from app.agents.llm_router import LLMRouter
+from app.main import app
+from app.middleware import DeadlineMiddleware
+from app.utils.deadline import DeadlineExceeded, remaining, reset_deadline, set_deadline
+from tests.conftest import QUESTION, FakeBackend
+
+
+def build_app(events: dict, default_seconds: float = 0.1, route_seconds: dict = None) -> FastAPI:
+    test_app = FastAPI()
+
+    @test_app.get("/fast")
+    async def fast():
+        return {"remaining": remaining()}
+
+    @test_app.get("/slow")
+    async def slow():
+        try:
+            await asyncio.sleep(5)
+        except asyncio.CancelledError:
+            events["cancelled"] = True
+            raise
+        return {"ok": True}
+
+    @test_app.get("/slow-stream")
+    async def slow_stream():
+        async def chunks():
+            yield "first\n"
+            await asyncio.sleep(5)
+            yield "never\n"
+        return StreamingResponse(chunks(), media_type="text/plain")
+
+    test_app.add_middleware(
+        DeadlineMiddleware, default_seconds=default_seconds, route_seconds=route_seconds
+    )
+    return test_app
+
+
+class TestDeadlineMiddleware:
+    """Test deadlines enforced by the middleware"""
+
+    def test_fast_request_sees_its_deadline(self):
+        """Test that routes can read the time they have left"""
+        client = TestClient(build_app({}, default_seconds=10))
+
+        response = client.get("/fast")
+
+        assert response.status_code == 200
+        assert 9 < response.json()["remaining"] <= 10
+
+    def test_slow_request_gets_504_and_is_cancelled(self):
+        """Test that work past the deadline is cancelled and answered with 504"""
+        events = {}
+        client = TestClient(build_app(events, default_seconds=0.1))
+
+        response = client.get("/slow")
+
+        assert response.status_code == 504
+        assert events["cancelled"] is True
+
+    def test_route_override_by_prefix(self):
+        """Test that the longest matching prefix sets the deadline"""
+        middleware = DeadlineMiddleware(app=None, default_seconds=30, route_seconds={
+            "/api/v1/chat": 20, "/api/v1/chat/stream": 120,
+        })
+
+        assert middleware.deadline_for("/api/v1/chat/stream") == 120
+        assert middleware.deadline_for("/api/v1/chat/") == 20
+        assert middleware.deadline_for("/health/live") == 30
+
+    def test_started_stream_is_ended_at_deadline(self):
+        """Test that a stream past its deadline is closed after what was sent"""
+        client = TestClient(build_app({}, default_seconds=0.2))
+
+        response = client.get("/slow-stream")
+
+        assert response.status_code == 200
+        assert response.text == "first\n"
+
+    @pytest.mark.asyncio
+    async def test_disconnect_cancels_handler(self):
+        """Test that a client going away cancels the route and its upstream work"""
+        events = {}
+        middleware = build_app(events, default_seconds=10)
+        sent = []
+        incoming = [{"type": "http.request", "body": b"", "more_body": False}]
+
+        async def receive():
+            if incoming:
+                return incoming.pop(0)
+            await asyncio.sleep(0.05)  # User closes the tab mid-request
+            return {"type": "http.disconnect"}
+
+        async def send(message):
+            sent.append(message)
+
+        scope = {
+            "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1", "method": "GET",
+            "scheme": "http", "path": "/slow", "raw_path": b"/slow", "query_string": b"",
+            "root_path": "", "headers": [], "client": ("127.0.0.1", 1), "server": ("test", 80),
+        }
+        loop = asyncio.get_running_loop()
+        started = loop.time()
+        await middleware(scope, receive, send)
+
+        assert loop.time() - started < 1.0
+        assert events["cancelled"] is True
+        assert sent[0]["status"] == 499
+
+    @pytest.mark.asyncio
+    async def test_streaming_response_stops_the_watch_timer(self, monkeypatch):
+        """Test that the watcher isn't re-armed for the life of a stream holding receive()"""
+        loop = asyncio.get_running_loop()
+        armed = []
+        call_later = loop.call_later
+
+        def counting_call_later(delay, callback, *args, **kwargs):
+            if getattr(callback, "__name__", "") == "start_watching":
+                armed.append(delay)
+            return call_later(delay, callback, *args, **kwargs)
+
+        async def streaming_app(scope, receive, send):
+            # Like StreamingResponse: a listener blocks in receive() while chunks go out
+            listener = asyncio.ensure_future(receive())
+            await send({"type": "http.response.start", "status": 200, "headers": []})
+            for _ in range(10):
+                await asyncio.sleep(0.02)
+                await send({"type": "http.response.body", "body": b"x", "more_body": True})
+            await send({"type": "http.response.body", "body": b"", "more_body": False})
+            listener.cancel()
+
+        async def receive():
+            await asyncio.sleep(10)
+
+        async def send(message):
+            pass
+
+        monkeypatch.setattr(loop, "call_later", counting_call_later)
+        middleware = DeadlineMiddleware(streaming_app, default_seconds=10, watch_after=0.005)
+        await middleware({"type": "http", "path": "/stream"}, receive, send)
+
+        assert armed == [0.005]
+
+
+class TestDeadlinePropagation:
+    """Test that upstream calls honour the request deadline"""
+
+    @pytest.mark.asyncio
+    async def test_router_stops_at_request_deadline(self):
+        """Test that the router gives up at the deadline without blaming the backend"""
+        router = LLMRouter([FakeBackend("primary", delay=5)], attempt_timeout=10, retry_budget=20)
+        token = set_deadline(0.05)
+        try:
+            with pytest.raises(DeadlineExceeded):
+                await router.generate(QUESTION)
+        finally:
+            reset_deadline(token)
+
+        assert router.health["primary"].failures == 0
+        assert router.breakers["primary"].consecutive_failures == 0
+
+    def test_chat_returns_504_on_deadline(self, monkeypatch):
+        """Test that a tutor deadline surfaces as 504, not 500 or an apology"""
+        from app.agents.owasp_tutor import get_tutor
+
+        async def out_of_time(**kwargs):
+            raise DeadlineExceeded("Request deadline exceeded")
+
+        monkeypatch.setattr(get_tutor(), "reply", out_of_time)
+
+        response = TestClient(app).post(
+            "/api/v1/chat/", json={"message": "How do I explain XSS risk to my accountant?"}
+        )
+
+        assert response.status_code == 504
@@ -0,0 +1,127 @@
+"""
+Test suite for the FAQ fast path and answer tiers
+"""
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.agents.faq import FAQ
+from app.agents.topics import build_catalog
+from app.api.routes import chat
+from tests.conftest import FakeAsyncModels, make_tutor
+
+
+@pytest.fixture(scope="module")
+def faq():
+    return FAQ(build_catalog())
+
+
+@pytest.fixture
+def live_client(monkeypatch):
+    """Client for the chat router, with a tutor wired to a fake upstream"""
+    monkeypatch.setattr("app.agents.owasp_tutor.settings.USE_MOCK_RESPONSES", False)
+    models = FakeAsyncModels(text="Generated answer.")
+    monkeypatch.setattr("app.agents.owasp_tutor._tutor_instance", make_tutor(models))
+    router_app = FastAPI()
+    router_app.include_router(chat.router, prefix="/api/v1")
+    return TestClient(router_app), models
+
+
+class TestFAQLookup:
+    """Test which messages count as canonical questions"""
+
+    @pytest.mark.parametrize("message", [
+        "What is XSS?",
+        "Explain XSS in simple terms",
+        "what is  xss",
+        "What are XSS attacks?",
+        "XSS",
+    ])
+    def test_suggested_prompt_variants(self, faq, message):
+        """Test that near-verbatim copies of a suggested prompt match"""
+        assert "Cross-Site Scripting" in faq.lookup(message)
+
+    def test_html_escaped_message(self, faq):
+        """Test that sanitized (escaped) apostrophes still match"""
+        assert "SSRF" in faq.lookup("What&#x27;s SSRF?")
+
+    def test_curated_answer(self, faq):
+        """Test that curated questions outside the catalog are answered"""
+        assert "Starter Plan" in faq.lookup("How can I secure my website?")
+
+    @pytest.mark.parametrize("message", [
+        "What is XSS and how do I test my shop for it?",
+        "What is the best firewall for a bakery?",
+        "Is this safe?",
+    ])
+    def test_other_questions_go_to_the_tutor(self, faq, message):
+        """Test that anything beyond a canonical question isn't answered from the FAQ"""
+        assert faq.lookup(message) is None
+
+    @pytest.mark.parametrize("message", [
+        "what is encryption",
+        "what is mfa",
+        "how do passwords work",
+        "how to prevent logging",
+        "what is sql",
+        "What is supply chain?",
+    ])
+    def test_scoring_keywords_are_not_subjects(self, faq, message):
+        """Test that words a topic merely mentions don't get that topic's canned answer"""
+        assert faq.lookup(message) is None
+
+    @pytest.mark.parametrize("message, title", [
+        ("What is SQLi?", "SQL Injection"),
+        ("What is A03?", "Injection"),
+        ("Explain broken access control", "Broken Access Control"),
+        ("How does SQL injection work?", "SQL Injection"),
+        ("What are the OWASP Top 10?", "OWASP Top 10"),
+    ])
+    def test_titles_codes_and_aliases(self, faq, message, title):
+        """Test that a topic's title, code and aliases are canonical subjects"""
+        assert title in faq.lookup(message)
+
+
+class TestAnswerTiers:
+    """Test the tier reported with each chat response"""
+
+    def test_faq_skips_the_llm(self, live_client):
+        """Test that canonical questions are answered without an upstream call"""
+        client, models = live_client
+
+        body = client.post("/api/v1/chat/", json={"message": "What is prompt injection?"}).json()
+
+        assert body["tier"] == "faq"
+        assert "Prompt Injection" in body["response"]
+        assert models.calls == 0
+
+    def test_llm_then_cache(self, live_client):
+        """Test that other questions report llm, then cache when repeated"""
+        client, models = live_client
+        message = {"message": "Should my bakery worry about ransomware?"}
+
+        first = client.post("/api/v1/chat/", json=message).json()
+        second = client.post("/api/v1/chat/", json=message).json()
+
+        assert (first["tier"], second["tier"]) == ("llm", "cache")
+        assert models.calls == 1
+
+    def test_faq_can_be_disabled(self, live_client, monkeypatch):
+        """Test that FAQ_ENABLED=False sends everything to the tutor"""
+        client, models = live_client
+        monkeypatch.setattr("app.agents.owasp_tutor.settings.FAQ_ENABLED", False)
+
+        body = client.post("/api/v1/chat/", json={"message": "What is XSS?"}).json()
+
+        assert body["tier"] == "llm"
+        assert models.calls == 1
+
+    def test_faq_answer_joins_the_conversation(self, live_client):
+        """Test that FAQ exchanges are remembered for follow-up questions"""
+        client, _ = live_client
+
+        body = client.post("/api/v1/chat/", json={"message": "What is CSRF?"}).json()
+        from app.agents.owasp_tutor import get_tutor
+
+        conversation = get_tutor().conversations.get(body["conversation_id"])
+        assert conversation.turns[0] == ("user", "What is CSRF?")
@@ -0,0 +1,134 @@
+"""
+Test suite for lesson search
+"""
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.api.routes import lessons
+from app.content.build import compile_bundle
+from app.content.lessons import LessonLibrary
+from app.content.search import MAX_EXPANSIONS, SearchIndex, build_index
+
+SECTIONS = [
+    (0, "title", "Broken Access Control"),
+    (0, "content", "Check permissions on the server for every request."),
+    (1, "title", "Cryptographic Failures"),
+    (1, "content", "Encrypt backups and hash passwords with bcrypt."),
+    (2, "title", "Logging Failures"),
+    (2, "example", "Nobody noticed thousands of failed logins over a weekend."),
+]
+
+
+@pytest.fixture(scope="module")
+def index():
+    return SearchIndex(build_index(SECTIONS))
+
+
+@pytest.fixture
+def search_client(monkeypatch):
+    """Client for the lessons router alone, serving the compiled sources"""
+    monkeypatch.setattr("app.content.lessons._library_instance", LessonLibrary(compile_bundle()))
+    router_app = FastAPI()
+    router_app.include_router(lessons.router, prefix="/api/v1")
+    return TestClient(router_app)
+
+
+class TestSearchIndex:
+    """Test matching and ranking"""
+
+    def test_exact_word(self, index):
+        """Test that lessons containing the word are returned with the matching section"""
+        hits = index.search("bcrypt")
+        assert [hit.lesson for hit in hits] == [1]
+        assert "bcrypt" in hits[0].snippet
+
+    def test_prefix(self, index):
+        """Test that word beginnings match"""
+        assert [hit.lesson for hit in index.search("crypto")] == [1]
+
+    def test_single_typo(self, index):
+        """Test that one wrong, missing, extra or swapped letter still matches"""
+        for query in ("permisions", "permissoins", "permissionss", "pernissions"):
+            assert [hit.lesson for hit in index.search(query)] == [0], query
+
+    def test_title_match_ranks_first(self, index):
+        """Test that a word in a title outranks the same word in body text"""
+        hits = index.search("failures")
+        assert {hit.lesson for hit in hits} == {1, 2}
+        assert hits[0].snippet.endswith("Failures")
+
+    def test_stop_words_only(self, index):
+        """Test that a query of stop words matches nothing"""
+        assert index.search("what is the") == []
+
+    def test_prefix_keeps_the_most_common_terms(self):
+        """Test that a prefix with too many candidates keeps the ones in most sections"""
+        rare = [(0, "content", f"secaa{n:03d}") for n in range(MAX_EXPANSIONS + 5)]
+        common = [(1, "content", "security basics"), (2, "content", "security updates")]
+        index = SearchIndex(build_index(rare + common))
+
+        expanded = dict(index.expand("sec"))
+
+        assert len(expanded) == MAX_EXPANSIONS
+        assert "security" in expanded
+        assert {hit.lesson for hit in index.search("sec")} == {0, 1, 2}
+
+    def test_search_terms_rank_but_are_not_snippets(self):
+        """Test that a lesson's search terms count like its title but never show as the snippet"""
+        index = SearchIndex(build_index([
+            (0, "title", "Injection"),
+            (0, "terms", "SQL injection, SQLi"),
+            (0, "content", "Attackers send SQL where the app expects data, and your long paragraph goes on."),
+            (1, "title", "Output Handling"),
+            (1, "example", "Model-written SQL runs directly."),
+        ]))
+
+        hits = index.search("sql")
+        assert [hit.lesson for hit in hits] == [0, 1]
+        assert hits[0].snippet.startswith("Attackers send SQL")
+        assert index.search("sqli")[0].snippet == "Injection"
+
+    def test_filter_mask(self, index):
+        """Test that filtered-out lessons are skipped"""
+        assert index.search("failures", lessons=[True, False, True])[0].lesson == 2
+
+
+class TestSearchAPI:
+    """Test GET /api/v1/lessons/search"""
+
+    def test_search_returns_summaries_and_snippets(self, search_client):
+        """Test the result shape and that the best lesson comes first"""
+        response = search_client.get("/api/v1/lessons/search", params={"q": "prompt injection"})
+
+        assert response.status_code == 200
+        body = response.json()
+        assert body["query"] == "prompt injection"
+        assert body["results"][0]["lesson"]["id"] == "llm01-prompt-injection"
+        assert body["results"][0]["snippet"]
+
+    def test_sql_finds_the_injection_lesson_first(self, search_client):
+        """Test that a lesson's search terms put it ahead of lessons that only mention the word"""
+        body = search_client.get("/api/v1/lessons/search", params={"q": "sql"}).json()
+
+        assert body["results"][0]["lesson"]["id"] == "a03-injection"
+        assert "SQL" in body["results"][0]["snippet"]
+
+    def test_search_filters(self, search_client):
+        """Test that category filters apply to search"""
+        body = search_client.get(
+            "/api/v1/lessons/search", params={"q": "injection", "category": "owasp-top-10"}
+        ).json()
+
+        assert body["results"]
+        assert all(hit["lesson"]["category"] == "owasp-top-10" for hit in body["results"])
+
+    def test_search_requires_query(self, search_client):
+        """Test that an empty query is rejected"""
+        assert search_client.get("/api/v1/lessons/search", params={"q": ""}).status_code == 422
+
+    def test_search_is_not_a_lesson_id(self, search_client):
+        """Test that /search isn't swallowed by the detail route"""
+        response = search_client.get("/api/v1/lessons/search", params={"q": "sesion"})
+        assert response.status_code == 200
+        assert "results" in response.json()
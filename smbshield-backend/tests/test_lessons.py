@@ -0,0 +1,135 @@
+"""
+Test suite for the lesson bundle and the lessons API
+"""
+import json
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.api.routes import lessons
+from app.content.build import SOURCE_DIR, compile_bundle, load_lesson, write_bundle
+from app.content.lessons import LessonLibrary
+
+
+@pytest.fixture(scope="module")
+def bundle():
+    return compile_bundle()
+
+
+@pytest.fixture
+def lessons_client(bundle, monkeypatch):
+    """Client for the lessons router alone, serving the compiled sources"""
+    monkeypatch.setattr("app.content.lessons._library_instance", LessonLibrary(bundle))
+    router_app = FastAPI()
+    router_app.include_router(lessons.router, prefix="/api/v1")
+    return TestClient(router_app)
+
+
+class TestBundle:
+    """Test compiling and loading the lesson bundle"""
+
+    def test_sources_compile(self, bundle):
+        """Test that every source validates and both Top 10 lists are complete"""
+        ids = [lesson["id"] for lesson in bundle["lessons"]]
+        assert len(ids) == 20
+        assert sum(lesson["category"] == "owasp-llm-top-10" for lesson in bundle["lessons"]) == 10
+
+    def test_id_must_match_file_name(self, tmp_path):
+        """Test that a renamed source is rejected at build time"""
+        source = (SOURCE_DIR / "a01-broken-access-control.toml").read_text(encoding="utf-8")
+        path = tmp_path / "renamed.toml"
+        path.write_text(source, encoding="utf-8")
+
+        with pytest.raises(ValueError, match="file name"):
+            load_lesson(path)
+
+    def test_search_terms_must_be_strings(self, tmp_path):
+        """Test that a malformed search_terms list is rejected at build time"""
+        source = (SOURCE_DIR / "a01-broken-access-control.toml").read_text(encoding="utf-8")
+        path = tmp_path / "a01-broken-access-control.toml"
+        path.write_text(source + "search_terms = [\"IDOR\", 3]\n", encoding="utf-8")
+
+        with pytest.raises(ValueError, match="search_terms"):
+            load_lesson(path)
+
+    def test_stale_bundle_is_recompiled(self, bundle, tmp_path):
+        """Test that a bundle older than the sources isn't served"""
+        path = tmp_path / "lessons.bundle.json"
+        write_bundle({**bundle, "digest": "old", "lessons": []}, path)
+
+        assert len(LessonLibrary.load(path)) == 20
+
+    def test_current_bundle_is_used_as_is(self, bundle, tmp_path):
+        """Test that an up-to-date bundle is loaded without recompiling"""
+        path = tmp_path / "lessons.bundle.json"
+        write_bundle({**bundle, "lessons": bundle["lessons"][:2]}, path)
+
+        assert len(LessonLibrary.load(path)) == 2
+
+
+class TestLessonsAPI:
+    """Test the list and detail endpoints"""
+
+    def test_list_paginates(self, lessons_client):
+        """Test that offset and limit page through all lessons"""
+        first = lessons_client.get("/api/v1/lessons/", params={"limit": 5}).json()
+        second = lessons_client.get("/api/v1/lessons/", params={"offset": 5, "limit": 5}).json()
+
+        assert first["total"] == 20
+        assert [item["id"] for item in first["items"]][0] == "a01-broken-access-control"
+        assert len(second["items"]) == 5
+        assert first["items"][-1]["id"] != second["items"][0]["id"]
+
+    def test_list_filters_by_category_and_difficulty(self, lessons_client):
+        """Test that filters combine"""
+        page = lessons_client.get(
+            "/api/v1/lessons/", params={"category": "owasp-llm-top-10", "difficulty": "beginner"}
+        ).json()
+
+        assert page["total"] == len(page["items"]) > 0
+        for item in page["items"]:
+            assert item["category"] == "owasp-llm-top-10"
+            assert item["difficulty"] == "beginner"
+            assert "content" not in item
+
+    def test_unknown_filter_returns_empty_page(self, lessons_client):
+        """Test that unknown categories aren't an error"""
+        page = lessons_client.get("/api/v1/lessons/", params={"category": "cooking"}).json()
+        assert page == {"items": [], "total": 0, "offset": 0, "limit": 20}
+
+    def test_invalid_limit_is_rejected(self, lessons_client):
+        """Test that page sizes are bounded"""
+        assert lessons_client.get("/api/v1/lessons/", params={"limit": 1000}).status_code == 422
+
+    def test_detail(self, lessons_client):
+        """Test that a lesson's full content is returned"""
+        response = lessons_client.get("/api/v1/lessons/llm01-prompt-injection")
+
+        assert response.status_code == 200
+        lesson = response.json()
+        assert lesson["title"] == "Prompt Injection"
+        assert lesson["examples"] and lesson["key_takeaways"]
+        assert not lesson["content"].endswith("\n")
+
+    def test_unknown_lesson_is_404(self, lessons_client):
+        """Test that unknown ids are not found"""
+        assert lessons_client.get("/api/v1/lessons/nope").status_code == 404
+
+    def test_etag_revalidation(self, lessons_client):
+        """Test that clients holding the current version get 304"""
+        response = lessons_client.get("/api/v1/lessons/a03-injection")
+        etag = response.headers["etag"]
+
+        cached = lessons_client.get("/api/v1/lessons/a03-injection", headers={"If-None-Match": etag})
+
+        assert cached.status_code == 304
+        assert cached.content == b""
+
+    def test_payloads_are_valid_json(self, bundle):
+        """Test that the joined page bytes parse"""
+        library = LessonLibrary(bundle)
+        page = json.loads(library.page(offset=18, limit=5))
+        assert [item["id"] for item in page["items"]] == [
+            "llm09-misinformation", "llm10-unbounded-consumption"
+        ]
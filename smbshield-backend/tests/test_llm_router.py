@@ -0,0 +1,240 @@
+"""
+Test suite for the LLM backends and router
+"""
+import asyncio
+import json
+
+import httpx
+import pytest
+
+from app.agents.llm_backends import AnthropicBackend, LLMBackend, MockBackend
+from app.agents.llm_router import BackendHealth, LLMRouter, RouteOutcome
+from app.agents.owasp_tutor import OWASPTutor
+from tests.conftest import QUESTION, FakeBackend, FakeClock
+
+
+class TestFailover:
+    """Test that failing or stalled backends are routed around"""
+
+    @pytest.mark.asyncio
+    async def test_error_fails_over_to_next_backend(self):
+        """Test that an erroring primary is followed by the next backend"""
+        primary = FakeBackend("primary", error=RuntimeError("503 overloaded"))
+        router = LLMRouter([primary, FakeBackend("secondary")])
+
+        assert await router.generate(QUESTION) == "answer from secondary"
+        assert router.health["primary"].failures == 1
+        assert router.health["secondary"].successes == 1
+
+    @pytest.mark.asyncio
+    async def test_stalled_backend_costs_one_timeout(self):
+        """Test that a hung provider is abandoned after the attempt timeout"""
+        primary = FakeBackend("primary", delay=30)
+        router = LLMRouter([primary, FakeBackend("secondary")], attempt_timeout=0.05)
+
+        loop = asyncio.get_running_loop()
+        started = loop.time()
+        assert await router.generate(QUESTION) == "answer from secondary"
+        assert loop.time() - started < 1.0
+        assert primary.cancelled == 1
+
+    @pytest.mark.asyncio
+    async def test_all_backends_failing_raises_last_error(self):
+        """Test that the caller sees an error when nothing answered"""
+        router = LLMRouter([
+            FakeBackend("primary", error=RuntimeError("down")),
+            FakeBackend("secondary", error=ValueError("also down")),
+        ])
+
+        with pytest.raises(ValueError):
+            await router.generate(QUESTION)
+
+    @pytest.mark.asyncio
+    async def test_erroring_backend_is_demoted_then_recovers(self):
+        """Test that an unhealthy backend drops behind and is retried after its errors decay"""
+        primary = FakeBackend("primary", error=RuntimeError("down"))
+        secondary = FakeBackend("secondary")
+        router = LLMRouter([primary, secondary])
+        clock = FakeClock()
+        router.health["primary"].clock = clock
+
+        for _ in range(5):
+            await router.generate(QUESTION)
+        assert [b.name for b in router.ranked()] == ["secondary", "primary"]
+
+        calls = primary.calls
+        await router.generate(QUESTION)
+        assert primary.calls == calls  # Skipped while the secondary answers
+
+        clock.now += 120
+        assert [b.name for b in router.ranked()] == ["primary", "secondary"]
+
+    @pytest.mark.asyncio
+    async def test_stream_fails_over_before_first_chunk(self):
+        """Test that streams switch backend until text has been sent"""
+        router = LLMRouter([
+            FakeBackend("primary", error=RuntimeError("down")),
+            FakeBackend("secondary", text="Patch your software"),
+        ])
+
+        chunks = [chunk async for chunk in router.stream(QUESTION)]
+
+        assert "".join(chunks) == "Patch your software "
+
+    @pytest.mark.asyncio
+    async def test_outcome_names_the_answering_backend(self):
+        """Test that callers learn which backend answered, streamed or not"""
+        router = LLMRouter([FakeBackend("primary", error=RuntimeError("down")), FakeBackend("secondary")])
+
+        outcome = RouteOutcome()
+        await router.generate(QUESTION, outcome=outcome)
+        assert outcome.backend == "secondary"
+
+        outcome = RouteOutcome()
+        [chunk async for chunk in router.stream(QUESTION, outcome=outcome)]
+        assert outcome.backend == "secondary"
+
+    @pytest.mark.asyncio
+    async def test_failover_answers_are_not_cached(self, monkeypatch):
+        """Test that the tutor only caches answers under the model that produced them"""
+        monkeypatch.setattr("app.agents.owasp_tutor.settings.USE_MOCK_RESPONSES", False)
+        primary = FakeBackend("primary", error=RuntimeError("down"))
+        tutor = OWASPTutor()
+        tutor.router = LLMRouter([primary, FakeBackend("secondary")], retry_attempts=1)
+
+        first = await tutor.reply("Should my shop use a password manager?")
+        primary.error = None
+        second = await tutor.reply("Should my shop use a password manager?")
+
+        assert (first.text, first.tier) == ("answer from secondary", "llm")
+        assert (second.text, second.tier) == ("answer from primary", "llm")
+        assert (await tutor.reply("Should my shop use a password manager?")).tier == "cache"
+
+    @pytest.mark.asyncio
+    async def test_stream_stall_times_out(self):
+        """Test that a stream without a first chunk is abandoned"""
+        router = LLMRouter(
+            [FakeBackend("primary", delay=30), FakeBackend("secondary")], attempt_timeout=0.05
+        )
+
+        chunks = [chunk async for chunk in router.stream(QUESTION)]
+
+        assert "".join(chunks) == "answer from secondary "
+        assert router.health["primary"].failures == 1
+
+
+class TestHedging:
+    """Test duplicate requests past the observed p95"""
+
+    @pytest.mark.asyncio
+    async def test_slow_call_is_hedged_at_p95(self):
+        """Test that a call slower than usual is raced against the next backend"""
+        primary = FakeBackend("primary", delay=0)
+        secondary = FakeBackend("secondary")
+        router = LLMRouter([primary, secondary], hedge=True, hedge_min_delay=0.02, hedge_min_samples=5)
+        for _ in range(5):
+            await router.generate(QUESTION)
+        assert secondary.calls == 0
+
+        primary.delay = 5
+        loop = asyncio.get_running_loop()
+        started = loop.time()
+        assert await router.generate(QUESTION) == "answer from secondary"
+        assert loop.time() - started < 1.0
+        await asyncio.sleep(0.05)  # Let the losing call unwind
+        assert primary.cancelled == 1
+
+    @pytest.mark.asyncio
+    async def test_no_hedge_without_latency_history(self):
+        """Test that hedging waits until a p95 has been observed"""
+        primary = FakeBackend("primary", delay=0.05)
+        secondary = FakeBackend("secondary")
+        router = LLMRouter([primary, secondary], hedge=True, hedge_min_delay=0.01)
+
+        assert await router.generate(QUESTION) == "answer from primary"
+        assert secondary.calls == 0
+
+    def test_p95_of_recent_latencies(self):
+        """Test the percentile over the rolling window"""
+        health = BackendHealth(window=100)
+        for ms in range(1, 101):
+            health.success(ms / 1000)
+
+        assert health.p95() == pytest.approx(0.095)
+        assert health.p95(min_samples=500) is None
+
+
+class TestBackends:
+    """Test the provider adapters"""
+
+    @pytest.mark.asyncio
+    async def test_anthropic_request_and_response(self):
+        """Test the Messages API payload and text extraction"""
+        seen = {}
+
+        def handler(request: httpx.Request) -> httpx.Response:
+            seen["headers"] = request.headers
+            seen["body"] = json.loads(request.content)
+            return httpx.Response(200, json={
+                "content": [{"type": "text", "text": "Use parameterized queries."}],
+                "usage": {"input_tokens": 10, "output_tokens": 5},
+            })
+
+        backend = AnthropicBackend(
+            "key", "claude-test", "You are a tutor.", transport=httpx.MockTransport(handler)
+        )
+        messages = [("user", "Summary so far"), ("user", "Hi"), ("assistant", "Hello"), ("user", "SQLi?")]
+
+        assert await backend.generate(messages) == "Use parameterized queries."
+        assert seen["headers"]["x-api-key"] == "key"
+        assert seen["body"]["system"] == "You are a tutor."
+        assert [m["role"] for m in seen["body"]["messages"]] == ["user", "assistant", "user"]
+        assert seen["body"]["messages"][0]["content"] == "Summary so far\n\nHi"
+
+    @pytest.mark.asyncio
+    async def test_anthropic_stream(self):
+        """Test that text deltas are yielded from the SSE stream"""
+        events = [
+            {"type": "message_start"},
+            {"type": "content_block_delta", "delta": {"type": "text_delta", "text": "Patch "}},
+            {"type": "content_block_delta", "delta": {"type": "text_delta", "text": "often."}},
+            {"type": "message_stop"},
+        ]
+        body = "".join(f"event: {e['type']}\ndata: {json.dumps(e)}\n\n" for e in events)
+        backend = AnthropicBackend(
+            "key", "claude-test", "You are a tutor.",
+            transport=httpx.MockTransport(lambda request: httpx.Response(200, text=body))
+        )
+
+        chunks = [chunk async for chunk in backend.stream(QUESTION)]
+
+        assert chunks == ["Patch ", "often."]
+
+    @pytest.mark.asyncio
+    async def test_anthropic_http_error_raises(self):
+        """Test that provider errors surface so the router can fail over"""
+        backend = AnthropicBackend(
+            "key", "claude-test", "You are a tutor.",
+            transport=httpx.MockTransport(lambda request: httpx.Response(529, json={}))
+        )
+
+        with pytest.raises(httpx.HTTPStatusError):
+            await backend.generate(QUESTION)
+
+    def test_backend_interface_is_abstract(self):
+        """Test that a backend must implement generate and stream"""
+        class Incomplete(LLMBackend):
+            async def generate(self, messages, with_system_prompt=True):
+                return ""
+
+        with pytest.raises(TypeError):
+            Incomplete()
+
+    @pytest.mark.asyncio
+    async def test_mock_backend_answers_last_question(self):
+        """Test that the mock backend uses the latest user message"""
+        backend = MockBackend(lambda question: f"echo: {question}")
+        messages = [("user", "old"), ("assistant", "reply"), ("user", "new")]
+
+        assert await backend.generate(messages) == "echo: new"
+        assert "".join([chunk async for chunk in backend.stream(messages)]) == "echo: new"
@@ -0,0 +1,208 @@
+"""
+Test suite for structured logging
+"""
+import json
+import logging
+import re
+import threading
+
+import pytest
+
+from app.config import settings
+from app.utils import log_with_context, setup_logging
+from app.utils.log_sampling import LogAggregator
+from app.utils.logging_config import StructuredFormatter, stop_logging
+
+
+def make_record(message: str = "hello %s", args=("world",), **extra) -> logging.LogRecord:
+    record = logging.LogRecord("app.test", logging.INFO, __file__, 10, message, args, None)
+    for key, value in extra.items():
+        setattr(record, key, value)
+    return record
+
+
+@pytest.fixture
+def restore_logging():
+    """Put the previous root handlers back afterwards"""
+    root_logger = logging.getLogger()
+    handlers, level = root_logger.handlers[:], root_logger.level
+    yield
+    stop_logging()
+    root_logger.handlers, root_logger.level = handlers, level
+
+
+class TestStructuredFormatter:
+    """Test JSON log lines"""
+
+    def test_fields(self):
+        """Test that a record becomes one JSON object with the usual fields"""
+        formatter = StructuredFormatter(static_fields={"service": "SMBShield API"})
+        data = json.loads(formatter.format(make_record(extra_fields={"client": "1.2.3.4"})))
+
+        assert data["message"] == "hello world"
+        assert data["level"] == "INFO"
+        assert data["logger"] == "app.test"
+        assert data["service"] == "SMBShield API"
+        assert data["client"] == "1.2.3.4"
+        assert re.fullmatch(r"\d{4}-\d\d-\d\dT\d\d:\d\d:\d\d\.\d{6}", data["timestamp"])
+
+    def test_timestamp_is_record_time(self):
+        """Test that the timestamp comes from the record, not the formatting time"""
+        formatter = StructuredFormatter()
+        record = make_record()
+        record.created = 1_700_000_000.25
+        assert json.loads(formatter.format(record))["timestamp"] == "2023-11-14T22:13:20.250000"
+
+        record.created = 1_700_000_001.5
+        assert json.loads(formatter.format(record))["timestamp"] == "2023-11-14T22:13:21.500000"
+
+    def test_unserializable_extra(self):
+        """Test that odd extra values are stringified instead of failing"""
+        formatter = StructuredFormatter()
+        data = json.loads(formatter.format(make_record(extra_fields={"obj": object()})))
+        assert data["obj"].startswith("<object object")
+
+
+class TestQueuedLogging:
+    """Test the background log writer"""
+
+    def test_records_written_off_thread(self, capsys, restore_logging):
+        """Test that records are written by the listener thread, in order"""
+        setup_logging(debug=False, use_queue=True)
+        logger = logging.getLogger("app.test_queue")
+        writer_threads = set()
+
+        original_emit = logging.StreamHandler.emit
+
+        def recording_emit(handler, record):
+            writer_threads.add(threading.current_thread().name)
+            original_emit(handler, record)
+
+        logging.StreamHandler.emit = recording_emit
+        try:
+            for i in range(50):
+                log_with_context(logger, "info", "event %d" % i, n=i)
+            stop_logging()
+        finally:
+            logging.StreamHandler.emit = original_emit
+
+        lines = [json.loads(line) for line in capsys.readouterr().out.splitlines()]
+        events = [line for line in lines if line["logger"] == "app.test_queue"]
+        assert [e["n"] for e in events] == list(range(50))
+        assert threading.current_thread().name not in writer_threads
+
+    def test_logging_continues_after_stop(self, capsys, restore_logging):
+        """Test that records logged after shutdown are still written"""
+        setup_logging(debug=False, use_queue=True)
+        stop_logging()
+        logging.getLogger("app.test_queue").warning("after stop")
+        assert "after stop" in capsys.readouterr().out
+
+
+class FakeClock:
+    """Manually advanced wall clock"""
+
+    def __init__(self, now: float = 1_700_000_000.0):
+        self.now = now
+
+    def __call__(self) -> float:
+        return self.now
+
+
+class TestLogAggregator:
+    """Test collapsing of repeated warnings"""
+
+    def records(self, caplog, name="app.test_sampling"):
+        return [r for r in caplog.records if r.name == name]
+
+    def test_repeats_collapse_into_summary(self, caplog):
+        """Test first occurrence logged, repeats counted, summary at interval end"""
+        clock = FakeClock()
+        aggregator = LogAggregator(interval_seconds=60, clock=clock)
+        logger = logging.getLogger("app.test_sampling")
+
+        with caplog.at_level(logging.WARNING):
+            for _ in range(100):
+                aggregator.log(logger, logging.WARNING, "Rate limited 1.2.3.4", "rl:1.2.3.4", {"ip": "1.2.3.4"})
+                clock.now += 0.1
+            assert len(self.records(caplog)) == 1
+
+            clock.now += 60
+            aggregator.log(logger, logging.WARNING, "Rate limited 1.2.3.4", "rl:1.2.3.4", {"ip": "1.2.3.4"})
+
+        records = self.records(caplog)
+        assert len(records) == 3  # first, summary, first of the next interval
+        summary = records[1].extra_fields
+        assert summary["event_key"] == "rl:1.2.3.4"
+        assert summary["repeat_count"] == 99
+        assert summary["first_seen"].startswith("2023-11-14T22:13:20")
+        assert summary["last_seen"] > summary["first_seen"]
+        assert summary["ip"] == "1.2.3.4"
+        assert aggregator.suppressed == 99
+
+    def test_keys_are_independent(self, caplog):
+        """Test that different keys are each logged once"""
+        aggregator = LogAggregator(clock=FakeClock())
+        logger = logging.getLogger("app.test_sampling")
+        with caplog.at_level(logging.WARNING):
+            for ip in ("1.1.1.1", "2.2.2.2", "1.1.1.1", "2.2.2.2"):
+                aggregator.log(logger, logging.WARNING, f"Rate limited {ip}", f"rl:{ip}", {})
+        assert [r.getMessage() for r in self.records(caplog)] == ["Rate limited 1.1.1.1", "Rate limited 2.2.2.2"]
+
+    def test_per_logger_sample_ratio(self, caplog):
+        """Test that a logger's ratio lets a fraction of repeats through"""
+        aggregator = LogAggregator(sample_ratios={"app.test_sampling": 0.1}, clock=FakeClock())
+        logger = logging.getLogger("app.test_sampling.child")
+        with caplog.at_level(logging.WARNING):
+            for _ in range(101):
+                aggregator.log(logger, logging.WARNING, "Invalid API key", "auth", {})
+        assert len(self.records(caplog, "app.test_sampling.child")) == 11  # first + every 10th repeat
+        assert aggregator.sample_ratio("app.other") == 0.0
+
+    def test_flush_and_bounded_keys(self, caplog):
+        """Test explicit flush and summaries for keys evicted over the bound"""
+        aggregator = LogAggregator(max_keys=2, clock=FakeClock())
+        logger = logging.getLogger("app.test_sampling")
+        with caplog.at_level(logging.WARNING):
+            for key in ("a", "a", "b", "c"):
+                aggregator.log(logger, logging.WARNING, f"event {key}", key, {})
+            # "a" was evicted with one repeat pending
+            assert self.records(caplog)[-2].extra_fields["repeat_count"] == 1
+            aggregator.log(logger, logging.WARNING, "event b", "b", {})
+            aggregator.flush()
+
+        summaries = [r.extra_fields for r in self.records(caplog) if "repeat_count" in r.extra_fields]
+        assert [(s["event_key"], s["repeat_count"]) for s in summaries] == [("a", 1), ("b", 1)]
+
+    def test_rate_limit_warnings_are_collapsed(self, caplog):
+        """Test that a client hammering the API produces one warning per interval"""
+        from fastapi.testclient import TestClient
+        from app.main import app
+        from app.utils.log_sampling import log_aggregator
+
+        log_aggregator.flush()  # Forget events from earlier tests
+        client = TestClient(app)
+        with caplog.at_level(logging.WARNING):
+            for _ in range(40):
+                client.get("/api/v1/chat/quick-tip")
+
+        warnings = [r for r in caplog.records if r.name == "app.middleware.rate_limit"]
+        assert len(warnings) == 1
+        assert warnings[0].extra_fields["event_key"].startswith("rate_limited:")
+
+
+class TestSampleRatioSetting:
+    """Test parsing of LOG_SAMPLE_RATIOS"""
+
+    def test_valid_entries(self, monkeypatch):
+        """Test that well-formed entries are parsed and blanks ignored"""
+        monkeypatch.setattr(settings, "LOG_SAMPLE_RATIOS", "app.a=0.5, ,app.b = 0.01,")
+        assert settings.log_sample_ratios == {"app.a": 0.5, "app.b": 0.01}
+
+    def test_malformed_entries_are_skipped(self, monkeypatch, caplog):
+        """Test that a bad entry is dropped with a warning instead of failing startup"""
+        monkeypatch.setattr(settings, "LOG_SAMPLE_RATIOS", "app.a=half,app.b=0.1,=0.2,app.c=-1,app.d")
+
+        with caplog.at_level(logging.WARNING, logger="app.config"):
+            assert settings.log_sample_ratios == {"app.b": 0.1}
+        assert len(caplog.records) == 4
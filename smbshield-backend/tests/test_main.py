@@ -42,6 +42,7 @@ class TestHealthEndpoints:
         data = response.json()
         assert data["status"] == "ready"
         assert "checks" in data
+        assert set(data["checks"]["request_coalescing"]) == {"in_flight", "coalesced"}
 
 
 class TestRateLimiting:
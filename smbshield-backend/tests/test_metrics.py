@@ -0,0 +1,135 @@
+"""
+Test suite for the Prometheus metrics endpoint
+"""
+import os
+
+import pytest
+from fastapi.testclient import TestClient
+from prometheus_client import REGISTRY
+
+from app.config import settings
+from app.main import app
+from app.utils import sanitize_user_input
+from app.utils.metrics import mark_process_dead
+
+client = TestClient(app)
+
+
+def sample(text: str, name: str, **labels) -> float:
+    """Value of one sample in a Prometheus text exposition (0 if absent)"""
+    wanted = ",".join(f'{k}="{v}"' for k, v in labels.items())
+    prefix = f"{name}{{{wanted}}} " if labels else f"{name} "
+    for line in text.splitlines():
+        if line.startswith(prefix):
+            return float(line.rsplit(" ", 1)[1])
+    return 0.0
+
+
+class TestMetricsEndpoint:
+    """Test /metrics exposition"""
+
+    def test_public_by_default(self):
+        """Test that metrics are served in the Prometheus text format"""
+        response = client.get("/metrics")
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("text/plain")
+        assert "smbshield_http_request_duration_seconds" in response.text
+
+    def test_request_latency_by_route_and_status(self):
+        """Test that requests are counted under their route template"""
+        before = sample(client.get("/metrics").text, "smbshield_http_request_duration_seconds_count",
+                        method="GET", route="/health/live", status="200")
+        client.get("/health/live")
+        client.get("/health/live")
+        after = sample(client.get("/metrics").text, "smbshield_http_request_duration_seconds_count",
+                       method="GET", route="/health/live", status="200")
+        assert after - before == 2
+
+    def test_unmatched_paths_share_a_label(self):
+        """Test that unknown paths don't create a label per path"""
+        client.get("/no/such/path/123")
+        text = client.get("/metrics").text
+        assert 'route="unmatched",status="404"' in text
+        assert "/no/such/path/123" not in text
+
+    def test_unknown_methods_share_a_label(self):
+        """Test that non-standard HTTP verbs don't create a label per verb"""
+        client.request("BREW", "/health/live")
+        text = client.get("/metrics").text
+        assert 'method="other",route="/health/live"' in text
+        assert "BREW" not in text
+
+    def test_rate_limit_rejections(self):
+        """Test that 429s are counted by window"""
+        before = sample(client.get("/metrics").text, "smbshield_rate_limit_rejections_total", window="minute")
+        for _ in range(25):
+            client.get("/api/v1/chat/quick-tip")
+        after = sample(client.get("/metrics").text, "smbshield_rate_limit_rejections_total", window="minute")
+        assert after - before >= 1
+
+    def test_sanitization_rejections_by_rule(self):
+        """Test that injection rejections are counted by rule"""
+        before = sample(client.get("/metrics").text, "smbshield_sanitization_rejections_total",
+                        rule="cmd_substitution")
+        try:
+            sanitize_user_input("echo $(id)")
+        except ValueError:
+            pass
+        after = sample(client.get("/metrics").text, "smbshield_sanitization_rejections_total",
+                       rule="cmd_substitution")
+        assert after - before == 1
+
+    def test_token_required_when_configured(self, monkeypatch):
+        """Test that METRICS_TOKEN protects the endpoint"""
+        monkeypatch.setattr(settings, "METRICS_TOKEN", "scrape-secret")
+        assert client.get("/metrics").status_code == 401
+        assert client.get("/metrics", headers={"Authorization": "Bearer wrong"}).status_code == 401
+        response = client.get("/metrics", headers={"Authorization": "Bearer scrape-secret"})
+        assert response.status_code == 200
+
+
+class TestMultiprocess:
+    """Test cleanup of per-worker metric files"""
+
+    def test_exiting_worker_drops_its_live_gauges(self, monkeypatch, tmp_path):
+        """Test that a worker's live gauge file is removed, other samples kept"""
+        monkeypatch.setenv("PROMETHEUS_MULTIPROC_DIR", str(tmp_path))
+        live = tmp_path / f"gauge_livemax_{os.getpid()}.db"
+        counter = tmp_path / f"counter_{os.getpid()}.db"
+        live.touch()
+        counter.touch()
+
+        mark_process_dead()
+
+        assert not live.exists()
+        assert counter.exists()
+
+
+class TestGeminiMetrics:
+    """Test upstream latency and error metrics"""
+
+    @pytest.mark.asyncio
+    async def test_latency_and_errors_recorded(self, monkeypatch):
+        """Test that upstream calls are timed and failures counted by type"""
+        from tests.conftest import FakeAsyncModels, make_tutor
+
+        monkeypatch.setattr("app.agents.owasp_tutor.settings.USE_MOCK_RESPONSES", False)
+        models = FakeAsyncModels(delay=0)
+        tutor = make_tutor(models)
+
+        def value(name, **labels):
+            return REGISTRY.get_sample_value(name, labels) or 0.0
+
+        calls = value("smbshield_gemini_request_duration_seconds_count", operation="generate")
+        await tutor._generate([])
+        assert value("smbshield_gemini_request_duration_seconds_count", operation="generate") == calls + 1
+
+        async def fail(model, contents, config=None):
+            raise TimeoutError("upstream timed out")
+
+        models.generate_content = fail
+        labels = {"operation": "generate", "error": "TimeoutError"}
+        errors = value("smbshield_gemini_errors_total", **labels)
+        with pytest.raises(TimeoutError):
+            await tutor._generate([])
+        assert value("smbshield_gemini_errors_total", **labels) == errors + 1
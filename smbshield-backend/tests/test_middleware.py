@@ -0,0 +1,123 @@
+"""
+Test suite for the ASGI middleware stack
+"""
+import asyncio
+
+import pytest
+from fastapi import FastAPI
+from fastapi.responses import StreamingResponse
+from fastapi.testclient import TestClient
+
+from app.middleware import APIKeyMiddleware, RateLimitMiddleware
+
+
+def build_app(requests_per_minute: int = 100) -> FastAPI:
+    test_app = FastAPI()
+
+    @test_app.get("/ping")
+    async def ping():
+        return {"ok": True}
+
+    @test_app.get("/health")
+    async def health():
+        return {"status": "healthy"}
+
+    @test_app.get("/stream")
+    async def stream():
+        async def chunks():
+            for i in range(3):
+                yield f"chunk{i}\n"
+                await asyncio.sleep(0)
+        return StreamingResponse(chunks(), media_type="text/plain")
+
+    test_app.add_middleware(APIKeyMiddleware)
+    test_app.add_middleware(
+        RateLimitMiddleware, requests_per_minute=requests_per_minute, requests_per_hour=1000
+    )
+    return test_app
+
+
+class TestRateLimitMiddleware:
+    """Test 429 handling in the pure ASGI rate limiter"""
+
+    def test_rejects_with_429(self):
+        """Test that requests over the limit get a JSON 429 with Retry-After"""
+        client = TestClient(build_app(requests_per_minute=2))
+        assert client.get("/ping").status_code == 200
+        assert client.get("/ping").status_code == 200
+
+        response = client.get("/ping")
+        assert response.status_code == 429
+        assert "per minute" in response.json()["detail"]
+        assert response.headers["Retry-After"] == "60"
+        assert response.headers["X-RateLimit-Limit-Minute"] == "2"
+
+    def test_health_checks_are_exempt(self):
+        """Test that health checks are never limited"""
+        client = TestClient(build_app(requests_per_minute=1))
+        for _ in range(5):
+            response = client.get("/health")
+            assert response.status_code == 200
+            assert "X-RateLimit-Limit-Minute" not in response.headers
+
+
+class TestAPIKeyMiddleware:
+    """Test 401 handling in the pure ASGI API key check"""
+
+    @pytest.fixture(autouse=True)
+    def require_key(self, monkeypatch):
+        monkeypatch.setattr("app.middleware.auth.settings.REQUIRE_API_KEY", True)
+        monkeypatch.setattr("app.middleware.auth.settings.API_KEY", "test-key-123")
+
+    def test_missing_key(self):
+        """Test that requests without a key are rejected"""
+        response = TestClient(build_app()).get("/ping")
+        assert response.status_code == 401
+        assert response.headers["WWW-Authenticate"] == "ApiKey"
+        assert "API key required" in response.json()["detail"]
+
+    def test_invalid_key(self):
+        """Test that wrong keys (including non-ASCII ones) are rejected"""
+        client = TestClient(build_app())
+        assert client.get("/ping", headers={"X-API-Key": "wrong"}).status_code == 401
+        assert client.get("/ping", headers={"X-API-Key": "clé".encode("utf-8")}).status_code == 401
+
+    def test_valid_keys(self):
+        """Test that X-API-Key and Bearer tokens are both accepted"""
+        client = TestClient(build_app())
+        assert client.get("/ping", headers={"X-API-Key": "test-key-123"}).status_code == 200
+        assert client.get("/ping", headers={"Authorization": "Bearer test-key-123"}).status_code == 200
+
+    def test_public_paths_skip_auth(self):
+        """Test that health checks don't need a key"""
+        assert TestClient(build_app()).get("/health").status_code == 200
+
+
+class TestStreamingPassthrough:
+    """Test that streamed bodies pass through the middleware untouched"""
+
+    @pytest.mark.asyncio
+    async def test_body_chunks_are_not_buffered(self):
+        """Test that each streamed chunk reaches the server as its own message"""
+        test_app = build_app()
+        messages = []
+
+        async def receive():
+            await asyncio.sleep(1)
+            return {"type": "http.disconnect"}
+
+        async def send(message):
+            messages.append(message)
+
+        scope = {
+            "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1",
+            "method": "GET", "scheme": "http", "path": "/stream", "raw_path": b"/stream",
+            "root_path": "", "query_string": b"", "headers": [(b"host", b"test")],
+            "client": ("203.0.113.1", 1234), "server": ("test", 80),
+        }
+        await test_app(scope, receive, send)
+
+        bodies = [m["body"] for m in messages if m["type"] == "http.response.body" and m.get("body")]
+        assert bodies == [b"chunk0\n", b"chunk1\n", b"chunk2\n"]
+        start = next(m for m in messages if m["type"] == "http.response.start")
+        assert (b"x-ratelimit-limit-minute", b"100") in start["headers"]
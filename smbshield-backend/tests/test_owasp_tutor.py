@@ -0,0 +1,220 @@
+"""
+Test suite for the OWASP Tutor agent
+"""
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+from tests.conftest import FakeAsyncModels, make_tutor
+
+
+@pytest.fixture(autouse=True)
+def live_mode(monkeypatch):
+    """Exercise the upstream path rather than mock responses"""
+    monkeypatch.setattr("app.agents.owasp_tutor.settings.USE_MOCK_RESPONSES", False)
+
+
+class TestNonBlockingUpstream:
+    """Test that Gemini calls don't block the event loop"""
+
+    @pytest.mark.asyncio
+    async def test_chats_run_concurrently(self):
+        """Test that slow upstream calls overlap instead of serializing"""
+        models = FakeAsyncModels(delay=0.1)
+        tutor = make_tutor(models)
+
+        loop = asyncio.get_running_loop()
+        started = loop.time()
+        replies = await asyncio.gather(*(tutor.chat(f"Question {i}") for i in range(10)))
+        elapsed = loop.time() - started
+
+        assert replies == ["Use strong passwords."] * 10
+        assert models.max_in_flight == 10
+        assert elapsed < 0.5  # 10 x 0.1s would take 1s if serialized
+
+    @pytest.mark.asyncio
+    async def test_concurrency_cap_is_enforced(self):
+        """Test that in-flight upstream calls never exceed the configured cap"""
+        models = FakeAsyncModels(delay=0.02)
+        tutor = make_tutor(models, max_concurrent=3)
+
+        await asyncio.gather(*(tutor.chat(f"Question {i}") for i in range(12)))
+
+        assert models.calls == 12
+        assert models.max_in_flight == 3
+
+    @pytest.mark.asyncio
+    async def test_event_loop_stays_responsive(self):
+        """Test that other coroutines keep running while a chat is in flight"""
+        tutor = make_tutor(FakeAsyncModels(delay=0.2))
+
+        chat_task = asyncio.create_task(tutor.chat("What is XSS?"))
+        loop = asyncio.get_running_loop()
+        started = loop.time()
+        await asyncio.sleep(0)
+        assert loop.time() - started < 0.1
+        assert not chat_task.done()
+        await chat_task
+
+    @pytest.mark.asyncio
+    async def test_quick_tip_pool_uses_async_client(self):
+        """Test that quick tips are generated through the async upstream path"""
+        models = FakeAsyncModels(text="Turn on 2FA.")
+        tutor = make_tutor(models)
+
+        await tutor.tip_pool.refill_once()
+
+        assert await tutor.get_quick_tip() == "Turn on 2FA."
+        assert models.calls == 1
+
+
+class TestStreaming:
+    """Test streamed tutor answers"""
+
+    @pytest.mark.asyncio
+    async def test_stream_yields_upstream_chunks(self):
+        """Test that upstream chunks are passed through in order"""
+        tutor = make_tutor(FakeAsyncModels(text="Patch your software regularly."))
+
+        chunks = [chunk async for chunk in tutor.chat_stream("Tip?")]
+
+        assert chunks == ["Patch ", "your ", "software ", "regularly. "]
+
+    @pytest.mark.asyncio
+    async def test_stream_error_yields_apology(self):
+        """Test that upstream failures end the stream with the usual apology"""
+        models = FakeAsyncModels()
+
+        async def failing_stream(model, contents, config=None):
+            raise RuntimeError("upstream down")
+
+        models.generate_content_stream = failing_stream
+        tutor = make_tutor(models)
+
+        chunks = [chunk async for chunk in tutor.chat_stream("Tip?")]
+
+        assert len(chunks) == 1
+        assert chunks[0].startswith("I apologize")
+
+
+class TestResponseCaching:
+    """Test that repeated questions are served from the response cache"""
+
+    @pytest.mark.asyncio
+    async def test_repeated_question_skips_upstream(self):
+        """Test that a normalized repeat of a question is a cache hit"""
+        models = FakeAsyncModels()
+        tutor = make_tutor(models)
+
+        first = await tutor.chat("What is XSS?")
+        second = await tutor.chat("what is  xss")
+
+        assert first == second
+        assert models.calls == 1
+        assert tutor.response_cache.stats()["hits"] == 1
+
+    @pytest.mark.asyncio
+    async def test_identical_concurrent_questions_share_upstream_call(self):
+        """Test that a burst of the same question makes one upstream call"""
+        models = FakeAsyncModels(delay=0.05)
+        tutor = make_tutor(models)
+
+        replies = await asyncio.gather(*(tutor.chat("What is SQL injection?") for _ in range(25)))
+
+        assert replies == ["Use strong passwords."] * 25
+        assert models.calls == 1
+
+    @pytest.mark.asyncio
+    async def test_model_change_invalidates_entries(self):
+        """Test that switching models bypasses answers cached for the old one"""
+        models = FakeAsyncModels()
+        tutor = make_tutor(models)
+
+        await tutor.chat("What is XSS?")
+        tutor.model_name = "another-model"
+        await tutor.chat("What is XSS?")
+
+        assert models.calls == 2
+
+    @pytest.mark.asyncio
+    async def test_errors_are_not_cached(self):
+        """Test that apology replies are never stored"""
+        models = FakeAsyncModels()
+        tutor = make_tutor(models)
+
+        async def failing(model, contents, config=None):
+            raise RuntimeError("upstream down")
+
+        models.generate_content = failing
+        await tutor.chat("What is XSS?")
+
+        assert tutor.response_cache.stats()["entries"] == 0
+
+    @pytest.mark.asyncio
+    async def test_stream_fills_and_uses_cache(self):
+        """Test that a completed stream is cached and replayed"""
+        models = FakeAsyncModels(text="Patch your software regularly.")
+        tutor = make_tutor(models)
+
+        streamed = "".join([chunk async for chunk in tutor.chat_stream("Tip?")])
+        assert await tutor.chat("Tip?") == streamed
+        assert models.calls == 1
+
+
+class TestRequestLayout:
+    """Test that the system prompt travels in the request config"""
+
+    @pytest.mark.asyncio
+    async def test_only_user_turn_is_sent(self):
+        """Test that contents carry only the user message"""
+        models = FakeAsyncModels()
+        seen = {}
+
+        async def capture(model, contents, config=None):
+            seen["contents"] = contents
+            seen["config"] = config
+            return SimpleNamespace(text="ok")
+
+        models.generate_content = capture
+        tutor = make_tutor(models)
+
+        await tutor.chat("What is XSS?")
+
+        assert len(seen["contents"]) == 1
+        assert seen["contents"][0].parts[0].text == "What is XSS?"
+        assert seen["config"].system_instruction.startswith("You are Professor Shield")
+
+    @pytest.mark.asyncio
+    async def test_conversation_turns_are_sent(self):
+        """Test that stored turns and summary precede the new message"""
+        models = FakeAsyncModels()
+        seen = {}
+
+        async def capture(model, contents, config=None):
+            seen["contents"] = contents
+            return SimpleNamespace(text="ok")
+
+        models.generate_content = capture
+        tutor = make_tutor(models)
+        conversation = tutor.conversations.create()
+        conversation.summary_lines.append("- Learner: What is XSS?")
+        tutor.conversations.record(conversation, "And CSRF?", "CSRF forges requests.")
+
+        await tutor.chat("How do I stop it?", conversation=conversation)
+
+        roles = [c.role for c in seen["contents"]]
+        assert roles == ["user", "model", "user", "model", "user"]
+        assert "What is XSS?" in seen["contents"][0].parts[0].text
+        assert conversation.turns[-1] == ("assistant", "ok")
+
+    def test_summary_turns_alternate(self):
+        """Test that the summary is acknowledged only when a user turn follows it"""
+        tutor = make_tutor(FakeAsyncModels())
+        conversation = tutor.conversations.create()
+        conversation.summary_lines.append("- Learner: What is XSS?")
+        conversation.turns.append(("assistant", "XSS runs scripts in your pages."))
+
+        messages = tutor._build_messages("And CSRF?", conversation)
+
+        assert [role for role, _ in messages] == ["user", "assistant", "user"]
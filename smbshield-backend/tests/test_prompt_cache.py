@@ -0,0 +1,136 @@
+"""
+Test suite for system prompt reuse
+"""
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+from google.genai import errors as genai_errors
+
+from app.agents.prompt_cache import SystemPromptCache
+
+
+class FakeCaches:
+    """Stand-in for client.aio.caches"""
+
+    def __init__(self, error: Exception = None):
+        self.error = error
+        self.created = 0
+
+    async def create(self, model, config=None):
+        self.created += 1
+        if self.error is not None:
+            raise self.error
+        await asyncio.sleep(0.01)
+        return SimpleNamespace(name=f"cachedContents/{self.created}")
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+TOO_SMALL = genai_errors.ClientError(
+    400, {"error": {"message": "Cached content is too small", "status": "INVALID_ARGUMENT"}}
+)
+OVERLOADED = genai_errors.ServerError(503, {"error": {"message": "overloaded", "status": "UNAVAILABLE"}})
+
+
+def make_cache(caches: FakeCaches, **kwargs) -> SystemPromptCache:
+    client = SimpleNamespace(aio=SimpleNamespace(caches=caches))
+    return SystemPromptCache(client, "gemini-test", "You are a tutor.", **kwargs)
+
+
+class TestSystemPromptCache:
+    """Test system instruction and cached-content configs"""
+
+    @pytest.mark.asyncio
+    async def test_system_instruction_is_prebuilt(self):
+        """Test that the same config object is reused for every request"""
+        cache = make_cache(FakeCaches())
+        first = await cache.config()
+        assert first is await cache.config()
+        assert first.system_instruction == "You are a tutor."
+
+    @pytest.mark.asyncio
+    async def test_context_cache_created_once(self):
+        """Test that concurrent requests share one cached-content handle"""
+        caches = FakeCaches()
+        cache = make_cache(caches, use_context_cache=True)
+
+        configs = await asyncio.gather(*(cache.config() for _ in range(10)))
+
+        assert caches.created == 1
+        assert all(c.cached_content == "cachedContents/1" for c in configs)
+
+    @pytest.mark.asyncio
+    async def test_handle_refreshed_before_expiry(self):
+        """Test that a handle inside the refresh margin is replaced"""
+        caches = FakeCaches()
+        cache = make_cache(caches, use_context_cache=True, ttl_seconds=10, refresh_margin_seconds=10)
+
+        await cache.config()
+        config = await cache.config()
+
+        assert caches.created == 2
+        assert config.cached_content == "cachedContents/2"
+
+    @pytest.mark.asyncio
+    async def test_falls_back_when_caching_fails(self):
+        """Test that an uncacheable prompt falls back to the system instruction"""
+        caches = FakeCaches(error=TOO_SMALL)
+        cache = make_cache(caches, use_context_cache=True)
+
+        config = await cache.config()
+        await cache.config()
+
+        assert config is cache.instruction_config
+        assert caches.created == 1
+        assert not cache.use_context_cache
+
+    @pytest.mark.asyncio
+    async def test_transient_failure_backs_off(self):
+        """Test that a 503 falls back only until the retry time, with growing delays"""
+        caches = FakeCaches(error=OVERLOADED)
+        clock = FakeClock()
+        cache = make_cache(caches, use_context_cache=True, retry_base_seconds=30, clock=clock)
+
+        assert await cache.config() is cache.instruction_config
+        clock.now += 29
+        await cache.config()
+        assert caches.created == 1
+
+        clock.now += 1
+        await cache.config()
+        assert caches.created == 2
+        clock.now += 59
+        await cache.config()
+        assert caches.created == 2
+
+        caches.error = None
+        clock.now += 1
+        config = await cache.config()
+        assert cache.use_context_cache
+        assert config.cached_content == "cachedContents/3"
+
+    @pytest.mark.asyncio
+    async def test_failed_refresh_keeps_valid_handle(self):
+        """Test that the old handle is used until it expires while creation fails"""
+        caches = FakeCaches()
+        clock = FakeClock()
+        cache = make_cache(
+            caches, use_context_cache=True, ttl_seconds=600, refresh_margin_seconds=300,
+            retry_base_seconds=30, clock=clock
+        )
+        await cache.config()
+
+        caches.error = OVERLOADED
+        clock.now += 300
+        assert (await cache.config()).cached_content == "cachedContents/1"
+
+        clock.now += 300
+        assert await cache.config() is cache.instruction_config
+        assert caches.created == 3
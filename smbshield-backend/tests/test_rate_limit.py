@@ -0,0 +1,127 @@
+"""
+Test suite for rate limiting and client IP resolution
+"""
+from app.middleware import RateLimiter
+from app.middleware.client_ip import ClientIPResolver
+
+
+class FakeClock:
+    """Manually advanced monotonic clock"""
+
+    def __init__(self, now: float = 1_000_000.0):
+        self.now = now
+
+    def __call__(self) -> float:
+        return self.now
+
+
+class TestRateLimiter:
+    """Test sliding-window limits and memory bounds"""
+
+    def test_minute_limit(self):
+        """Test that the per-minute limit rejects the request after the limit"""
+        limiter = RateLimiter(requests_per_minute=5, requests_per_hour=100, clock=FakeClock())
+        results = [limiter.is_allowed("1.2.3.4")[0] for _ in range(6)]
+        assert results == [True] * 5 + [False]
+
+        allowed, reason = limiter.is_allowed("1.2.3.4")
+        assert not allowed
+        assert "per minute" in reason
+
+    def test_keys_are_independent(self):
+        """Test that one client's usage doesn't affect another"""
+        limiter = RateLimiter(requests_per_minute=1, clock=FakeClock())
+        assert limiter.is_allowed("1.1.1.1")[0]
+        assert not limiter.is_allowed("1.1.1.1")[0]
+        assert limiter.is_allowed("2.2.2.2")[0]
+
+    def test_sliding_window_recovers_gradually(self):
+        """Test that the previous window's weight decays as time passes"""
+        clock = FakeClock(60_000.0)  # Start of a minute window
+        limiter = RateLimiter(requests_per_minute=10, requests_per_hour=1000, clock=clock)
+        for _ in range(10):
+            assert limiter.is_allowed("ip")[0]
+
+        # Start of next window: previous window still fully weighted
+        clock.now += 60
+        assert not limiter.is_allowed("ip")[0]
+
+        # Half way through: half the previous count still applies
+        clock.now += 30
+        results = [limiter.is_allowed("ip")[0] for _ in range(6)]
+        assert results == [True] * 5 + [False]
+
+        # Two windows later everything has expired
+        clock.now += 120
+        assert limiter.is_allowed("ip")[0]
+
+    def test_hour_limit(self):
+        """Test that the per-hour limit applies across minute windows"""
+        clock = FakeClock(3600.0 * 100)
+        limiter = RateLimiter(requests_per_minute=5, requests_per_hour=12, clock=clock)
+        allowed = 0
+        for _ in range(10):
+            allowed += sum(limiter.is_allowed("ip")[0] for _ in range(5))
+            clock.now += 61
+        assert allowed == 12
+        allowed, reason = limiter.is_allowed("ip")
+        assert "per hour" in reason
+
+    def test_idle_keys_are_evicted(self):
+        """Test that rotating source addresses don't grow state forever"""
+        clock = FakeClock()
+        limiter = RateLimiter(clock=clock)
+        for i in range(1000):
+            limiter.is_allowed(f"10.0.{i // 256}.{i % 256}")
+        assert len(limiter) == 1000
+
+        clock.now += 3 * 3600
+        limiter.is_allowed("192.0.2.1")
+        assert len(limiter) == 1
+
+    def test_max_keys_bound(self):
+        """Test that tracked keys never grow far past max_keys"""
+        limiter = RateLimiter(max_keys=100, clock=FakeClock())
+        for i in range(1000):
+            limiter.is_allowed(f"key-{i}")
+        assert len(limiter) <= 101
+
+
+def scope(peer: str, headers: dict = None) -> dict:
+    return {
+        "type": "http",
+        "client": (peer, 12345),
+        "headers": [(k.lower().encode(), v.encode()) for k, v in (headers or {}).items()],
+    }
+
+
+class TestClientIPResolver:
+    """Test proxy-aware client IP resolution"""
+
+    def test_untrusted_peer_headers_ignored(self):
+        """Test that spoofed forwarding headers from clients are ignored"""
+        resolver = ClientIPResolver(["172.16.0.0/12"], "Fly-Client-IP")
+        ip = resolver(scope("203.0.113.9", {"Fly-Client-IP": "1.1.1.1", "X-Forwarded-For": "2.2.2.2"}))
+        assert ip == "203.0.113.9"
+
+    def test_trusted_proxy_client_header(self):
+        """Test that the proxy's client IP header is used when present"""
+        resolver = ClientIPResolver(["172.16.0.0/12"], "Fly-Client-IP")
+        ip = resolver(scope("172.16.3.2", {"X-Forwarded-For": "9.9.9.9", "Fly-Client-IP": "198.51.100.7"}))
+        assert ip == "198.51.100.7"
+
+    def test_forwarded_for_skips_trusted_hops(self):
+        """Test that the rightmost untrusted X-Forwarded-For hop is the client"""
+        resolver = ClientIPResolver(["172.16.0.0/12", "10.0.0.1"])
+        ip = resolver(scope("172.16.3.2", {"X-Forwarded-For": "6.6.6.6, 198.51.100.7, 10.0.0.1"}))
+        assert ip == "198.51.100.7"
+
+    def test_invalid_header_falls_back_to_peer(self):
+        """Test that garbage headers don't become rate limit keys"""
+        resolver = ClientIPResolver(["172.16.0.0/12"], "Fly-Client-IP")
+        ip = resolver(scope("172.16.3.2", {"Fly-Client-IP": "not-an-ip"}))
+        assert ip == "172.16.3.2"
+
+    def test_missing_client(self):
+        """Test that scopes without a client resolve to 'unknown'"""
+        assert ClientIPResolver()({"type": "http", "headers": []}) == "unknown"
@@ -0,0 +1,168 @@
+"""
+Test suite for the Redis-backed distributed rate limiter
+"""
+import pytest
+
+fakeredis = pytest.importorskip("fakeredis")
+
+from app.middleware import RateLimiter
+from app.middleware.redis_rate_limit import RedisRateLimiter
+
+
+class FakeClock:
+    """Manually advanced wall clock"""
+
+    def __init__(self, now: float = 1_700_000_000.0):
+        self.now = now
+
+    def __call__(self) -> float:
+        return self.now
+
+
+class BrokenRedis:
+    """Redis client whose scripts always fail like an unreachable server"""
+
+    def register_script(self, script):
+        async def run(keys=None, args=None):
+            raise ConnectionError("Connection refused")
+        return run
+
+
+class FlakyRedis:
+    """Wraps a Redis client; script calls fail while .down is set"""
+
+    def __init__(self, redis):
+        self.redis = redis
+        self.down = False
+        self.closed = False
+
+    def register_script(self, script):
+        run_script = self.redis.register_script(script)
+
+        async def run(keys=None, args=None):
+            if self.down:
+                raise ConnectionError("Connection refused")
+            return await run_script(keys=keys, args=args)
+        return run
+
+    async def aclose(self):
+        self.closed = True
+
+
+def make_limiter(redis=None, clock=None, per_minute=20, per_hour=100, **kwargs):
+    clock = clock or FakeClock()
+    return RedisRateLimiter(
+        redis if redis is not None else fakeredis.FakeAsyncRedis(),
+        RateLimiter(per_minute, per_hour, clock=clock),
+        clock=clock,
+        **kwargs
+    )
+
+
+class TestRedisRateLimiter:
+    """Test shared limits, local pre-check and fallback"""
+
+    @pytest.mark.asyncio
+    async def test_limit_is_shared_between_instances(self):
+        """Test that two instances on one Redis enforce a single combined limit"""
+        redis = fakeredis.FakeAsyncRedis()
+        clock = FakeClock()
+        first = make_limiter(redis, clock, per_minute=10, local_fraction=0)
+        second = make_limiter(redis, clock, per_minute=10, local_fraction=0)
+
+        results = []
+        for _ in range(8):
+            results.append((await first.check("1.2.3.4"))[0])
+            results.append((await second.check("1.2.3.4"))[0])
+
+        assert results.count(True) == 10
+        allowed, reason = await first.check("1.2.3.4")
+        assert not allowed
+        assert "per minute" in reason
+
+    @pytest.mark.asyncio
+    async def test_hour_limit(self):
+        """Test that the hour window is enforced in Redis as well"""
+        clock = FakeClock(3600.0 * 500_000)
+        limiter = make_limiter(clock=clock, per_minute=100, per_hour=5, local_fraction=0)
+
+        results = [(await limiter.check("ip"))[0] for _ in range(6)]
+
+        assert results == [True] * 5 + [False]
+        assert "per hour" in (await limiter.check("ip"))[1]
+
+    @pytest.mark.asyncio
+    async def test_local_precheck_skips_redis_for_light_keys(self):
+        """Test that clearly-under-limit keys are allowed without a round trip"""
+        limiter = make_limiter(per_minute=100, per_hour=1000)
+
+        for _ in range(20):
+            assert (await limiter.check("ip"))[0]
+
+        assert limiter.redis_calls == 1
+        assert limiter.local_hits == 19
+
+    @pytest.mark.asyncio
+    async def test_locally_allowed_requests_are_flushed(self):
+        """Test that pending local increments reach Redis on the next call"""
+        clock = FakeClock()
+        redis = fakeredis.FakeAsyncRedis()
+        limiter = make_limiter(redis, clock, per_minute=100, per_hour=1000)
+
+        for _ in range(10):
+            await limiter.check("ip")
+        clock.now += 2  # Snapshot goes stale, next check hits Redis
+        await limiter.check("ip")
+
+        # A second instance now sees all 11 requests
+        other = make_limiter(redis, clock, per_minute=12, per_hour=1000, local_fraction=0)
+        assert (await other.check("ip"))[0]
+        assert not (await other.check("ip"))[0]
+
+    @pytest.mark.asyncio
+    async def test_falls_back_to_memory_when_redis_is_down(self):
+        """Test that Redis outages degrade to the in-memory limiter"""
+        clock = FakeClock()
+        limiter = make_limiter(BrokenRedis(), clock, per_minute=3)
+
+        results = [(await limiter.check("ip"))[0] for _ in range(4)]
+
+        assert results == [True, True, True, False]
+        assert limiter.redis_calls == 1  # Cooldown avoids hammering a dead Redis
+
+    @pytest.mark.asyncio
+    async def test_pending_increments_survive_a_failed_flush(self):
+        """Test that locally allowed requests still reach Redis after an outage"""
+        clock = FakeClock()
+        redis = fakeredis.FakeAsyncRedis()
+        flaky = FlakyRedis(redis)
+        limiter = make_limiter(flaky, clock, per_minute=100, per_hour=1000, retry_after=5)
+
+        for _ in range(10):
+            await limiter.check("ip")
+        flaky.down = True
+        clock.now += 2
+        await limiter.check("ip")  # Fails over to memory; 9 pending kept
+
+        flaky.down = False
+        clock.now += 5
+        await limiter.check("ip")
+
+        # Redis saw the first request, the 9 local ones and the last one
+        other = make_limiter(redis, clock, per_minute=12, per_hour=1000, local_fraction=0)
+        assert (await other.check("ip"))[0]
+        assert not (await other.check("ip"))[0]
+
+    @pytest.mark.asyncio
+    async def test_owned_clients_are_closed(self, monkeypatch):
+        """Test that limiters made from a URL close their client at shutdown"""
+        from app.middleware import redis_rate_limit
+
+        flaky = FlakyRedis(fakeredis.FakeAsyncRedis())
+        monkeypatch.setattr("redis.asyncio.from_url", lambda url, **kwargs: flaky)
+        limiter = RedisRateLimiter.from_url("redis://cache:6379", RateLimiter())
+
+        await redis_rate_limit.close_redis_limiters()
+
+        assert flaky.closed
+        assert limiter not in redis_rate_limit._owned_limiters
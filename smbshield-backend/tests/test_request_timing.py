@@ -0,0 +1,107 @@
+"""
+Test suite for per-request timing and correlation IDs
+"""
+import logging
+import re
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.main import app
+from app.middleware.request_timing import RequestTimingMiddleware
+from app.utils.request_timing import finish_request, phase, record, start_request
+from tests.conftest import FakeAsyncModels, make_tutor
+
+client = TestClient(app)
+
+
+def timing_phases(header: str) -> dict:
+    """Parse a Server-Timing header into {name: ms}"""
+    return {
+        name: float(dur)
+        for name, dur in re.findall(r"([\w-]+);dur=([\d.]+)", header)
+    }
+
+
+class TestRequestTimings:
+    """Test the phase timer helpers"""
+
+    def test_phases_accumulate(self):
+        """Test that repeated phases add up and appear in order"""
+        timings, token = start_request("abc")
+        try:
+            record("queue", 0.002)
+            record("queue", 0.003)
+            with phase("gemini"):
+                pass
+        finally:
+            finish_request(token)
+
+        phases = timing_phases(timings.server_timing())
+        assert list(phases) == ["queue", "gemini", "total"]
+        assert phases["queue"] == 5.0
+        assert timings.log_fields()["timing_queue_ms"] == 5.0
+
+    def test_no_op_outside_a_request(self):
+        """Test that timers do nothing when no request is being handled"""
+        with phase("sanitize"):
+            record("queue", 1.0)
+
+
+class TestRequestTimingMiddleware:
+    """Test Server-Timing and X-Request-ID on responses"""
+
+    def test_headers_on_every_response(self):
+        """Test that responses carry a total and a generated correlation ID"""
+        response = client.get("/health/live")
+        assert "total" in timing_phases(response.headers["server-timing"])
+        assert re.fullmatch(r"[0-9a-f]{16}", response.headers["x-request-id"])
+
+    def test_caller_request_id_is_reused(self):
+        """Test that a sane incoming X-Request-ID is propagated"""
+        response = client.get("/health/live", headers={"X-Request-ID": "frontend-123"})
+        assert response.headers["x-request-id"] == "frontend-123"
+
+    def test_unsafe_request_id_is_replaced(self):
+        """Test that IDs that could corrupt logs are not echoed back"""
+        response = client.get("/health/live", headers={"X-Request-ID": "bad id\r\nx"})
+        assert response.headers["x-request-id"] != "bad id\r\nx"
+
+    def test_chat_breakdown(self, monkeypatch, caplog):
+        """Test that a chat reports middleware, sanitization, queue and Gemini phases"""
+        monkeypatch.setattr("app.agents.owasp_tutor.settings.USE_MOCK_RESPONSES", False)
+        monkeypatch.setattr(
+            "app.agents.owasp_tutor._tutor_instance", make_tutor(FakeAsyncModels(delay=0.05))
+        )
+
+        with caplog.at_level(logging.DEBUG, logger="app.middleware.request_timing"):
+            response = client.post("/api/v1/chat/", json={"message": "How do timings work?"})
+        assert response.status_code == 200
+
+        phases = timing_phases(response.headers["server-timing"])
+        for name in ("ratelimit", "sanitize", "cache", "upstream", "queue", "gemini", "total"):
+            assert name in phases
+        assert phases["gemini"] >= 40
+        assert phases["total"] >= phases["upstream"] >= phases["gemini"]
+
+        completed = [r for r in caplog.records if r.getMessage() == "Request completed"][-1]
+        fields = completed.extra_fields
+        assert fields["request_id"] == response.headers["x-request-id"]
+        assert fields["status"] == 200
+        assert fields["timing_gemini_ms"] >= 40
+        assert completed.levelno == logging.DEBUG
+
+    def test_only_slow_requests_log_at_info(self, caplog):
+        """Test that requests under log_min_duration_ms stay out of INFO logs"""
+        inner = FastAPI()
+        inner.get("/ping")(lambda: {"ok": True})
+        fast = TestClient(RequestTimingMiddleware(inner, log_min_duration_ms=1000))
+        every = TestClient(RequestTimingMiddleware(inner, log_min_duration_ms=0))
+
+        with caplog.at_level(logging.INFO, logger="app.middleware.request_timing"):
+            fast.get("/ping")
+            assert not [r for r in caplog.records if r.getMessage() == "Request completed"]
+            every.get("/ping")
+        assert [r.levelno for r in caplog.records if r.getMessage() == "Request completed"] == [
+            logging.INFO
+        ]
@@ -0,0 +1,67 @@
+"""
+Test suite for the tutor response cache
+"""
+import time
+
+from app.agents.response_cache import ResponseCache, normalize_message
+
+
+class TestKeying:
+    """Test cache key construction"""
+
+    def test_normalization_ignores_case_spacing_and_punctuation(self):
+        """Test that trivially different phrasings share a key"""
+        assert normalize_message("  What is   XSS? ") == normalize_message("what is xss")
+
+    def test_key_depends_on_model_prompt_and_context(self):
+        """Test that model, prompt version and context all change the key"""
+        base = ResponseCache.make_key("What is XSS?", None, "model-a", "v1")
+        assert base == ResponseCache.make_key("what is xss", [], "model-a", "v1")
+        assert base != ResponseCache.make_key("What is XSS?", None, "model-b", "v1")
+        assert base != ResponseCache.make_key("What is XSS?", None, "model-a", "v2")
+        history = [{"role": "user", "content": "Hello"}]
+        assert base != ResponseCache.make_key("What is XSS?", history, "model-a", "v1")
+
+
+class TestResponseCache:
+    """Test LRU, TTL and byte budget behaviour"""
+
+    def test_hit_and_miss_counters(self):
+        """Test that lookups are counted"""
+        cache = ResponseCache()
+        assert cache.get("k") is None
+        cache.set("k", "answer")
+        assert cache.get("k") == "answer"
+
+        stats = cache.stats()
+        assert stats["hits"] == 1
+        assert stats["misses"] == 1
+        assert stats["hit_ratio"] == 0.5
+
+    def test_entries_expire(self):
+        """Test that entries past their TTL are treated as misses"""
+        cache = ResponseCache(ttl_seconds=0.01)
+        cache.set("k", "answer")
+        time.sleep(0.02)
+        assert cache.get("k") is None
+        assert cache.stats()["entries"] == 0
+
+    def test_byte_budget_evicts_least_recently_used(self):
+        """Test that the oldest untouched entry is evicted first"""
+        cache = ResponseCache(max_bytes=1200)
+        cache.set("a", "x" * 300)
+        cache.set("b", "x" * 300)
+        cache.get("a")  # a is now most recently used
+        cache.set("c", "x" * 300)
+
+        assert cache.get("b") is None
+        assert cache.get("a") is not None
+        assert cache.get("c") is not None
+        assert cache.stats()["bytes"] <= 1200
+        assert cache.stats()["evictions"] == 1
+
+    def test_oversized_values_are_not_stored(self):
+        """Test that a value larger than the whole budget is skipped"""
+        cache = ResponseCache(max_bytes=100)
+        cache.set("k", "x" * 500)
+        assert cache.get("k") is None
@@ -0,0 +1,211 @@
+"""
+Test suite for input sanitization rules
+"""
+import html
+import random
+import re
+import threading
+
+import pytest
+
+from app.utils import (
+    SanitizationCache,
+    UnsafeInputError,
+    sanitize_conversation_history,
+    sanitize_user_input,
+)
+from app.utils.sanitization import INJECTION_RULES, find_dangerous_rule
+
+# Patterns as originally checked, one re.search at a time
+REFERENCE_SQL = [
+    r'\bDROP\s+TABLE\b', r'\bDELETE\s+FROM\b', r'\bINSERT\s+INTO\b',
+    r'\bUPDATE\s+\w+\s+SET\b', r';\s*DROP\s+', r'--\s*$', r'/\*.*?\*/',
+]
+REFERENCE_COMMANDS = [r'\$\(', r'`', r'\|\s*sh\b', r'\|\s*bash\b', r'&&', r'\|\|']
+
+
+def reference_sanitize(text: str, max_length: int = 2000) -> str:
+    """Pattern-by-pattern implementation the compiled engine must agree with"""
+    if not text:
+        raise ValueError("Input cannot be empty")
+    text = text.strip()
+    if len(text) > max_length or len(text) < 1:
+        raise ValueError("Invalid length")
+    text = html.escape(text)
+    text = re.sub(r'<script[^>]*>.*?</script>', '', text, flags=re.IGNORECASE | re.DOTALL)
+    for pattern in REFERENCE_SQL:
+        if re.search(pattern, text, re.IGNORECASE):
+            raise ValueError("Input contains potentially dangerous content")
+    for pattern in REFERENCE_COMMANDS:
+        if re.search(pattern, text):
+            raise ValueError("Input contains potentially dangerous content")
+    return text
+
+
+def reference_rule(text: str):
+    """Name of the first reference pattern that matches"""
+    checks = [(p, re.IGNORECASE) for p in REFERENCE_SQL] + [(p, 0) for p in REFERENCE_COMMANDS]
+    for (pattern, flags), rule in zip(checks, INJECTION_RULES):
+        if re.search(pattern, text, flags):
+            return rule[0]
+    return None
+
+
+def outcome(func, text: str):
+    try:
+        return ("ok", func(text))
+    except ValueError as e:
+        return ("error", "dangerous" in str(e))
+
+
+CORPUS = [
+    "What is SQL injection?",
+    "How do I stop someone running DROP TABLE users on my site?",
+    "x; drop everything",
+    "Robert'); DROP TABLE Students;--",
+    "delete from accounts",
+    "DeLeTe   FrOm accounts",
+    "backdrop table",
+    "insert into logs",
+    "please update profile set name",
+    "UPDATE users SET admin=1",
+    "comment at the end --",
+    "comment -- in the middle",
+    "c style /* comment */ here",
+    "/* unterminated",
+    "echo $(whoami)",
+    "run `id`",
+    "cat file | sh",
+    "cat file |SH",
+    "cat file | bash",
+    "cat file | bashful",
+    "true && false",
+    "true || false",
+    "a | b",
+    "<script>alert('xss')</script>",
+    "tom & jerry",
+    "unicode café naïve 中文 text",
+    "drİp table",
+    "İNSERT INTO x",
+    "ınsert into x",
+    "update u ſet x",
+    "update K set x",
+    "drop table",
+    "drop\ttable",
+    "trailing dashes --\n",
+    "line one\n-- line two",
+]
+
+
+class TestInjectionRules:
+    """Test the compiled engine against the pattern-by-pattern reference"""
+
+    @pytest.mark.parametrize("text", CORPUS)
+    def test_matches_reference_on_corpus(self, text):
+        """Test same accept/reject decision and same escaped output"""
+        assert outcome(sanitize_user_input, text) == outcome(reference_sanitize, text)
+
+    def test_matches_reference_on_random_inputs(self):
+        """Test random mixes of keywords, punctuation and case-folding characters"""
+        rng = random.Random(1234)
+        pieces = [
+            "drop", "DROP", "table", "delete", "from", "insert", "into", "update",
+            "set", "sh", "bash", "SH", " ", "  ", "\t", "\n", ";", "-", "--", "/*",
+            "*/", "$(", "$", "(", "`", "|", "||", "&", "&&", "<", ">", "'", '"',
+            "x", "_", "1", "é", "İ", "ı", "ſ", "K", " ",
+        ]
+        for _ in range(5000):
+            text = "".join(rng.choice(pieces) for _ in range(rng.randint(1, 12)))
+            assert outcome(sanitize_user_input, text) == outcome(reference_sanitize, text), repr(text)
+            assert find_dangerous_rule(html.escape(text)) == reference_rule(html.escape(text)), repr(text)
+
+    @pytest.mark.parametrize("text,rule", [
+        ("DROP TABLE users", "sql_drop_table"),
+        ("x; drop everything", "sql_stacked_drop"),
+        ("please update profile set name", "sql_update_set"),
+        ("c style /* comment */ here", "sql_block_comment"),
+        ("echo $(whoami)", "cmd_substitution"),
+        ("cat file | bash", "cmd_pipe_bash"),
+        ("true || false", "cmd_or_chain"),
+    ])
+    def test_reports_rule(self, text, rule):
+        """Test that the rejection names the rule that fired"""
+        with pytest.raises(UnsafeInputError) as excinfo:
+            sanitize_user_input(text)
+        assert excinfo.value.rule == rule
+        assert str(excinfo.value) == "Input contains potentially dangerous content"
+
+    @pytest.mark.parametrize("text", ["İNSERT INTO x", "ınsert into x", "update u ſet x", "|SH"])
+    def test_casefold_characters_report_same_rule(self, text):
+        """Test rule reporting on text the lowercase fast path can't handle"""
+        rule = find_dangerous_rule(html.escape(text))
+        assert (rule is None) == (outcome(reference_sanitize, text)[0] == "ok")
+
+    def test_first_rule_in_order_wins(self):
+        """Test that rules are reported in check order, not match position"""
+        assert find_dangerous_rule("`x` then DROP TABLE t") == "sql_drop_table"
+
+    def test_clean_text_has_no_rule(self):
+        """Test that ordinary questions pass"""
+        assert find_dangerous_rule("How do I set up MFA for my team?") is None
+
+
+class TestSanitizationCache:
+    """Test memoized history sanitization"""
+
+    HISTORY = [
+        {"role": "user", "content": "What is <b>XSS</b>?"},
+        {"role": "assistant", "content": "Cross-site scripting."},
+        {"role": "user", "content": "ok; DROP TABLE users"},
+        {"role": "bogus", "content": "ignored"},
+    ]
+
+    def test_same_result_as_uncached(self):
+        """Test that cached and uncached sanitization agree, including rejections"""
+        cache = SanitizationCache()
+        expected = sanitize_conversation_history(self.HISTORY, cache=None)
+        assert sanitize_conversation_history(self.HISTORY, cache=cache) == expected
+        assert sanitize_conversation_history(self.HISTORY, cache=cache) == expected
+        assert len(expected) == 2
+
+    def test_resent_turns_hit_the_cache(self):
+        """Test that only new messages are sanitized again"""
+        cache = SanitizationCache()
+        sanitize_conversation_history(self.HISTORY, cache=cache)
+        assert cache.misses == 3 and cache.hits == 0
+
+        history = self.HISTORY + [{"role": "user", "content": "And CSRF?"}]
+        sanitize_conversation_history(history, cache=cache)
+        assert cache.misses == 4 and cache.hits == 3
+        assert cache.stats()["hit_ratio"] == round(3 / 7, 3)
+
+    def test_bounded(self):
+        """Test that least recently used entries are evicted"""
+        cache = SanitizationCache(max_entries=2)
+        for text in ("one", "two", "one", "three"):
+            cache.sanitize(text)
+        assert len(cache) == 2
+        cache.sanitize("one")
+        assert cache.hits == 2  # "two" was evicted, "one" was kept
+
+    def test_concurrent_use(self):
+        """Test that threads sharing a cache get consistent results"""
+        cache = SanitizationCache(max_entries=50)
+        texts = [f"message {i} $(more)" if i % 3 == 0 else f"message {i}" for i in range(100)]
+        errors = []
+
+        def worker():
+            for text in texts * 5:
+                expected = None if "$(" in text else text
+                if cache.sanitize(text) != expected:
+                    errors.append(text)
+
+        threads = [threading.Thread(target=worker) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert errors == []
+        assert len(cache) <= 50
+        assert cache.hits + cache.misses == 8 * 500
@@ -0,0 +1,134 @@
+"""
+Test suite for single-flight request coalescing
+"""
+import asyncio
+
+import pytest
+
+from app.agents.single_flight import SingleFlight
+from app.utils.deadline import DeadlineExceeded, remaining, reset_deadline, set_deadline
+
+
+class TestSingleFlight:
+    """Test coalescing, error propagation and cancellation"""
+
+    @pytest.mark.asyncio
+    async def test_concurrent_callers_share_one_call(self):
+        """Test that identical concurrent calls run the work once"""
+        flight = SingleFlight()
+        calls = 0
+
+        async def work():
+            nonlocal calls
+            calls += 1
+            await asyncio.sleep(0.05)
+            return "answer"
+
+        results = await asyncio.gather(*(flight.do("k", work) for _ in range(20)))
+
+        assert results == ["answer"] * 20
+        assert calls == 1
+        assert flight.stats() == {"in_flight": 0, "coalesced": 19}
+
+    @pytest.mark.asyncio
+    async def test_different_keys_run_separately(self):
+        """Test that only equal keys are coalesced"""
+        flight = SingleFlight()
+        calls = []
+
+        async def work(key):
+            calls.append(key)
+            await asyncio.sleep(0.01)
+            return key
+
+        results = await asyncio.gather(flight.do("a", lambda: work("a")), flight.do("b", lambda: work("b")))
+
+        assert results == ["a", "b"]
+        assert sorted(calls) == ["a", "b"]
+
+    @pytest.mark.asyncio
+    async def test_errors_reach_every_caller(self):
+        """Test that a failed shared call raises in all waiting callers"""
+        flight = SingleFlight()
+
+        async def work():
+            await asyncio.sleep(0.01)
+            raise RuntimeError("upstream down")
+
+        results = await asyncio.gather(
+            *(flight.do("k", work) for _ in range(3)), return_exceptions=True
+        )
+
+        assert all(isinstance(r, RuntimeError) for r in results)
+
+        # A failure is not remembered - the next call tries again
+        async def ok():
+            return "recovered"
+
+        assert await flight.do("k", ok) == "recovered"
+
+    @pytest.mark.asyncio
+    async def test_leader_disconnect_does_not_cancel_followers(self):
+        """Test that cancelling the first caller leaves the shared call running"""
+        flight = SingleFlight()
+
+        async def work():
+            await asyncio.sleep(0.05)
+            return "answer"
+
+        leader = asyncio.create_task(flight.do("k", work))
+        await asyncio.sleep(0)
+        follower = asyncio.create_task(flight.do("k", work))
+        await asyncio.sleep(0)
+
+        leader.cancel()
+        assert await follower == "answer"
+        assert leader.cancelled()
+
+    @pytest.mark.asyncio
+    async def test_work_cancelled_when_all_callers_leave(self):
+        """Test that upstream work stops once nobody is waiting for it"""
+        flight = SingleFlight()
+        cancelled = asyncio.Event()
+
+        async def work():
+            try:
+                await asyncio.sleep(10)
+            except asyncio.CancelledError:
+                cancelled.set()
+                raise
+
+        callers = [asyncio.create_task(flight.do("k", work)) for _ in range(2)]
+        await asyncio.sleep(0.01)
+        for caller in callers:
+            caller.cancel()
+
+        await asyncio.wait_for(cancelled.wait(), timeout=1)
+        assert flight.stats()["in_flight"] == 0
+
+    @pytest.mark.asyncio
+    async def test_callers_keep_their_own_deadlines(self):
+        """Test that a follower with a longer deadline outlives a short-deadline leader"""
+        flight = SingleFlight()
+        seen = {}
+
+        async def work():
+            seen["deadline"] = remaining()
+            await asyncio.sleep(0.2)
+            return "answer"
+
+        async def caller(seconds):
+            token = set_deadline(seconds)
+            try:
+                return await flight.do("k", work)
+            finally:
+                reset_deadline(token)
+
+        leader = asyncio.create_task(caller(0.05))
+        await asyncio.sleep(0.01)
+        follower = asyncio.create_task(caller(5))
+
+        with pytest.raises(DeadlineExceeded):
+            await leader
+        assert await follower == "answer"
+        assert seen["deadline"] is None
@@ -0,0 +1,94 @@
+"""
+Test suite for the pre-generated quick tip pool
+"""
+import asyncio
+
+import pytest
+
+from app.agents.owasp_tutor import FALLBACK_TIP, OWASPTutor
+from app.agents.tip_pool import TipPool
+
+
+def tip_source(*tips):
+    """Coroutine factory returning the given tips in order"""
+    remaining = list(tips)
+
+    async def generate():
+        return remaining.pop(0)
+
+    return generate
+
+
+class TestTipPool:
+    """Test pooling, de-duplication and replenishment"""
+
+    def test_empty_pool_returns_none(self):
+        """Test that an empty pool has nothing to serve"""
+        assert TipPool(tip_source()).get() is None
+
+    def test_duplicates_are_rejected(self):
+        """Test that tips differing only in case/punctuation are de-duplicated"""
+        pool = TipPool(tip_source())
+        assert pool.add("Use a password manager.")
+        assert not pool.add("use a password manager")
+        assert not pool.add("   ")
+        assert len(pool) == 1
+
+    def test_full_pool_rotates_oldest(self):
+        """Test that adding to a full pool evicts the oldest tip"""
+        pool = TipPool(tip_source(), max_size=2)
+        pool.add("Tip one")
+        pool.add("Tip two")
+        pool.add("Tip three")
+
+        assert len(pool) == 2
+        assert pool.add("Tip one")  # Evicted, so no longer a duplicate
+
+    @pytest.mark.asyncio
+    async def test_background_task_fills_pool(self):
+        """Test that the background task refills up to the target size"""
+        pool = TipPool(tip_source("A", "B", "C"), max_size=3, refill_interval=0, refresh_interval=10)
+        pool.start()
+        for _ in range(50):
+            if len(pool) == 3:
+                break
+            await asyncio.sleep(0)
+        await pool.stop()
+
+        assert len(pool) == 3
+        assert pool.get() in {"A", "B", "C"}
+
+    @pytest.mark.asyncio
+    async def test_upstream_failures_back_off(self):
+        """Test that generation errors don't stop or crash the refill loop"""
+        attempts = 0
+
+        async def failing():
+            nonlocal attempts
+            attempts += 1
+            raise RuntimeError("upstream down")
+
+        pool = TipPool(failing, refill_interval=0.001, max_backoff=0.01)
+        pool.start()
+        await asyncio.sleep(0.05)
+        await pool.stop()
+
+        assert attempts > 1
+        assert len(pool) == 0
+
+
+class TestQuickTipServing:
+    """Test that the tutor serves tips from memory"""
+
+    @pytest.mark.asyncio
+    async def test_falls_back_to_static_tip(self):
+        """Test that an empty pool serves the static 2FA tip"""
+        tutor = OWASPTutor()
+        assert await tutor.get_quick_tip() == FALLBACK_TIP
+
+    @pytest.mark.asyncio
+    async def test_serves_pooled_tip(self):
+        """Test that pooled tips are served without an upstream call"""
+        tutor = OWASPTutor()
+        tutor.tip_pool.add("Back up your data daily.")
+        assert await tutor.get_quick_tip() == "Back up your data daily."
@@ -0,0 +1,93 @@
+"""
+Test suite for the offline topic catalog
+"""
+import pytest
+
+from app.agents.topic_catalog import Topic, TopicCatalog
+from app.agents.topics import TOPICS, build_catalog
+
+
+@pytest.fixture(scope="module")
+def catalog():
+    return build_catalog()
+
+
+class TestMatching:
+    """Test how messages are matched to topics"""
+
+    def test_keywords_match_whole_words_only(self, catalog):
+        """Test that "hi" no longer fires inside "this" """
+        assert catalog.match("Is this safe?") is None
+        assert catalog.match("Hi there").slug == "greeting"
+
+    def test_longest_keyword_wins(self, catalog):
+        """Test that specific phrases beat the generic words inside them"""
+        assert catalog.match("How does SQL injection work?").slug == "sql-injection"
+        assert catalog.match("What is prompt injection?").slug == "prompt-injection"
+        assert catalog.match("Explain command injection").slug == "injection"
+
+    def test_case_spacing_and_hyphens_are_ignored(self, catalog):
+        """Test that keyword variants match the same topic"""
+        for message in ("cross-site scripting", "Cross Site  Scripting", "XSS"):
+            assert catalog.match(message).slug == "xss"
+
+    def test_specific_topic_beats_greeting_and_overview(self, catalog):
+        """Test that broad topics only win on their own"""
+        assert catalog.match("Hello, what is SSRF?").slug == "ssrf"
+        assert catalog.match("Which OWASP risk covers broken access control?").slug == (
+            "broken-access-control"
+        )
+        assert catalog.match("What are the OWASP Top 10?").slug == "owasp-top-10"
+
+    def test_every_owasp_and_llm_risk_is_covered(self, catalog):
+        """Test that all twenty Top 10 entries have a topic"""
+        titles = " ".join(topic.title for topic in TOPICS)
+        for code in [f"A{n:02d}" for n in range(1, 11)] + [f"LLM{n:02d}" for n in range(1, 11)]:
+            assert f"({code})" in titles
+
+    def test_unmatched_message_gets_generic_answer(self, catalog):
+        """Test that the generic answer quotes the question"""
+        answer = catalog.answer("Should I buy cyber insurance?")
+        assert "Should I buy cyber insurance?" in answer
+
+
+class TestCatalogValidation:
+    """Test that broken catalogs are rejected at startup"""
+
+    def test_shared_keyword_is_rejected(self):
+        """Test that a keyword can't point at two topics"""
+        topics = [
+            Topic("one", "One", ("shared",), "1"),
+            Topic("two", "Two", ("Shared",), "2"),
+        ]
+        with pytest.raises(ValueError):
+            TopicCatalog(topics, "generic")
+
+    def test_duplicate_slug_is_rejected(self):
+        """Test that topic slugs are unique"""
+        topics = [Topic("one", "One", ("a",), "1"), Topic("one", "Two", ("b",), "2")]
+        with pytest.raises(ValueError):
+            TopicCatalog(topics, "generic")
+
+    def test_shared_subject_is_rejected(self):
+        """Test that an alias can't name two topics"""
+        topics = [
+            Topic("one", "One", ("a",), "1", aliases=("both",)),
+            Topic("two", "Two", ("b",), "2", aliases=("Both",)),
+        ]
+        with pytest.raises(ValueError):
+            TopicCatalog(topics, "generic")
+
+
+class TestSubjects:
+    """Test the canonical subjects the FAQ answers"""
+
+    def test_title_code_slug_and_alias(self, catalog):
+        """Test that each name of a topic is a subject"""
+        for phrase in ("Cross-Site Scripting", "XSS", "sql-injection", "SQLi", "A03", "OWASP Top 10"):
+            assert catalog.subject_for(phrase) is not None, phrase
+
+    def test_keywords_and_ambiguous_names_are_not_subjects(self, catalog):
+        """Test that scoring keywords, and titles that are another topic's keyword, don't count"""
+        for phrase in ("encryption", "passwords", "sql", "supply chain"):
+            assert catalog.subject_for(phrase) is None, phrase